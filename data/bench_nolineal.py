@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Rendimiento de la no linealidad: epy_block original frente a nolineal.PolyNL.
+
+    python bench_nolineal.py                      # tabla por tamaño de búfer
+    python bench_nolineal.py --json res.json      # además, resultados en JSON
+    python bench_nolineal.py --gr 50e6            # también en un flujograma (requiere GNU Radio)
+
+Sin GNU Radio se cronometra el cuerpo de work() con los mismos arrays que entregaría
+el planificador (entrada float32, salida float32 preasignada).
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from nolineal import AMAMPM, PolyNL, saleh
+
+
+def legacy_work(x, out, a1=0.20, a2=0.90, a3=0.60, out_gain=0.8, remove_dc=True):
+    """Cuerpo de poly_nl_harmonics.work() tal como está en simulador_nolinealidades.FM.grc."""
+    x = x.astype(np.float64)
+    y = out_gain * (a1 * x + a2 * (x**2) + a3 * (x**3))
+    if remove_dc:
+        y -= np.mean(y)
+    out[:] = y.astype(np.float32)
+    return len(out)
+
+
+def msps(fn, x, out, total):
+    """Millones de muestras por segundo procesando `total` muestras en búferes de len(x)."""
+    calls = max(1, total // len(x))
+    fn(x, out)  # calentamiento (búferes de trabajo)
+    best = float("inf")
+    for _ in range(3):
+        t0 = time.perf_counter()
+        for _ in range(calls):
+            fn(x, out)
+        best = min(best, time.perf_counter() - t0)
+    return calls * len(x) / best / 1e6
+
+
+def run_numpy(sizes, total):
+    rng = np.random.default_rng(0)
+    rows = []
+    for n in sizes:
+        x = (0.7 * np.cos(2 * np.pi * 0.013 * np.arange(n)) + 0.01 * rng.standard_normal(n)).astype(np.float32)
+        out = np.empty(n, np.float32)
+        nl = PolyNL()
+        z = (x + 1j * np.roll(x, 7)).astype(np.complex64)
+        zout = np.empty(n, np.complex64)
+        sal = AMAMPM(saleh())
+        row = {
+            "buffer": n,
+            "original_MSps": msps(legacy_work, x, out, total),
+            "polynl_MSps": msps(nl.process, x, out, total),
+            "polynl_sin_dc_MSps": msps(PolyNL(remove_dc=False).process, x, out, total),
+            "saleh_lut_MSps": msps(sal.process, z, zout, total),
+        }
+        row["aceleracion"] = row["polynl_MSps"] / row["original_MSps"]
+        rows.append(row)
+        print(f"{n:>7}  original {row['original_MSps']:8.1f} MS/s   PolyNL {row['polynl_MSps']:8.1f} MS/s"
+              f" (x{row['aceleracion']:.2f})   sin DC {row['polynl_sin_dc_MSps']:8.1f}   Saleh {row['saleh_lut_MSps']:8.1f}")
+    return rows
+
+
+def run_gr(n_samples):
+    """null_source -> head -> bloque -> null_sink; devuelve MS/s de cada variante."""
+    from gnuradio import blocks, gr
+    import nolineal_gr
+
+    class legacy_block(gr.sync_block):
+        def __init__(self):
+            gr.sync_block.__init__(self, name="poly_nl_legacy", in_sig=[np.float32], out_sig=[np.float32])
+
+        def work(self, input_items, output_items):
+            return legacy_work(input_items[0], output_items[0])
+
+    res = {}
+    for name, make in (("original", legacy_block), ("poly_nl_harmonics", nolineal_gr.poly_nl_harmonics)):
+        tb = gr.top_block()
+        src = blocks.null_source(gr.sizeof_float)
+        head = blocks.head(gr.sizeof_float, int(n_samples))
+        blk = make()
+        tb.connect(src, head, blk, blocks.null_sink(gr.sizeof_float))
+        t0 = time.perf_counter()
+        tb.run()
+        res[name] = n_samples / (time.perf_counter() - t0) / 1e6
+        print(f"flujograma {name:<20} {res[name]:8.1f} MS/s")
+    return res
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1024, 4096, 8192, 32768, 65536])
+    ap.add_argument("--total", type=float, default=2e7, help="muestras por medida")
+    ap.add_argument("--gr", type=float, default=0, help="muestras en la prueba con GNU Radio (0: no)")
+    ap.add_argument("--json", help="guardar resultados en JSON")
+    a = ap.parse_args()
+    res = {"numpy": run_numpy(a.sizes, int(a.total))}
+    if a.gr:
+        res["gnuradio"] = run_gr(int(a.gr))
+    if a.json:
+        with open(a.json, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""Modelo FM en banda base compleja (solo NumPy) para simulador1_bb.
+
+En lugar de muestrear la portadora real en fc (samp_rate = 24*Fmax, ~258 MS/s para
+fc = 10.7 MHz) se trabaja con la envolvente compleja z(t) = exp(j*phi(t)), a unos
+pocos Bm. La posición espectral se resuelve analíticamente: para x = A*cos(wc*t + phi)
+y una no linealidad polinómica y = sum_n p[n]*x**n,
+
+    y = sum_k c[k] * cos(k*(wc*t + phi))  ->  zona k: envolvente c[k]*z**k centrada en k*fc
+
+con c[k] de harmonic_coeffs (desarrollo de cos**n en cosenos de múltiplos). La zona k
+ocupa ~k*Bm (la desviación se multiplica por k), por eso la tasa se elige con
+n_harm*Bm.
+"""
+from __future__ import annotations
+from math import comb
+from typing import List, Sequence
+import numpy as np
+
+from remuestreo import smooth_rate
+
+def harmonic_coeffs(poly: Sequence[float], amplitude: float = 1.0) -> np.ndarray:
+    """c[k] (k = 0..grado) de y = sum_n poly[n]*x**n con x = amplitude*cos(theta).
+
+        cos(theta)**n = 2**-n * sum_j C(n, j) * cos((n - 2j)*theta)
+    """
+    deg = len(poly) - 1; c = np.zeros(deg + 1)
+    for n, p in enumerate(poly):
+        if not p: continue
+        a = p*amplitude**n/2.0**n
+        for j in range(n + 1):
+            k = abs(n - 2*j); c[k] += a*comb(n, j)
+    return c
+
+def poly_nl_coeffs(a1: float = 0.20, a2: float = 0.90, a3: float = 0.60, out_gain: float = 0.8) -> List[float]:
+    """Polinomio del bloque poly_nl_harmonics: out_gain*(a1*x + a2*x**2 + a3*x**3)."""
+    return [0.0, out_gain*a1, out_gain*a2, out_gain*a3]
+
+def baseband_rate(Bm: float, n_harm: int = 3, samp_rate_voz: int = 44100, oversample: float = 1.25) -> int:
+    """Tasa de banda base: múltiplo entero de samp_rate_voz que cubre la zona n_harm (~n_harm*Bm).
+
+    Al ser múltiplo (sin primos > 7), el remuestreo de la voz es una interpolación
+    entera en etapas cortas.
+    """
+    return smooth_rate(n_harm*Bm*oversample, samp_rate_voz)
+
+class FMModulator:
+    """z[n] = exp(j*phi[n]) con phi acumulando 2*pi*Kf*m/fs (misma desviación que vco_f con
+    sensibilidad 2*pi y entrada fc + Kf*m). La fase se conserva entre llamadas."""
+    def __init__(self, samp_rate: float, Kf: float = 1.0, phase: float = 0.0):
+        self.samp_rate = float(samp_rate); self.Kf = float(Kf); self.phase = float(phase)
+
+    def __call__(self, m: np.ndarray) -> np.ndarray:
+        phi = self.phase + np.cumsum(np.asarray(m, dtype=np.float64))*(2*np.pi*self.Kf/self.samp_rate)
+        if len(phi): self.phase = float(np.mod(phi[-1], 2*np.pi))
+        return np.exp(1j*phi).astype(np.complex64)
+
+def harmonic_zones(z: np.ndarray, coeffs: np.ndarray, n_harm: int = 3) -> List[np.ndarray]:
+    """Envolventes de las zonas 1..n_harm: c[k]*z**k (las potencias se encadenan, sin np.power)."""
+    out = []; zk = np.ones_like(z)
+    for k in range(1, n_harm + 1):
+        zk = zk*z; out.append((coeffs[k] if k < len(coeffs) else 0.0)*zk)
+    return out
+
+def blackman_harris(nfft: int) -> np.ndarray:
+    """Ventana Blackman-Harris de 4 términos (la de los freq_sink)."""
+    n = np.arange(nfft)
+    return (0.35875 - 0.48829*np.cos(2*np.pi*n/nfft) + 0.14128*np.cos(4*np.pi*n/nfft)
+            - 0.01168*np.cos(6*np.pi*n/nfft))
+
+def welch_psd(x: np.ndarray, samp_rate: float, nfft: int = 2048, overlap: float = 0.5) -> np.ndarray:
+    """PSD media (W/Hz, ventana Blackman-Harris) por segmentos de nfft; compleja: centrada (fftshift)."""
+    x = np.asarray(x)
+    if len(x) < nfft: x = np.pad(x, (0, nfft - len(x)))
+    acc = PSDAccumulator(nfft, samp_rate, overlap); acc.feed(x)
+    return acc.psd(np.iscomplexobj(x))
+
+class PSDAccumulator:
+    """welch_psd por bloques de cualquier longitud (flujo continuo, memoria constante).
+
+    Guarda la cola que no completa un segmento; los segmentos de una llamada se
+    transforman juntos (una FFT por lotes por llamada).
+    """
+    def __init__(self, nfft: int = 2048, samp_rate: float = 1.0, overlap: float = 0.5):
+        self.nfft = nfft; self.samp_rate = samp_rate; self.step = max(1, int(nfft*(1 - overlap)))
+        self.win = blackman_harris(nfft); self.reset()
+
+    def reset(self):
+        self.acc = np.zeros(self.nfft); self.count = 0; self._tail = np.zeros(0)
+
+    def feed(self, x: np.ndarray) -> None:
+        buf = np.concatenate([self._tail, x]) if len(self._tail) else np.asarray(x)
+        n_seg = (len(buf) - self.nfft)//self.step + 1 if len(buf) >= self.nfft else 0
+        if n_seg:
+            idx = self.step*np.arange(n_seg)[:, None] + np.arange(self.nfft)[None, :]
+            self.acc += (np.abs(np.fft.fft(buf[idx]*self.win, axis=1))**2).sum(axis=0); self.count += n_seg
+        self._tail = buf[n_seg*self.step:].copy()
+
+    def psd(self, centered: bool = True) -> np.ndarray:
+        """centered: espectro completo centrado (complejas); si no, unilateral (reales)."""
+        nfft = self.nfft; psd = self.acc/(max(self.count, 1)*self.samp_rate*np.sum(self.win**2))
+        return np.fft.fftshift(psd) if centered else psd[:nfft//2 + 1]*np.r_[1, 2*np.ones(nfft//2 - 1), 1]
+
+def zone_axis(k: int, fc: float, samp_rate: float, nfft: int) -> np.ndarray:
+    """Eje de frecuencia absoluto (Hz) de la PSD centrada de la zona k (centro k*fc)."""
+    return k*fc + np.fft.fftshift(np.fft.fftfreq(nfft, 1.0/samp_rate))
+
+def passband_power(zk: np.ndarray) -> float:
+    """Potencia de la componente real Re{zk*exp(j*k*wc*t)}: |zk|**2/2 promedio."""
+    return float(np.mean(np.abs(zk)**2)/2)
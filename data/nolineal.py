@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""Núcleos de no linealidad del receptor (solo NumPy), sin asignaciones por llamada.
+
+Sustituyen al epy_block poly_nl_harmonics de simulador_nolinealidades.FM*.grc, que
+en cada work() convertía a float64, creaba x**2 y x**3 por separado, restaba
+np.mean(y) del búfer (DC dependiente del tamaño de búfer del planificador) y volvía
+a copiar con astype(np.float32).
+
+- PolyNL: polinomio por Horner en float32 escrito directamente en `out`, bloqueador
+  de DC de un polo con estado entre llamadas y recorte opcional en sitio.
+- DCBlocker: y[n] = x[n] - x[n-1] + r*y[n-1], vectorizado por tramos.
+- AMAMPM: modelos AM/AM-AM/PM (Saleh, Rapp) para envolventes complejas, con la
+  ganancia compleja G(|x|**2) tabulada e interpolada linealmente.
+
+Todos usan búferes de trabajo que solo crecen (_Scratch): tras la primera llamada
+con el tamaño máximo de búfer ya no se reserva memoria.
+"""
+from __future__ import annotations
+from typing import Callable, Dict, Optional, Sequence, Tuple
+import numpy as np
+
+class _Scratch:
+    """Búferes de trabajo reutilizables por nombre (crecen, nunca encogen)."""
+    def __init__(self): self._b: Dict[str, np.ndarray] = {}
+
+    def get(self, name: str, n: int, dtype) -> np.ndarray:
+        b = self._b.get(name)
+        if b is None or len(b) < n or b.dtype != dtype: b = self._b[name] = np.empty(max(n, 1024), dtype)
+        return b[:n]
+
+def horner(x: np.ndarray, coeffs: Sequence[float], out: np.ndarray) -> np.ndarray:
+    """out = sum_n coeffs[n]*x**n por Horner, en sitio (out no debe ser x)."""
+    c = [np.float32(v) for v in coeffs]
+    out.fill(c[-1])
+    for v in reversed(c[:-1]):
+        np.multiply(out, x, out=out)
+        if v: np.add(out, v, out=out)
+    return out
+
+class DCBlocker:
+    """Bloqueador de DC de un polo (cero en z=1, polo en z=r) con estado entre llamadas.
+
+    La recursión y[n] = d[n] + r*y[n-1] (d = x[n] - x[n-1]) se resuelve en tramos de
+    `block` muestras con sumas acumuladas escaladas por r**-k; por defecto el tramo
+    más largo (hasta 4096) con r**-block <= 1e4, para no perder precisión. Solo el
+    arrastre entre tramos es un bucle escalar.
+    """
+    def __init__(self, r: float = 0.999, block: Optional[int] = None):
+        self.r = float(r)
+        if block is None: block = int(min(4096, max(16, np.log(1e4)/-np.log(min(self.r, 1 - 1e-12)))))
+        self.block = block
+        k = np.arange(block, dtype=np.float64)
+        self._rpow = self.r**k; self._rinv = self.r**-k; self._rstep = self.r**(k + 1)
+        self.x_prev = 0.0; self.y_prev = 0.0; self._s = _Scratch()
+
+    def reset(self): self.x_prev = 0.0; self.y_prev = 0.0
+
+    def process(self, x: np.ndarray, out: np.ndarray) -> np.ndarray:
+        n = len(x)
+        if n == 0: return out
+        B = min(self.block, n); nb = -(-n//B)  # búferes cortos: un solo tramo sin relleno
+        s = self._s.get("d", nb*B, np.float64); d = s[:n]
+        d[0] = x[0] - self.x_prev; np.subtract(x[1:], x[:-1], out=d[1:]); s[n:] = 0.0
+        self.x_prev = float(x[-1])
+        m = s.reshape(nb, B)
+        np.multiply(m, self._rinv[:B], out=m); np.cumsum(m, axis=1, out=m); np.multiply(m, self._rpow[:B], out=m)
+        carry = self._s.get("c", nb, np.float64); c = self.y_prev; ends = m[:, -1]; rB = self.r**B
+        for j in range(nb): carry[j] = c; c = ends[j] + rB*c
+        t = self._s.get("t", nb*B, np.float64).reshape(nb, B)
+        np.multiply(carry[:, None], self._rstep[:B], out=t); m += t
+        self.y_prev = float(s[n - 1])
+        out[:] = d
+        return out
+
+class PolyNL:
+    """y = out_gain*(a1*x + a2*x**2 + a3*x**3) (o `coeffs` arbitrarios), con DC y recorte opcionales.
+
+    Mismos parámetros que poly_nl_harmonics más `dc_pole` (r del DCBlocker; 0.999 a
+    samp_rate ~ 258 MS/s deja el corte en ~40 kHz, muy por debajo de fc).
+    """
+    def __init__(self, a1=0.20, a2=0.90, a3=0.60, out_gain=0.8, remove_dc=True, clip=False,
+                 clip_min=-1.0, clip_max=1.0, dc_pole=0.999, coeffs: Optional[Sequence[float]] = None):
+        self.a1, self.a2, self.a3, self.out_gain = float(a1), float(a2), float(a3), float(out_gain)
+        self._coeffs = None if coeffs is None else [float(c) for c in coeffs]
+        self.remove_dc = bool(remove_dc); self.clip = bool(clip)
+        self.clip_min = float(clip_min); self.clip_max = float(clip_max)
+        self.dc = DCBlocker(dc_pole)
+
+    @property
+    def coeffs(self):
+        if self._coeffs is not None: return self._coeffs
+        g = self.out_gain; return [0.0, g*self.a1, g*self.a2, g*self.a3]
+
+    def process(self, x: np.ndarray, out: np.ndarray) -> np.ndarray:
+        horner(x, self.coeffs, out)
+        if self.remove_dc: self.dc.process(out, out)
+        if self.clip: np.clip(out, self.clip_min, self.clip_max, out=out)
+        return out
+
+# ---------------------------------------------------------------------------
+# AM/AM - AM/PM (envolvente compleja)
+# ---------------------------------------------------------------------------
+def saleh(alpha_a: float = 2.1587, beta_a: float = 1.1517, alpha_p: float = 4.0033,
+          beta_p: float = 9.1040) -> Tuple[Callable, Callable]:
+    """Modelo de Saleh (TWTA; parámetros por defecto del artículo original): A(r), Phi(r)."""
+    return (lambda r: alpha_a*r/(1 + beta_a*r**2)), (lambda r: alpha_p*r**2/(1 + beta_p*r**2))
+
+def rapp(gain: float = 1.0, a_sat: float = 1.0, p: float = 2.0) -> Tuple[Callable, Callable]:
+    """Modelo de Rapp (amplificador de estado sólido): solo AM/AM."""
+    return (lambda r: gain*r/(1 + (gain*r/a_sat)**(2*p))**(1/(2*p))), (lambda r: np.zeros_like(r))
+
+class AMAMPM:
+    """out = x*G(|x|**2), con G = A(r)/r*exp(j*Phi(r)) tabulada en n puntos de |x|**2 en [0, r_max**2].
+
+    Tabular sobre |x|**2 evita la raíz. Por encima de r_max se mantiene la amplitud
+    A(r_max) (saturación) y la fase Phi(r_max); solo esas muestras pagan la raíz.
+    """
+    def __init__(self, model: Tuple[Callable, Callable], r_max: float = 2.0, n: int = 4096):
+        am, pm = model
+        r2 = np.linspace(0.0, r_max**2, n); r = np.sqrt(r2); r[0] = 1e-9*r_max  # G(0) = A'(0)
+        g = am(r)/r*np.exp(1j*pm(r))
+        self.lut = g.astype(np.complex64); self.dlut = np.diff(self.lut, append=self.lut[-1:])
+        self.scale = np.float32((n - 1)/r_max**2); self.n = n; self.r_max = r_max; self._s = _Scratch()
+
+    def process(self, x: np.ndarray, out: np.ndarray) -> np.ndarray:
+        m = len(x); s = self._s
+        p = s.get("p", m, np.float32); t = s.get("t", m, np.float32); i = s.get("i", m, np.intp)
+        g = s.get("g", m, np.complex64); g0 = s.get("g0", m, np.complex64)
+        np.multiply(x.real, x.real, out=p); np.multiply(x.imag, x.imag, out=t); np.add(p, t, out=p)
+        np.multiply(p, self.scale, out=p)
+        over = np.flatnonzero(p > self.n - 1) if p.max(initial=0.0) > self.n - 1 else None
+        np.minimum(p, self.n - 1, out=p)
+        np.floor(p, out=t); i[:] = t; np.subtract(p, t, out=p)  # p: parte fraccionaria
+        np.take(self.dlut, i, out=g); np.multiply(g, p, out=g)
+        np.take(self.lut, i, out=g0); np.add(g, g0, out=g)
+        if over is not None: g[over] *= self.r_max/np.abs(x[over])
+        np.multiply(x, g, out=out)
+        return out
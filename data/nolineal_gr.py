@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""Bloques GNU Radio de no linealidad del receptor (núcleos en nolineal.py)."""
+import numpy as np
+from gnuradio import gr
+
+from nolineal import AMAMPM, PolyNL, rapp, saleh
+
+
+class poly_nl_harmonics(gr.sync_block):
+    """
+    No linealidad polinómica para generar armónicos 2*fc y 3*fc
+    a partir de una senoidal de entrada en fc.
+
+    y = out_gain * (a1*x + a2*x^2 + a3*x^3)  (con opción de quitar DC y clipping)
+
+    Misma interfaz que el epy_block de simulador_nolinealidades.FM.grc, pero:
+      - evalúa por Horner en float32 directamente sobre output_items (sin copias);
+      - remove_dc usa un bloqueador de DC de un polo (dc_pole) con estado entre
+        llamadas, en lugar de restar la media de cada búfer.
+    """
+
+    def __init__(self, a1=0.20, a2=0.90, a3=0.60, out_gain=0.8,
+                 remove_dc=True, clip=False, clip_min=-1.0, clip_max=1.0, dc_pole=0.999):
+        gr.sync_block.__init__(
+            self,
+            name="poly_nl_harmonics",
+            in_sig=[np.float32],
+            out_sig=[np.float32],
+        )
+        self.nl = PolyNL(a1, a2, a3, out_gain, remove_dc, clip, clip_min, clip_max, dc_pole)
+
+    def work(self, input_items, output_items):
+        self.nl.process(input_items[0], output_items[0])
+        return len(output_items[0])
+
+    # Setters por si se conectan a variables en GRC
+    def set_a1(self, v): self.nl.a1 = float(v)
+    def set_a2(self, v): self.nl.a2 = float(v)
+    def set_a3(self, v): self.nl.a3 = float(v)
+    def set_out_gain(self, v): self.nl.out_gain = float(v)
+    def set_remove_dc(self, v): self.nl.remove_dc = bool(v); self.nl.dc.reset()
+    def set_clip(self, v): self.nl.clip = bool(v)
+    def set_clip_min(self, v): self.nl.clip_min = float(v)
+    def set_clip_max(self, v): self.nl.clip_max = float(v)
+
+
+class amam_ampm_cc(gr.sync_block):
+    """
+    AM/AM - AM/PM sobre envolvente compleja con ganancia tabulada.
+
+    model: "saleh" (alpha_a, beta_a, alpha_p, beta_p) o "rapp" (gain, a_sat, p);
+    r_max: amplitud máxima tabulada (por encima, salida saturada en A(r_max)).
+    """
+
+    def __init__(self, model="saleh", params=(), r_max=2.0, n_lut=4096):
+        gr.sync_block.__init__(
+            self,
+            name="amam_ampm_cc",
+            in_sig=[np.complex64],
+            out_sig=[np.complex64],
+        )
+        self.table = AMAMPM((saleh if model == "saleh" else rapp)(*params), r_max, n_lut)
+
+    def work(self, input_items, output_items):
+        self.table.process(input_items[0], output_items[0])
+        return len(output_items[0])
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""Remuestreo racional en cascada (solo NumPy): voz (44.1 kHz) -> tasa de RF.
+
+rational_resampler_fff(interpolation=samp_rate, decimation=samp_rate_voz) diseña un
+único filtro polifásico de cientos de millones de fases. Aquí la razón se reduce
+por MCD y se factoriza en etapas pequeñas:
+
+  - primero medias bandas x2 (la primera etapa es la de transición más estrecha
+    y conviene que trabaje a la tasa más baja);
+  - luego factores agrupados hasta `max_factor`; un primo mayor queda como etapa
+    propia; la decimación se pliega en la última etapa (la de filtro más relajado).
+
+Una etapa con L o M grande (primo grande en la razón) cuesta ~20·max(L, M) taps:
+plan_ratios la rechaza por encima de MAX_STAGE. Las tasas de RF se eligen con
+smooth_rate (múltiplo de 44.1 kHz sin primos > 7), así la razón es entera y chica.
+
+Cada etapa es un FIR Kaiser de ganancia L (la convención de rational_resampler).
+Los diseños se guardan en disco por (fs_in, fs_out, parámetros): cambiar fc/Bm en
+el flujograma reutiliza la cascada en lugar de rediseñarla.
+"""
+from __future__ import annotations
+import hashlib
+import os
+import tempfile
+from math import gcd
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+
+CACHE_VERSION = 1
+MAX_STAGE = 256  # L o M máximo de una etapa (~20·max(L, M) taps: ~5000)
+
+class Stage(NamedTuple):
+    L: int             # interpolación
+    M: int             # decimación
+    taps: np.ndarray   # float32, ganancia L
+
+def prime_factors(n: int) -> List[int]:
+    out = []; d = 2
+    while d*d <= n:
+        while n % d == 0: out.append(d); n //= d
+        d += 1
+    if n > 1: out.append(n)
+    return out
+
+def smooth_rate(fs: float, base: int = 44100, primes: Tuple[int, ...] = (2, 3, 5, 7)) -> int:
+    """Menor n*base >= fs con n sin factores primos fuera de `primes`.
+
+    Con base = tasa de la voz, base -> n*base es una interpolación entera que
+    plan_ratios parte en etapas <= max_factor (p.ej. int(Fmax*8*3) -> smooth_rate(...)).
+    """
+    n = max(1, -(-int(np.ceil(fs))//int(base)))
+    while True:
+        m = n
+        for p in primes:
+            while m % p == 0: m //= p
+        if m == 1: return n*int(base)
+        n += 1
+
+def plan_ratios(fs_in: int, fs_out: int, max_factor: int = 8, n_halfband: int = 2) -> List[Tuple[int, int]]:
+    """[(L, M), ...] cuyo producto es fs_out/fs_in reducido por MCD.
+
+    ValueError si alguna etapa supera MAX_STAGE (la razón tiene un primo grande).
+    """
+    g = gcd(int(fs_out), int(fs_in)); L = int(fs_out)//g; M = int(fs_in)//g
+    if L == 1 and M == 1: return []
+    if L < M:  # decimación: el plan inverso, invertido (las etapas anchas primero)
+        return [(m, l) for l, m in reversed(plan_ratios(fs_out, fs_in, max_factor, n_halfband))]
+    fl = prime_factors(L); stages: List[int] = []
+    while fl and fl[0] == 2 and len(stages) < n_halfband: stages.append(fl.pop(0))
+    cur = 1
+    for p in fl:
+        if cur*p > max_factor and cur > 1: stages.append(cur); cur = 1
+        cur *= p
+    if cur > 1: stages.append(cur)
+    stages[n_halfband:] = sorted(stages[n_halfband:])  # factores crecientes: los filtros se relajan
+    if not stages: stages = [1]
+    ratios = [(l, 1) for l in stages]
+    ratios[-1] = (ratios[-1][0], M)
+    big = max(ratios, key=max)
+    if max(big) > MAX_STAGE:
+        raise ValueError(f"{fs_in} -> {fs_out} Hz: etapa {big[0]}/{big[1]} demasiado grande "
+                         f"(máx. {MAX_STAGE}); elegir la tasa con smooth_rate")
+    return ratios
+
+def kaiser_lowpass(num_taps: int, cutoff: float, fs: float, gain: float = 1.0, atten_dB: float = 80.0) -> np.ndarray:
+    beta = 0.1102*(atten_dB - 8.7) if atten_dB > 50 else (0.5842*(atten_dB - 21)**0.4 + 0.07886*(atten_dB - 21) if atten_dB > 21 else 0.0)
+    n = np.arange(num_taps) - (num_taps - 1)/2
+    h = np.sinc(2*cutoff/fs*n)*np.kaiser(num_taps, beta)
+    return (gain*h/h.sum()).astype(np.float32)
+
+def design_stages(fs_in: int, fs_out: int, atten_dB: float = 80.0, fractional_bw: float = 0.4,
+                  max_factor: int = 8, n_halfband: int = 2) -> List[Stage]:
+    """Diseña la cascada. La banda útil es fractional_bw*min(fs_in, fs_out) y se conserva en todas las etapas."""
+    fp = fractional_bw*min(fs_in, fs_out); rate = float(fs_in); out = []
+    for L, M in plan_ratios(fs_in, fs_out, max_factor, n_halfband):
+        fs_f = rate*L; r_out = fs_f/M
+        fstop = min(rate, r_out) - fp  # primera imagen (interpolación) o primer alias (decimación)
+        # con L=2 y M=1 el corte queda en fs_f/4: media banda, una de las dos ramas es un impulso
+        df = max(fstop - fp, 1e-6*fs_f)
+        n = int(np.ceil((atten_dB - 8)/(2.285*2*np.pi*df/fs_f))) + 1
+        n += (n % 2 == 0)  # impar: retardo entero
+        out.append(Stage(L, M, kaiser_lowpass(n, (fp + fstop)/2, fs_f, gain=L, atten_dB=atten_dB)))
+        rate = r_out
+    return out
+
+# ---------------------------------------------------------------------------
+# Caché en disco
+# ---------------------------------------------------------------------------
+def default_cache_dir() -> str:
+    return os.environ.get("ANE_TAPS_CACHE") or os.path.join(os.path.expanduser("~"), ".cache", "ane2025", "taps")
+
+_mem: Dict[str, List[Stage]] = {}
+
+def _cache_key(fs_in, fs_out, atten_dB, fractional_bw, max_factor, n_halfband) -> str:
+    raw = f"v{CACHE_VERSION}|{int(fs_in)}|{int(fs_out)}|{atten_dB:g}|{fractional_bw:g}|{max_factor}|{n_halfband}"
+    return f"remuestreo_{int(fs_in)}_{int(fs_out)}_{hashlib.sha1(raw.encode()).hexdigest()[:10]}"
+
+def cached_stages(fs_in: int, fs_out: int, atten_dB: float = 80.0, fractional_bw: float = 0.4,
+                  max_factor: int = 8, n_halfband: int = 2, cache_dir: Optional[str] = None) -> List[Stage]:
+    """design_stages con caché en memoria y en disco (un .npz por par de tasas y parámetros).
+
+    cache_dir="" desactiva el disco. Un archivo ilegible se ignora y se rediseña.
+    """
+    key = _cache_key(fs_in, fs_out, atten_dB, fractional_bw, max_factor, n_halfband)
+    if key in _mem: return _mem[key]
+    d = default_cache_dir() if cache_dir is None else cache_dir
+    path = os.path.join(d, key + ".npz") if d else None
+    stages = None
+    if path and os.path.exists(path):
+        try:
+            with np.load(path) as z:
+                LM = z["LM"]; cut = np.cumsum(np.r_[0, z["lens"]])
+                stages = [Stage(int(l), int(m), z["taps"][a:b]) for (l, m), a, b in zip(LM, cut[:-1], cut[1:])]
+        except (OSError, KeyError, ValueError):
+            stages = None
+    if stages is None:
+        stages = design_stages(fs_in, fs_out, atten_dB, fractional_bw, max_factor, n_halfband)
+        if path:
+            try:
+                os.makedirs(d, exist_ok=True)
+                fd, tmp = tempfile.mkstemp(prefix=".tmp_", suffix=".npz", dir=d)
+                with os.fdopen(fd, "wb") as f:
+                    np.savez(f, LM=np.array([(s.L, s.M) for s in stages], dtype=np.int64).reshape(-1, 2),
+                             lens=np.array([len(s.taps) for s in stages], dtype=np.int64),
+                             taps=np.concatenate([s.taps for s in stages]) if stages else np.zeros(0, np.float32))
+                os.replace(tmp, path)
+            except OSError:
+                pass  # sin caché en disco (solo lectura, etc.): se sigue con el diseño en memoria
+    _mem[key] = stages
+    return stages
+
+# ---------------------------------------------------------------------------
+# Ejecución en NumPy (por bloques, con estado): verificación y uso fuera de GNU Radio
+# ---------------------------------------------------------------------------
+class PolyphaseStage:
+    """y[n] = sum_i h[p + i*L] * x[(n*M - p)/L - i], p = n*M mod L, sin calcular los ceros."""
+    def __init__(self, st: Stage):
+        self.L, self.M = st.L, st.M
+        self.K = K = -(-len(st.taps)//st.L)
+        h = np.zeros(K*st.L, np.float32); h[:len(st.taps)] = st.taps
+        self.H = h.reshape(K, st.L).T.copy()  # H[p, i] = h[p + i*L]
+        self.hist = np.zeros(K - 1, np.float32); self.t = 0  # siguiente índice de salida en la tasa L*fs_in
+
+    def __call__(self, x: np.ndarray, chunk: int = 1 << 15) -> np.ndarray:
+        x = np.asarray(x, np.float32); n_in = len(x)
+        xe = np.concatenate([self.hist, x]); K = self.K
+        n_out = max(0, -(-(n_in*self.L - self.t)//self.M))
+        t = self.t + self.M*np.arange(n_out, dtype=np.int64)
+        y = np.empty(n_out, np.float32); idx = np.arange(K)
+        for a in range(0, n_out, chunk):
+            tt = t[a:a + chunk]; base = tt//self.L + K - 1
+            y[a:a + chunk] = np.einsum("ij,ij->i", self.H[tt % self.L], xe[base[:, None] - idx])
+        self.t = int(self.t + n_out*self.M - n_in*self.L)
+        self.hist = xe[len(xe) - (K - 1):] if K > 1 else self.hist
+        return y
+
+class MultistageResampler:
+    """Cascada de PolyphaseStage: r = MultistageResampler(44100, 1_411_200); y = r(x)."""
+    def __init__(self, fs_in: int, fs_out: int, **kw):
+        self.fs_in = fs_in; self.fs_out = fs_out
+        self.stages = [PolyphaseStage(s) for s in cached_stages(fs_in, fs_out, **kw)]
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        for st in self.stages: x = st(x)
+        return np.asarray(x, np.float32)
+
+def cost_per_input(stages: List[Stage]) -> float:
+    """MAC por muestra de entrada (polifásico: len(taps)/L por salida)."""
+    rate = 1.0; total = 0.0
+    for s in stages:
+        rate_out = rate*s.L/s.M; total += rate_out*len(s.taps)/s.L; rate = rate_out
+    return total
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""Bloque GNU Radio para el remuestreo en cascada de remuestreo.py."""
+from gnuradio import filter
+from gnuradio import gr
+
+from remuestreo import cached_stages
+
+
+class multistage_resampler_ff(gr.hier_block2):
+    """float -> float de fs_in a fs_out con una cadena de rational_resampler_fff pequeños.
+
+    Los taps vienen de remuestreo.cached_stages (memoria + disco), así que reconstruir
+    el bloque con el mismo par de tasas no rediseña nada.
+    """
+
+    def __init__(self, fs_in, fs_out, atten_dB=80.0, fractional_bw=0.4, cache_dir=None):
+        gr.hier_block2.__init__(
+            self, "multistage_resampler_ff",
+            gr.io_signature(1, 1, gr.sizeof_float),
+            gr.io_signature(1, 1, gr.sizeof_float),
+        )
+        self.fs_in = int(fs_in)
+        self.fs_out = int(fs_out)
+        self.plan = cached_stages(self.fs_in, self.fs_out, atten_dB, fractional_bw, cache_dir=cache_dir)
+        self.stages = [
+            filter.rational_resampler_fff(interpolation=s.L, decimation=s.M, taps=s.taps.tolist(), fractional_bw=0)
+            for s in self.plan
+        ]
+        prev = self
+        for st in self.stages:
+            self.connect((prev, 0), (st, 0))
+            prev = st
+        if not self.stages:  # misma tasa
+            self.connect((self, 0), (self, 0))
+        else:
+            self.connect((prev, 0), (self, 0))
@@ -12,8 +12,6 @@ from PyQt5 import Qt
 from gnuradio import qtgui
 from gnuradio import analog
 from gnuradio import blocks
-from gnuradio import filter
-from gnuradio.filter import firdes
 from gnuradio import gr
 from gnuradio.fft import window
 import sys
@@ -25,6 +23,8 @@ from gnuradio import eng_notation
 import sip
 import threading
 
+from remuestreo import smooth_rate
+from remuestreo_gr import multistage_resampler_ff
 
 
 class simulador1(gr.top_block, Qt.QWidget):
@@ -66,7 +66,7 @@ class simulador1(gr.top_block, Qt.QWidget):
         self.fc = fc = 10.7e6
         self.Bm = Bm = 80e3
         self.Fmax = Fmax = fc+Bm/2
-        self.samp_rate = samp_rate = int(Fmax*8*3)
+        self.samp_rate = samp_rate = smooth_rate(Fmax*8*3)  # múltiplo de 44.1 kHz sin primos > 7: remuestreo en etapas chicas
         self.N = N = 2048
         self.samp_rate_voz = samp_rate_voz = 44100
         self.fresol = fresol = samp_rate/N
@@ -76,11 +76,8 @@ class simulador1(gr.top_block, Qt.QWidget):
         # Blocks
         ##################################################
 
-        self.rational_resampler_xxx_0 = filter.rational_resampler_fff(
-                interpolation=int(samp_rate),
-                decimation=int(samp_rate_voz),
-                taps=[],
-                fractional_bw=0)
+        # razón reducida por MCD y repartida en etapas pequeñas (taps en caché de disco)
+        self.rational_resampler_xxx_0 = multistage_resampler_ff(int(samp_rate_voz), int(samp_rate))
         self.qtgui_time_sink_x_0 = qtgui.time_sink_f(
             2048, #size
             samp_rate, #samp_rate
@@ -219,17 +216,29 @@ class simulador1(gr.top_block, Qt.QWidget):
 
     def set_Fmax(self, Fmax):
         self.Fmax = Fmax
-        self.set_samp_rate(int(self.Fmax*8*3))
+        self.set_samp_rate(smooth_rate(self.Fmax*8*3, self.samp_rate_voz))
 
     def get_samp_rate(self):
         return self.samp_rate
 
     def set_samp_rate(self, samp_rate):
+        if int(samp_rate) != self.rational_resampler_xxx_0.fs_out:
+            self._replace_resampler(int(self.samp_rate_voz), int(samp_rate))
         self.samp_rate = samp_rate
         self.set_fresol(self.samp_rate/self.N)
         self.qtgui_freq_sink_x_0.set_frequency_range(0, self.samp_rate)
         self.qtgui_time_sink_x_0.set_samp_rate(self.samp_rate)
 
+    def _replace_resampler(self, fs_in, fs_out):
+        # rational_resampler no admite cambiar la razón: se sustituye la cascada con el grafo bloqueado
+        self.lock()
+        self.disconnect((self.blocks_wavfile_source_0, 0), (self.rational_resampler_xxx_0, 0))
+        self.disconnect((self.rational_resampler_xxx_0, 0), (self.blocks_multiply_const_vxx_0, 0))
+        self.rational_resampler_xxx_0 = multistage_resampler_ff(fs_in, fs_out)
+        self.connect((self.blocks_wavfile_source_0, 0), (self.rational_resampler_xxx_0, 0))
+        self.connect((self.rational_resampler_xxx_0, 0), (self.blocks_multiply_const_vxx_0, 0))
+        self.unlock()
+
     def get_N(self):
         return self.N
 
@@ -242,6 +251,8 @@ class simulador1(gr.top_block, Qt.QWidget):
 
     def set_samp_rate_voz(self, samp_rate_voz):
         self.samp_rate_voz = samp_rate_voz
+        if int(samp_rate_voz) != self.rational_resampler_xxx_0.fs_in:
+            self._replace_resampler(int(samp_rate_voz), int(self.samp_rate))
 
     def get_fresol(self):
         return self.fresol
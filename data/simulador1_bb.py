@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#
+# SPDX-License-Identifier: GPL-3.0
+#
+# GNU Radio Python Flow Graph
+# Title: simulador1 (banda base compleja)
+# GNU Radio version: v3.10.11.0-89-ga17f69e7
+#
+# Variante de simulador1 en banda base: la portadora fc no se muestrea. Cada zona
+# armónica k (fc, 2*fc, 3*fc) se genera como envolvente compleja c[k]*z**k a
+# samp_rate ~ n_harm*Bm (~309 kS/s con Bm = 80 kHz, frente a ~258 MS/s en simulador1)
+# y se muestra en un freq_sink centrado en k*fc. Ver fm_banda_base.py.
+
+from PyQt5 import Qt
+from gnuradio import qtgui
+from gnuradio import analog
+from gnuradio import blocks
+from gnuradio import gr
+from gnuradio.fft import window
+import sys
+import signal
+from argparse import ArgumentParser
+from gnuradio.eng_arg import eng_float, intx
+import sip
+import threading
+
+from fm_banda_base import baseband_rate, harmonic_coeffs, poly_nl_coeffs
+from remuestreo_gr import multistage_resampler_ff
+
+
+class simulador1_bb(gr.top_block, Qt.QWidget):
+
+    def __init__(self, wav='', f_tono=1e3, fc=10.7e6, Bm=80e3, Kf=1, n_harm=3):
+        gr.top_block.__init__(self, "simulador1 (banda base compleja)", catch_exceptions=True)
+        Qt.QWidget.__init__(self)
+        self.setWindowTitle("simulador1 (banda base compleja)")
+        qtgui.util.check_set_qss()
+        self.top_layout = Qt.QVBoxLayout(self)
+        self.top_grid_layout = Qt.QGridLayout()
+        self.top_layout.addLayout(self.top_grid_layout)
+        self.settings = Qt.QSettings("gnuradio/flowgraphs", "simulador1_bb")
+        try:
+            geometry = self.settings.value("geometry")
+            if geometry:
+                self.restoreGeometry(geometry)
+        except BaseException as exc:
+            print(f"Qt GUI: Could not restore geometry: {str(exc)}", file=sys.stderr)
+        self.flowgraph_started = threading.Event()
+
+        ##################################################
+        # Variables
+        ##################################################
+        self.fc = fc
+        self.Bm = Bm
+        self.Kf = Kf
+        self.n_harm = n_harm = max(1, min(3, int(n_harm)))
+        self.N = N = 2048
+        self.samp_rate_voz = samp_rate_voz = 44100
+        # múltiplo de samp_rate_voz: el remuestreo de la voz es una interpolación entera
+        self.samp_rate = samp_rate = baseband_rate(Bm, n_harm, samp_rate_voz)
+        self.fresol = samp_rate/N
+        self.a1, self.a2, self.a3, self.out_gain = 0.20, 0.90, 0.60, 0.8
+        self.c = harmonic_coeffs(poly_nl_coeffs(self.a1, self.a2, self.a3, self.out_gain))
+
+        ##################################################
+        # Blocks
+        ##################################################
+        if wav:
+            self.blocks_wavfile_source_0 = blocks.wavfile_source(wav, True)
+        else:
+            self.blocks_wavfile_source_0 = analog.sig_source_f(samp_rate_voz, analog.GR_COS_WAVE, f_tono, 1, 0, 0)
+        self.rational_resampler_xxx_0 = multistage_resampler_ff(samp_rate_voz, samp_rate)
+        # misma desviación que vco_f(sensibilidad 2*pi) con entrada fc + Kf*m: Kf Hz por unidad
+        self.analog_frequency_modulator_fc_0 = analog.frequency_modulator_fc(2*3.1416*Kf/samp_rate)
+        # z**k encadenando productos: z -> z**2 -> z**3
+        self.blocks_multiply_xx = [blocks.multiply_cc(1) for _ in range(n_harm - 1)]
+        self.blocks_multiply_const = [blocks.multiply_const_cc(float(self.c[k])) for k in range(1, n_harm + 1)]
+        self.qtgui_freq_sinks = []
+        for k in range(1, n_harm + 1):
+            sink = qtgui.freq_sink_c(
+                N, #size
+                window.WIN_BLACKMAN_hARRIS, #wintype
+                k*fc, #fc
+                samp_rate, #bw
+                f"{k}·fc" if k > 1 else "fc", #name
+                1,
+                None # parent
+            )
+            sink.set_update_time(0.10)
+            sink.set_y_axis((-140), 10)
+            sink.set_y_label('Relative Gain', 'dB')
+            sink.enable_autoscale(False)
+            sink.enable_grid(True)
+            sink.set_fft_average(0.2)
+            sink.enable_axis_labels(True)
+            sink.enable_control_panel(False)
+            self.qtgui_freq_sinks.append(sink)
+            self.top_grid_layout.addWidget(sip.wrapinstance(sink.qwidget(), Qt.QWidget), 0, k - 1)
+
+        ##################################################
+        # Connections
+        ##################################################
+        self.connect((self.blocks_wavfile_source_0, 0), (self.rational_resampler_xxx_0, 0))
+        self.connect((self.rational_resampler_xxx_0, 0), (self.analog_frequency_modulator_fc_0, 0))
+        prev = self.analog_frequency_modulator_fc_0
+        self.connect((prev, 0), (self.blocks_multiply_const[0], 0))
+        for i, mul in enumerate(self.blocks_multiply_xx):
+            self.connect((prev, 0), (mul, 0))
+            self.connect((self.analog_frequency_modulator_fc_0, 0), (mul, 1))
+            self.connect((mul, 0), (self.blocks_multiply_const[i + 1], 0))
+            prev = mul
+        for const, sink in zip(self.blocks_multiply_const, self.qtgui_freq_sinks):
+            self.connect((const, 0), (sink, 0))
+
+
+    def closeEvent(self, event):
+        self.settings = Qt.QSettings("gnuradio/flowgraphs", "simulador1_bb")
+        self.settings.setValue("geometry", self.saveGeometry())
+        self.stop()
+        self.wait()
+
+        event.accept()
+
+    def get_fc(self):
+        return self.fc
+
+    def set_fc(self, fc):
+        # solo cambia dónde se dibuja cada zona: no hay tasa ni filtro que rediseñar
+        self.fc = fc
+        for k, sink in enumerate(self.qtgui_freq_sinks, 1):
+            sink.set_frequency_range(k*self.fc, self.samp_rate)
+
+    def get_Bm(self):
+        return self.Bm
+
+    def set_Bm(self, Bm):
+        self.Bm = Bm
+        samp_rate = baseband_rate(Bm, self.n_harm, self.samp_rate_voz)
+        if samp_rate != self.samp_rate:
+            self.set_samp_rate(samp_rate)
+
+    def get_samp_rate(self):
+        return self.samp_rate
+
+    def set_samp_rate(self, samp_rate):
+        # la interpolación del remuestreador es fija: se sustituye el bloque con el grafo bloqueado
+        self.lock()
+        self.disconnect((self.blocks_wavfile_source_0, 0), (self.rational_resampler_xxx_0, 0))
+        self.disconnect((self.rational_resampler_xxx_0, 0), (self.analog_frequency_modulator_fc_0, 0))
+        self.samp_rate = samp_rate
+        self.rational_resampler_xxx_0 = multistage_resampler_ff(self.samp_rate_voz, samp_rate)
+        self.connect((self.blocks_wavfile_source_0, 0), (self.rational_resampler_xxx_0, 0))
+        self.connect((self.rational_resampler_xxx_0, 0), (self.analog_frequency_modulator_fc_0, 0))
+        self.unlock()
+        self.set_fresol(self.samp_rate/self.N)
+        self.analog_frequency_modulator_fc_0.set_sensitivity(2*3.1416*self.Kf/self.samp_rate)
+        self.set_fc(self.fc)
+
+    def get_N(self):
+        return self.N
+
+    def set_N(self, N):
+        self.N = N
+        self.set_fresol(self.samp_rate/self.N)
+
+    def get_fresol(self):
+        return self.fresol
+
+    def set_fresol(self, fresol):
+        self.fresol = fresol
+
+    def get_Kf(self):
+        return self.Kf
+
+    def set_Kf(self, Kf):
+        self.Kf = Kf
+        self.analog_frequency_modulator_fc_0.set_sensitivity(2*3.1416*self.Kf/self.samp_rate)
+
+    def set_nl(self, a1=None, a2=None, a3=None, out_gain=None):
+        """Coeficientes de la no linealidad (como poly_nl_harmonics); actualiza c[k] en caliente."""
+        if a1 is not None: self.a1 = float(a1)
+        if a2 is not None: self.a2 = float(a2)
+        if a3 is not None: self.a3 = float(a3)
+        if out_gain is not None: self.out_gain = float(out_gain)
+        self.c = harmonic_coeffs(poly_nl_coeffs(self.a1, self.a2, self.a3, self.out_gain))
+        for k, const in enumerate(self.blocks_multiply_const, 1):
+            const.set_k(float(self.c[k]))
+
+
+
+def argument_parser():
+    parser = ArgumentParser(description="simulador1 en banda base compleja")
+    parser.add_argument(
+        "--wav", dest="wav", type=str, default='',
+        help="Set WAV de voz (por defecto, tono de prueba) [default=%(default)r]")
+    parser.add_argument(
+        "--f-tono", dest="f_tono", type=eng_float, default=eng_float('1.0k'),
+        help="Set frecuencia del tono de prueba [default=%(default)r]")
+    parser.add_argument(
+        "--fc", dest="fc", type=eng_float, default=eng_float('10.7M'),
+        help="Set portadora [default=%(default)r]")
+    parser.add_argument(
+        "--Bm", dest="Bm", type=eng_float, default=eng_float('80.0k'),
+        help="Set ancho de banda de la señal FM [default=%(default)r]")
+    parser.add_argument(
+        "--Kf", dest="Kf", type=eng_float, default=eng_float('1.0'),
+        help="Set desviación por unidad de la moduladora (Hz) [default=%(default)r]")
+    parser.add_argument(
+        "--n-harm", dest="n_harm", type=intx, default=3,
+        help="Set número de zonas armónicas (1 a 3) [default=%(default)r]")
+    return parser
+
+
+def main(top_block_cls=simulador1_bb, options=None):
+    if options is None:
+        options = argument_parser().parse_args()
+
+    qapp = Qt.QApplication(sys.argv)
+
+    tb = top_block_cls(wav=options.wav, f_tono=options.f_tono, fc=options.fc, Bm=options.Bm,
+                       Kf=options.Kf, n_harm=options.n_harm)
+
+    tb.start()
+    tb.flowgraph_started.set()
+
+    tb.show()
+
+    def sig_handler(sig=None, frame=None):
+        tb.stop()
+        tb.wait()
+
+        Qt.QApplication.quit()
+
+    signal.signal(signal.SIGINT, sig_handler)
+    signal.signal(signal.SIGTERM, sig_handler)
+
+    timer = Qt.QTimer()
+    timer.start(500)
+    timer.timeout.connect(lambda: None)
+
+    qapp.exec_()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#
+# SPDX-License-Identifier: GPL-3.0
+#
+# GNU Radio Python Flow Graph
+# Title: simulador1 (sin interfaz, medida de rendimiento)
+# GNU Radio version: v3.10.11.0-89-ga17f69e7
+#
+# Las cadenas de simulador1, simulador_nolinealidades.FM*.grc y simulador1_bb sin
+# qtgui ni QApplication: se procesan n_samples muestras a la tasa de la cadena (un
+# head a la entrada a tasa de voz, el grafo termina solo) y la salida va a un
+# null_sink, un file_sink, un vector_sink o un acumulador de PSD. Al terminar se
+# leen los contadores de rendimiento de cada bloque (muestras/s de work()).
+#
+#   python simulador1_headless.py --modo pasobanda nolineal bb -n 50M --json res.json
+#   python simulador1_headless.py --modo bb --salida psd --psd psd.npz
+
+import os
+# los contadores de rendimiento se leen de la configuración al cargar gnuradio
+os.environ.setdefault("GR_CONF_PERFCOUNTERS_ON", "True")
+
+import json
+import math
+import time
+from argparse import ArgumentParser
+
+import numpy as np
+from gnuradio import analog
+from gnuradio import blocks
+from gnuradio import gr
+from gnuradio.eng_arg import eng_float, intx
+
+from fm_banda_base import PSDAccumulator, baseband_rate, harmonic_coeffs, poly_nl_coeffs, zone_axis
+from nolineal_gr import poly_nl_harmonics
+from remuestreo import smooth_rate
+from remuestreo_gr import multistage_resampler_ff
+
+MODOS = ("pasobanda", "nolineal", "bb")
+SALIDAS = ("null", "psd", "archivo", "vector")
+
+
+class psd_sink(gr.sync_block):
+    """Sumidero que acumula la PSD de Welch del flujo (fm_banda_base.PSDAccumulator)."""
+
+    def __init__(self, nfft=2048, samp_rate=1.0, complex_in=False):
+        gr.sync_block.__init__(
+            self,
+            name="psd_sink",
+            in_sig=[np.complex64 if complex_in else np.float32],
+            out_sig=None,
+        )
+        self.complex_in = complex_in
+        self.acc = PSDAccumulator(int(nfft), samp_rate)
+
+    def work(self, input_items, output_items):
+        self.acc.feed(input_items[0])
+        return len(input_items[0])
+
+    def psd(self):
+        return self.acc.psd(centered=self.complex_in)
+
+
+class simulador1_headless(gr.top_block):
+
+    def __init__(self, modo="pasobanda", n_samples=int(20e6), salida="null", path="", wav='',
+                 f_tono=1e3, fc=10.7e6, Bm=80e3, Kf=1, n_harm=3, nfft=2048):
+        gr.top_block.__init__(self, f"simulador1 sin interfaz ({modo})", catch_exceptions=True)
+        if modo not in MODOS: raise ValueError(f"modo desconocido: {modo}")
+        if salida not in SALIDAS: raise ValueError(f"salida desconocida: {salida}")
+
+        ##################################################
+        # Variables
+        ##################################################
+        self.modo = modo
+        self.salida = salida
+        self.fc = fc
+        self.Bm = Bm
+        self.Kf = Kf
+        self.nfft = nfft
+        self.samp_rate_voz = samp_rate_voz = 44100
+        if modo == "bb":
+            self.n_harm = n_harm = max(1, min(3, int(n_harm)))
+            self.samp_rate = samp_rate = baseband_rate(Bm, n_harm, samp_rate_voz)
+        else:
+            self.n_harm = n_harm = 1
+            self.samp_rate = samp_rate = smooth_rate((fc + Bm/2)*8*3, samp_rate_voz)  # como simulador1
+        self.n_samples = int(n_samples)
+        # el head va a tasa de voz: más barato y el remuestreador vacía su retardo al terminar
+        self.n_voz = int(math.ceil(self.n_samples*samp_rate_voz/samp_rate))
+
+        ##################################################
+        # Blocks
+        ##################################################
+        if wav:
+            self.blocks_wavfile_source_0 = blocks.wavfile_source(wav, False)
+        else:
+            self.blocks_wavfile_source_0 = analog.sig_source_f(samp_rate_voz, analog.GR_COS_WAVE, f_tono, 1, 0, 0)
+        self.blocks_head_0 = blocks.head(gr.sizeof_float, self.n_voz)
+        self.rational_resampler_xxx_0 = multistage_resampler_ff(samp_rate_voz, samp_rate)
+        self.chain = [("fuente", self.blocks_wavfile_source_0), ("head", self.blocks_head_0)]
+        self.chain += [(f"remuestreo {s.L}/{s.M}", blk) for s, blk in
+                       zip(self.rational_resampler_xxx_0.plan, self.rational_resampler_xxx_0.stages)]
+
+        if modo == "bb":
+            self.analog_frequency_modulator_fc_0 = analog.frequency_modulator_fc(2*3.1416*Kf/samp_rate)
+            c = harmonic_coeffs(poly_nl_coeffs())
+            self.blocks_multiply_xx = [blocks.multiply_cc(1) for _ in range(n_harm - 1)]
+            self.blocks_multiply_const = [blocks.multiply_const_cc(float(c[k])) for k in range(1, n_harm + 1)]
+            self.chain.append(("frequency_modulator_fc", self.analog_frequency_modulator_fc_0))
+            self.chain += [(f"multiply_cc z^{k + 2}", b) for k, b in enumerate(self.blocks_multiply_xx)]
+            self.chain += [(f"multiply_const_cc c[{k}]", b) for k, b in enumerate(self.blocks_multiply_const, 1)]
+            outputs = self.blocks_multiply_const; itemsize = gr.sizeof_gr_complex
+        else:
+            self.blocks_multiply_const_vxx_0 = blocks.multiply_const_ff(Kf)
+            self.analog_const_source_x_1 = analog.sig_source_f(0, analog.GR_CONST_WAVE, 0, 0, fc)
+            self.blocks_add_xx_0 = blocks.add_vff(1)
+            self.blocks_vco_f_0 = blocks.vco_f(samp_rate, (2*3.1416), 1)
+            self.chain += [("multiply_const_ff", self.blocks_multiply_const_vxx_0),
+                           ("add_ff", self.blocks_add_xx_0), ("vco_f", self.blocks_vco_f_0)]
+            outputs = [self.blocks_vco_f_0]; itemsize = gr.sizeof_float
+            if modo == "nolineal":
+                self.epy_block_0 = poly_nl_harmonics()
+                self.chain.append(("poly_nl_harmonics", self.epy_block_0))
+                outputs = [self.epy_block_0]
+
+        self.sinks = []
+        for k, out in enumerate(outputs, 1):
+            if salida == "null":
+                sink = blocks.null_sink(itemsize)
+            elif salida == "psd":
+                sink = psd_sink(nfft, samp_rate, complex_in=(modo == "bb"))
+            elif salida == "archivo":
+                root, ext = os.path.splitext(path or f"simulador1_{modo}.dat")
+                sink = blocks.file_sink(itemsize, f"{root}_{k}{ext}" if len(outputs) > 1 else root + ext, False)
+            else:
+                sink = blocks.vector_sink_c() if modo == "bb" else blocks.vector_sink_f()
+            self.sinks.append(sink)
+            self.chain.append((f"sumidero {salida}" + (f" {k}" if len(outputs) > 1 else ""), sink))
+
+        ##################################################
+        # Connections
+        ##################################################
+        self.connect((self.blocks_wavfile_source_0, 0), (self.blocks_head_0, 0))
+        self.connect((self.blocks_head_0, 0), (self.rational_resampler_xxx_0, 0))
+        if modo == "bb":
+            self.connect((self.rational_resampler_xxx_0, 0), (self.analog_frequency_modulator_fc_0, 0))
+            prev = self.analog_frequency_modulator_fc_0
+            self.connect((prev, 0), (self.blocks_multiply_const[0], 0))
+            for i, mul in enumerate(self.blocks_multiply_xx):
+                self.connect((prev, 0), (mul, 0))
+                self.connect((self.analog_frequency_modulator_fc_0, 0), (mul, 1))
+                self.connect((mul, 0), (self.blocks_multiply_const[i + 1], 0))
+                prev = mul
+        else:
+            self.connect((self.rational_resampler_xxx_0, 0), (self.blocks_multiply_const_vxx_0, 0))
+            self.connect((self.blocks_multiply_const_vxx_0, 0), (self.blocks_add_xx_0, 0))
+            self.connect((self.analog_const_source_x_1, 0), (self.blocks_add_xx_0, 1))
+            self.connect((self.blocks_add_xx_0, 0), (self.blocks_vco_f_0, 0))
+            if modo == "nolineal":
+                self.connect((self.blocks_vco_f_0, 0), (self.epy_block_0, 0))
+        for out, sink in zip(outputs, self.sinks):
+            self.connect((out, 0), (sink, 0))
+
+    def measure(self):
+        """Ejecuta hasta agotar el head y devuelve tiempos y contadores por bloque."""
+        t0 = time.perf_counter()
+        self.run()
+        wall = time.perf_counter() - t0
+        tps = gr.high_res_timer_tps()
+        rows = []
+        for name, blk in self.chain:
+            n_in = blk.nitems_read(0) if blk.input_signature().min_streams() else 0
+            n_out = blk.nitems_written(0) if blk.output_signature().min_streams() else 0
+            busy = blk.pc_work_time_total()/tps
+            n = n_out or n_in
+            rows.append({"bloque": name, "muestras": int(n), "t_work_s": busy,
+                         "MSps": n/busy/1e6 if busy > 0 else float("inf"),
+                         "ocupacion": busy/wall if wall > 0 else 0.0})
+        produced = self.sinks[0].nitems_read(0)
+        return {"modo": self.modo, "salida": self.salida, "samp_rate": self.samp_rate,
+                "muestras": int(produced), "t_s": wall, "MSps": produced/wall/1e6, "bloques": rows}
+
+    def psd(self):
+        """(f_Hz, PSD) de cada salida con salida='psd'; en bb, eje absoluto centrado en k*fc."""
+        out = []
+        for k, sink in enumerate(self.sinks, 1):
+            if self.modo == "bb":
+                f = zone_axis(k, self.fc, self.samp_rate, self.nfft)
+            else:
+                f = np.fft.rfftfreq(self.nfft, 1.0/self.samp_rate)
+            out.append((f, sink.psd()))
+        return out
+
+
+def argument_parser():
+    parser = ArgumentParser(description="simulador1 sin interfaz: rendimiento por bloque y PSD en lote")
+    parser.add_argument(
+        "--modo", dest="modo", nargs="+", choices=MODOS, default=["pasobanda"],
+        help="Set cadenas a ejecutar, una tras otra [default=%(default)r]")
+    parser.add_argument(
+        "-n", "--n-samples", dest="n_samples", type=eng_float, default=eng_float('20M'),
+        help="Set muestras a la tasa de la cadena [default=%(default)r]")
+    parser.add_argument(
+        "--salida", dest="salida", choices=SALIDAS, default="null",
+        help="Set sumidero [default=%(default)r]")
+    parser.add_argument(
+        "--path", dest="path", type=str, default='',
+        help="Set fichero de salida con --salida archivo [default=%(default)r]")
+    parser.add_argument(
+        "--wav", dest="wav", type=str, default='',
+        help="Set WAV de voz (por defecto, tono de prueba) [default=%(default)r]")
+    parser.add_argument(
+        "--f-tono", dest="f_tono", type=eng_float, default=eng_float('1.0k'),
+        help="Set frecuencia del tono de prueba [default=%(default)r]")
+    parser.add_argument(
+        "--fc", dest="fc", type=eng_float, default=eng_float('10.7M'),
+        help="Set portadora [default=%(default)r]")
+    parser.add_argument(
+        "--Bm", dest="Bm", type=eng_float, default=eng_float('80.0k'),
+        help="Set ancho de banda de la señal FM [default=%(default)r]")
+    parser.add_argument(
+        "--Kf", dest="Kf", type=eng_float, default=eng_float('1.0'),
+        help="Set desviación por unidad de la moduladora (Hz) [default=%(default)r]")
+    parser.add_argument(
+        "--n-harm", dest="n_harm", type=intx, default=3,
+        help="Set número de zonas armónicas en bb (1 a 3) [default=%(default)r]")
+    parser.add_argument(
+        "--nfft", dest="nfft", type=intx, default=2048,
+        help="Set puntos de la PSD con --salida psd [default=%(default)r]")
+    parser.add_argument(
+        "--json", dest="json", type=str, default='',
+        help="Set guardar resultados en JSON [default=%(default)r]")
+    parser.add_argument(
+        "--psd", dest="psd", type=str, default='',
+        help="Set guardar las PSD en .npz (con --salida psd) [default=%(default)r]")
+    return parser
+
+
+def main(top_block_cls=simulador1_headless, options=None):
+    if options is None:
+        options = argument_parser().parse_args()
+
+    results = []; spectra = {}
+    for modo in options.modo:
+        tb = top_block_cls(modo=modo, n_samples=options.n_samples, salida=options.salida, path=options.path,
+                           wav=options.wav, f_tono=options.f_tono, fc=options.fc, Bm=options.Bm,
+                           Kf=options.Kf, n_harm=options.n_harm, nfft=options.nfft)
+        res = tb.measure()
+        results.append(res)
+        print(f"{modo}: {res['muestras']} muestras a {res['samp_rate']/1e6:.3f} MS/s en {res['t_s']:.2f} s"
+              f" -> {res['MSps']:.1f} MS/s")
+        for r in res["bloques"]:
+            print(f"  {r['bloque']:<28} {r['muestras']:>12}  {r['MSps']:10.1f} MS/s  {100*r['ocupacion']:5.1f} %")
+        if options.salida == "psd":
+            for k, (f, p) in enumerate(tb.psd(), 1):
+                spectra[f"{modo}_{k}_f_Hz"] = f; spectra[f"{modo}_{k}_psd"] = p
+
+    if options.json:
+        with open(options.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if options.psd and spectra:
+        np.savez(options.psd, **spectra)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+import unittest
+import numpy as np
+from fm_banda_base import FMModulator, baseband_rate, harmonic_coeffs, harmonic_zones, welch_psd, PSDAccumulator
+
+FS = 308700.0
+
+def inst_freq(z, fs):
+    """Frecuencia instantánea (Hz) a partir de la fase desenrollada."""
+    return np.diff(np.unwrap(np.angle(z.astype(np.complex128))))*fs/(2*np.pi)
+
+class TestFMModulator(unittest.TestCase):
+
+    def setUp(self):
+        t = np.arange(int(FS)//10)/FS
+        self.f_tono = 1e3; self.A = 0.5; self.Kf = 150e3  # desviación Kf*A = 75 kHz
+        self.m = self.A*np.cos(2*np.pi*self.f_tono*t)
+
+    def test_tone_deviation(self):
+        z = FMModulator(FS, self.Kf)(self.m)
+        np.testing.assert_allclose(np.abs(z), 1.0, rtol=1e-6)
+        f = inst_freq(z, FS)
+        np.testing.assert_allclose(f, self.Kf*self.m[1:], atol=1.0)
+        self.assertAlmostEqual(f.max(), self.Kf*self.A, delta=1.0)
+
+    def test_phase_continues_across_calls(self):
+        mod = FMModulator(FS, self.Kf); z = np.concatenate([mod(c) for c in np.array_split(self.m, 13)])
+        np.testing.assert_allclose(z, FMModulator(FS, self.Kf)(self.m), atol=1e-4)
+
+    def test_zone_k_multiplies_deviation(self):
+        z = FMModulator(FS, 20e3)(self.m)  # 10 kHz: la zona 3 (30 kHz) cabe en FS
+        zones = harmonic_zones(z, harmonic_coeffs([0.0, 0.16, 0.72, 0.48]), n_harm=3)
+        for k, zk in enumerate(zones, 1):
+            self.assertAlmostEqual(inst_freq(zk, FS).max(), k*20e3*self.A, delta=k*1.0)
+
+    def test_baseband_rate_is_smooth_multiple(self):
+        for Bm in (10e3, 80e3, 81e3, 1e6):
+            fs = baseband_rate(Bm, 3)
+            self.assertEqual(fs % 44100, 0); self.assertGreaterEqual(fs, 3*Bm*1.25)
+
+class TestPSD(unittest.TestCase):
+
+    def test_accumulator_matches_welch(self):
+        x = FMModulator(FS, 150e3)(0.5*np.cos(2*np.pi*1e3*np.arange(50_000)/FS))
+        acc = PSDAccumulator(1024, FS)
+        for c in np.array_split(x, 9): acc.feed(c)
+        np.testing.assert_allclose(acc.psd(), welch_psd(x, FS, 1024), rtol=1e-12)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import numpy as np
+from nolineal import horner, DCBlocker, PolyNL, AMAMPM, saleh, rapp
+
+def dc_reference(x, r):
+    """y[n] = x[n] - x[n-1] + r*y[n-1], muestra a muestra en float64."""
+    y = np.empty(len(x)); x_prev = y_prev = 0.0
+    for n, v in enumerate(np.asarray(x, np.float64)):
+        y_prev = v - x_prev + r*y_prev; x_prev = v; y[n] = y_prev
+    return y
+
+class TestPoly(unittest.TestCase):
+
+    def test_horner_matches_polyval(self):
+        x = np.random.default_rng(0).uniform(-1.5, 1.5, 5000).astype(np.float32)
+        for c in ([0.0, 0.16, 0.72, 0.48], [0.3], [1.0, -2.0, 0.0, 0.5, 0.25]):
+            out = np.empty_like(x)
+            self.assertIs(horner(x, c, out), out)
+            np.testing.assert_allclose(out, np.polyval(c[::-1], x.astype(np.float64)), rtol=1e-5, atol=1e-5)
+
+    def test_polynl_without_dc_and_clip(self):
+        x = np.linspace(-1, 1, 1001, dtype=np.float32); out = np.empty_like(x)
+        nl = PolyNL(a1=0.2, a2=0.9, a3=0.6, out_gain=0.8, remove_dc=False)
+        np.testing.assert_allclose(nl.process(x, out), 0.8*(0.2*x + 0.9*x**2 + 0.6*x**3), rtol=1e-5, atol=1e-6)
+        nl = PolyNL(remove_dc=False, clip=True, clip_min=-0.005, clip_max=0.5)
+        y = nl.process(x, out); self.assertEqual((y.min(), y.max()), (np.float32(-0.005), np.float32(0.5)))
+
+    def test_polynl_removes_dc_across_calls(self):
+        t = np.arange(200_000); x = (0.5*np.cos(2*np.pi*0.01*t)).astype(np.float32)
+        nl = PolyNL(dc_pole=0.999); out = np.empty_like(x)
+        y = np.concatenate([nl.process(c, out[:len(c)]).copy() for c in np.array_split(x, 37)])
+        ref = dc_reference(np.polyval(nl.coeffs[::-1], x.astype(np.float64)), 0.999)
+        np.testing.assert_allclose(y, ref, atol=1e-4)
+        self.assertLess(abs(y[-20_000:].mean()), 1e-3)  # la media (a2*x**2 -> DC) desaparece
+
+class TestDCBlocker(unittest.TestCase):
+
+    def test_step_response(self):
+        r = 0.99; dc = DCBlocker(r); x = np.ones(3000, np.float32); out = np.empty(3000, np.float32)
+        np.testing.assert_allclose(dc.process(x, out), r**np.arange(3000), rtol=1e-5, atol=1e-7)
+
+    def test_matches_recursion_in_chunks(self):
+        x = np.random.default_rng(1).standard_normal(20_000).astype(np.float32) + 3.0
+        for r, block in ((0.999, None), (0.9, 7), (0.5, None)):
+            dc = DCBlocker(r, block); parts = []
+            for c in np.split(x, [1, 2, 100, 5000, 5001, 13_000]):
+                parts.append(dc.process(c, np.empty_like(c)))
+            np.testing.assert_allclose(np.concatenate(parts), dc_reference(x, r), rtol=1e-4, atol=1e-4)
+
+class TestAMAMPM(unittest.TestCase):
+
+    def _envelope(self, r_max):
+        rng = np.random.default_rng(2); n = 4000
+        r = rng.uniform(0.0, r_max, n); ph = rng.uniform(-np.pi, np.pi, n)
+        return r, (r*np.exp(1j*ph)).astype(np.complex64)
+
+    def test_saleh_closed_form(self):
+        aa, ba, ap, bp = 2.1587, 1.1517, 4.0033, 9.1040
+        blk = AMAMPM(saleh(aa, ba, ap, bp), r_max=2.0); r, x = self._envelope(2.0)
+        y = blk.process(x, np.empty_like(x)); keep = r > 1e-3
+        np.testing.assert_allclose(np.abs(y), aa*r/(1 + ba*r**2), atol=2e-4)
+        dphi = np.angle(y[keep]/x[keep]); want = ap*r[keep]**2/(1 + bp*r[keep]**2)
+        np.testing.assert_allclose(dphi, want, atol=2e-4)
+
+    def test_rapp_closed_form_and_saturation(self):
+        g, a_sat, p = 2.0, 1.0, 3.0
+        blk = AMAMPM(rapp(g, a_sat, p), r_max=2.0); r, x = self._envelope(2.0)
+        y = blk.process(x, np.empty_like(x)); keep = r > 1e-3
+        np.testing.assert_allclose(np.abs(y), g*r/(1 + (g*r/a_sat)**(2*p))**(1/(2*p)), atol=2e-4)
+        np.testing.assert_allclose(np.angle(y[keep]/x[keep]), 0.0, atol=1e-5)  # Rapp: sin AM/PM
+        big = (np.array([3.0, 10.0])*np.exp(1j*np.array([0.3, -2.0]))).astype(np.complex64)
+        yb = blk.process(big, np.empty_like(big))
+        a_max = g*2.0/(1 + (g*2.0/a_sat)**(2*p))**(1/(2*p))
+        np.testing.assert_allclose(np.abs(yb), a_max, rtol=1e-5)
+        np.testing.assert_allclose(np.angle(yb), [0.3, -2.0], atol=1e-5)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import numpy as np
+from remuestreo import (MAX_STAGE, Stage, PolyphaseStage, MultistageResampler, plan_ratios, design_stages,
+                        cached_stages, smooth_rate, cost_per_input)
+
+FS_VOZ = 44100
+
+class TestPlan(unittest.TestCase):
+
+    def test_smooth_rate(self):
+        self.assertEqual(smooth_rate(44100), 44100); self.assertEqual(smooth_rate(1), 44100)
+        fs = smooth_rate(int((10.70001e6 + 40e3)*24))
+        self.assertGreaterEqual(fs, (10.70001e6 + 40e3)*24); self.assertEqual(fs % FS_VOZ, 0)
+        self.assertEqual(smooth_rate(11*44100), 12*44100)  # 11 no es 7-liso
+
+    def test_large_prime_rejected(self):
+        for fs in (int((10.70001e6 + 40e3)*24), int((10.70001e6 + 81e3/2)*24)):
+            with self.assertRaises(ValueError): plan_ratios(FS_VOZ, fs)
+
+    def test_taps_bounded_over_fc_bm_sweep(self):
+        for fc in np.r_[10.7e6, 10.70001e6, np.linspace(88e6, 108e6, 11)]:
+            for Bm in (10e3, 40e3, 80e3, 81e3, 150e3, 200e3):
+                need = (fc + Bm/2)*8*3; fs = smooth_rate(need)  # como simulador1
+                self.assertLess(fs, 1.02*need)
+                ratios = plan_ratios(FS_VOZ, fs)
+                self.assertTrue(all(L <= 8 and M == 1 for L, M in ratios), (fc, Bm, ratios))
+                st = design_stages(FS_VOZ, fs)
+                self.assertLess(max(len(s.taps) for s in st), 200, (fc, Bm))
+                self.assertLess(cost_per_input(st)/(fs/FS_VOZ), 16.0)  # MAC por muestra de salida
+
+    def test_rational_ratios_within_limit(self):
+        for a, b in ((44100, 48000), (48000, 44100), (44100, 8000), (44100, 22050)):
+            ratios = plan_ratios(a, b)
+            self.assertLessEqual(max(max(r) for r in ratios), MAX_STAGE)
+            self.assertEqual(np.prod([L for L, _ in ratios])*a, np.prod([M for _, M in ratios])*b)
+
+class TestNumPyResampler(unittest.TestCase):
+
+    def test_polyphase_matches_direct(self):
+        rng = np.random.default_rng(1)
+        for L, M in ((3, 2), (2, 1), (1, 3), (8, 147)):
+            h = rng.standard_normal(37).astype(np.float32); x = rng.standard_normal(2000).astype(np.float32)
+            up = np.zeros(len(x)*L); up[::L] = x
+            ref = np.convolve(up, h)[::M]
+            st = PolyphaseStage(Stage(L, M, h)); y = np.concatenate([st(c) for c in np.split(x, [1, 7, 500, 1333])])
+            self.assertEqual(len(y), -(-len(x)*L//M))
+            np.testing.assert_allclose(y, ref[:len(y)], rtol=1e-4, atol=1e-4)
+
+    def test_tone_matches_delayed_tone(self):
+        f = 1e3; x = np.sin(2*np.pi*f*np.arange(FS_VOZ//5)/FS_VOZ).astype(np.float32)
+        for fs_out in (48000, 22050, 308700, 1411200):
+            r = MultistageResampler(FS_VOZ, fs_out, cache_dir="")
+            y = np.concatenate([r(c) for c in np.array_split(x, 7)])
+            delay = 0.0; rate = float(FS_VOZ)  # retardo de grupo: (N-1)/2 muestras a la tasa L*fs de cada etapa
+            for s in cached_stages(FS_VOZ, fs_out, cache_dir=""): delay += (len(s.taps) - 1)/2/(rate*s.L); rate = rate*s.L/s.M
+            t = np.arange(len(y))/fs_out; keep = (t > delay + 0.02) & (t < len(x)/FS_VOZ - 0.02)
+            err = y[keep] - np.sin(2*np.pi*f*(t[keep] - delay))
+            self.assertLess(10*np.log10(np.mean(err**2)/0.5), -70.0, fs_out)
+
+if __name__ == "__main__":
+    unittest.main()
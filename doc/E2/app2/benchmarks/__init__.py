@@ -0,0 +1 @@
+"""Benchmarks del simulador (núcleo e interfaz). Uso: python -m benchmarks.run --help"""
@@ -0,0 +1,53 @@
+from __future__ import annotations
+import json
+
+from h_simulador.controller import SceneController
+from h_simulador.models import Scene
+from .common import benchmark, build_scene, ids_sample
+
+@benchmark("fspl_all_to_target")
+def fspl_cached(n):
+    """Tabla FSPL hacia el avión con el caché de enlaces al día (refresco de widgets)."""
+    ctrl = SceneController(build_scene(n)); av = ctrl.get_aircraft()
+    return lambda: ctrl.fspl_all_to_target(av)
+
+@benchmark("fspl_all_to_target[arrastre]")
+def fspl_after_move(n):
+    """Mover el avión y pedir la tabla: refresca una fila del caché (arrastre)."""
+    ctrl = SceneController(build_scene(n)); av = ctrl.get_aircraft(); state = [0]
+    def run():
+        state[0] ^= 1; ctrl.set_position(av.id, 50.0 + state[0], 30.0); ctrl.fspl_all_to_target(av)
+    return run
+
+@benchmark("fspl_all_to_target[frio]")
+def fspl_cold(n):
+    """Reconstrucción completa del caché (alta/baja de emisoras o escena nueva)."""
+    ctrl = SceneController(build_scene(n)); av = ctrl.get_aircraft()
+    def run():
+        ctrl.links.invalidate(structural=True); ctrl.fspl_all_to_target(av)
+    return run
+
+@benchmark("stats_overview")
+def stats(n):
+    ctrl = SceneController(build_scene(n)); state = [0]; av = ctrl.get_aircraft()
+    def run():
+        state[0] ^= 1; ctrl.set_position(av.id, 50.0 + state[0], 30.0); ctrl.stats_overview()
+    return run
+
+@benchmark("get_entity×1000")
+def lookups(n):
+    ctrl = SceneController(build_scene(n)); ids = ids_sample(ctrl.scene)
+    def run():
+        for i in ids: ctrl.get_entity(i)
+    return run
+
+@benchmark("to_dict+from_dict")
+def dict_roundtrip(n):
+    scene = build_scene(n)
+    return lambda: Scene.from_dict(scene.to_dict())
+
+@benchmark("json dumps+loads")
+def json_roundtrip(n):
+    """Ida y vuelta completa como la hace 'Guardar/Cargar escena' en JSON (sin disco)."""
+    scene = build_scene(n)
+    return lambda: Scene.from_dict(json.loads(json.dumps(scene.to_dict(), ensure_ascii=False, indent=2)))
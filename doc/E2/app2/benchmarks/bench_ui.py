@@ -0,0 +1,54 @@
+from __future__ import annotations
+import os
+
+from .common import benchmark, build_scene
+
+_app = None
+
+def _qt():
+    """QApplication offscreen compartida (se crea al primer benchmark de interfaz)."""
+    global _app
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6 import QtWidgets
+    _app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    return _app
+
+def _controller(n):
+    _qt()
+    from h_simulador.ui.qt_controller import QtSceneController
+    return QtSceneController(build_scene(n))
+
+@benchmark("FMListWidget.refresh_table", group="ui")
+def fm_table(n):
+    ctrl = _controller(n)
+    from h_simulador.ui.fm_list import FMListWidget
+    w = FMListWidget(ctrl); w.resize(500, 400); w.show(); _app.processEvents()
+    def run():
+        w.refresh_table(); _app.processEvents()
+    run.keep = w  # el widget vive lo que viva la función medida
+    return run
+
+def _canvas(n):
+    ctrl = _controller(n)
+    from h_simulador.ui.canvas import CanvasWidget
+    from h_simulador.utils import UnitsConverter
+    c = CanvasWidget(ctrl, UnitsConverter(km_to_px=10.0)); c.resize(1001, 601); c.show(); _app.processEvents()
+    return ctrl, c
+
+@benchmark("CanvasWidget.paintEvent[completo]", group="ui")
+def paint_full(n):
+    """Repintado completo, incluida la capa estática (zoom, alta de emisoras, escena nueva)."""
+    ctrl, c = _canvas(n)
+    def run():
+        c.invalidate_static(); c.grab()
+    run.keep = c
+    return run
+
+@benchmark("CanvasWidget.paintEvent[arrastre]", group="ui")
+def paint_drag(n):
+    """Repintado con la capa estática en caché tras mover el avión (caso del arrastre)."""
+    ctrl, c = _canvas(n); av = ctrl.get_aircraft(); state = [0]; c.grab()
+    def run():
+        state[0] ^= 1; ctrl.set_position(av.id, 50.0 + state[0], 30.0); ctrl.flush(); c.grab()
+    run.keep = c
+    return run
@@ -0,0 +1,38 @@
+from __future__ import annotations
+from typing import Callable, List, NamedTuple, Sequence
+import numpy as np
+
+from h_simulador.models import Scene, Aircraft, ControlTower, FMTransmitter
+
+SIZES: Sequence[int] = (10, 100, 1000, 10_000)
+
+class Benchmark(NamedTuple):
+    name: str
+    group: str          # "core" (sin Qt) o "ui"
+    make: Callable      # make(n) -> callable sin argumentos que se cronometra
+    sizes: Sequence[int]
+
+BENCHMARKS: List[Benchmark] = []
+
+def benchmark(name: str, group: str = "core", sizes: Sequence[int] = SIZES):
+    """Registra `make(n)`: prepara la escena de n emisoras (no se mide) y devuelve la función a medir."""
+    def deco(make):
+        BENCHMARKS.append(Benchmark(name, group, make, tuple(sizes))); return make
+    return deco
+
+def build_scene(n_fm: int, seed: int = 0) -> Scene:
+    """Escena reproducible: avión, torre y `n_fm` emisoras uniformes en 100 × 60 km."""
+    rng = np.random.default_rng(seed)
+    scene = Scene(ancho_km=100.0, alto_km=60.0)
+    scene.entities.extend([Aircraft(id="AVION1", nombre="Avión", x_km=50.0, y_km=30.0, h_km=2.0),
+                           ControlTower(id="TWR1", nombre="Torre", x_km=5.0, y_km=5.0, h_km=0.05)])
+    x = rng.uniform(0, 100, n_fm); y = rng.uniform(0, 60, n_fm); h = rng.uniform(0.02, 0.3, n_fm)
+    f = (88.1 + 0.1*rng.integers(0, 199, n_fm))*1e6; p = rng.uniform(0.5, 50.0, n_fm)*1e3
+    for i in range(n_fm):
+        scene.entities.append_row("FMTransmitter", id=f"FM_{i+1}", nombre=f"FM_{i+1}", x_km=x[i], y_km=y[i],
+                                  h_km=h[i], f_Hz=f[i], potencia_W=p[i])
+    return scene
+
+def ids_sample(scene: Scene, k: int = 1000, seed: int = 1) -> List[str]:
+    ids = scene.entities.table(FMTransmitter).ids
+    return list(np.random.default_rng(seed).choice(ids, size=k)) if ids else []
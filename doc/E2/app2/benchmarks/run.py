@@ -0,0 +1,115 @@
+"""Ejecuta la suite y escribe los resultados en JSON; opcionalmente compara con una línea base.
+
+    python -m benchmarks.run -o resultados.json
+    python -m benchmarks.run --tamanos 10 100 --filtro fspl --base resultados.json --tolerancia 1.3
+
+Con --base, el código de salida es 1 si alguna mediana empeora más que la tolerancia
+(útil en CI). Cada medida es la mediana de --repeticiones tandas, cada tanda de
+`number` llamadas con `number` elegido para que dure ≥ --min-tanda segundos.
+"""
+from __future__ import annotations
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .common import BENCHMARKS, SIZES, Benchmark
+from . import bench_core  # noqa: F401  (registra benchmarks)
+
+def _load_ui() -> Optional[str]:
+    try:
+        from . import bench_ui  # noqa: F401
+    except ImportError as e:  # sin PySide6: solo núcleo
+        return str(e)
+    return None
+
+def _git_rev() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def metadata() -> Dict:
+    meta = {"fecha": time.strftime("%Y-%m-%dT%H:%M:%S"), "git": _git_rev(), "python": platform.python_version(),
+            "numpy": np.__version__, "plataforma": platform.platform(), "cpu": platform.processor() or platform.machine()}
+    try:
+        import PySide6; meta["pyside6"] = PySide6.__version__
+    except ImportError:
+        pass
+    return meta
+
+def measure(fn, repeat: int = 5, min_batch_s: float = 0.1) -> Dict:
+    fn()  # calentamiento (cachés, imports perezosos)
+    timer = timeit.Timer(fn)
+    number = 1
+    while True:  # como Timer.autorange, pero con umbral configurable
+        if timer.timeit(number) >= min_batch_s or number >= 1_000_000: break
+        number *= 10
+    per_call = [t/number for t in timer.repeat(repeat, number)]
+    return {"number": number, "repeat": repeat, "min_s": min(per_call), "median_s": statistics.median(per_call),
+            "mean_s": statistics.fmean(per_call), "stdev_s": statistics.stdev(per_call) if repeat > 1 else 0.0}
+
+def run_suite(benchmarks: List[Benchmark], sizes: Optional[List[int]] = None, repeat: int = 5,
+              min_batch_s: float = 0.1, log=None) -> List[Dict]:
+    results = []
+    for b in benchmarks:
+        for n in (s for s in b.sizes if sizes is None or s in sizes):
+            fn = b.make(n); r = {"nombre": b.name, "grupo": b.group, "n": n, **measure(fn, repeat, min_batch_s)}
+            del fn
+            results.append(r)
+            if log: log(f"{b.name:<36} n={n:<6} mediana {r['median_s']*1e3:10.3f} ms  (±{r['stdev_s']*1e3:.3f})")
+    return results
+
+def compare(results: List[Dict], base: List[Dict], tolerance: float) -> List[Dict]:
+    """Filas cuya mediana supera a la de la base en más de `tolerance` (razón)."""
+    ref = {(r["nombre"], r["n"]): r["median_s"] for r in base}
+    out = []
+    for r in results:
+        b = ref.get((r["nombre"], r["n"]))
+        if b and r["median_s"] > b*tolerance: out.append({**r, "base_s": b, "razon": r["median_s"]/b})
+    return out
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.run", description="Benchmarks del simulador.")
+    ap.add_argument("-o", "--salida", help="archivo JSON de resultados (por defecto, stdout)")
+    ap.add_argument("--tamanos", type=int, nargs="+", default=None, help=f"número de emisoras (por defecto {list(SIZES)})")
+    ap.add_argument("--filtro", default="*", help="patrón (fnmatch) sobre el nombre del benchmark")
+    ap.add_argument("--grupo", choices=("core", "ui", "todos"), default="todos")
+    ap.add_argument("--repeticiones", type=int, default=5)
+    ap.add_argument("--min-tanda", type=float, default=0.1, help="duración mínima de cada tanda (s)")
+    ap.add_argument("--base", help="JSON de una ejecución anterior para detectar regresiones")
+    ap.add_argument("--tolerancia", type=float, default=1.25, help="razón mediana/base tolerada (por defecto 1.25)")
+    a = ap.parse_args(argv)
+
+    ui_error = _load_ui() if a.grupo != "core" else None
+    pat = a.filtro if any(c in a.filtro for c in "*?[") else f"*{a.filtro}*"
+    sel = [b for b in BENCHMARKS if fnmatch.fnmatch(b.name, pat) and a.grupo in ("todos", b.group)]
+    log = lambda msg: print(msg, file=sys.stderr, flush=True)
+    if ui_error: log(f"benchmarks de interfaz omitidos: {ui_error}")
+    results = run_suite(sel, a.tamanos, a.repeticiones, a.min_tanda, log)
+    doc = {"meta": metadata(), "resultados": results}
+    status = 0
+    if a.base:
+        with open(a.base, encoding="utf-8") as f: base = json.load(f)["resultados"]
+        reg = compare(results, base, a.tolerancia); doc["regresiones"] = reg
+        for r in reg: log(f"REGRESIÓN {r['nombre']} n={r['n']}: ×{r['razon']:.2f} ({r['base_s']*1e3:.3f} → {r['median_s']*1e3:.3f} ms)")
+        status = 1 if reg else 0
+    text = json.dumps(doc, indent=2, ensure_ascii=False)
+    if a.salida:
+        with open(a.salida, "w", encoding="utf-8") as f: f.write(text + "\n")
+    else:
+        print(text)
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,20 @@
-# Re-export útil si lo necesitas desde fuera
-from .models import Entity, FMTransmitter, Aircraft, ControlTower, Scene
-from .controller import SceneController
-from .utils import UnitsConverter, frange
+# Re-export útil si lo necesitas desde fuera (carga perezosa, PEP 562: `import h_simulador`
+# no importa NumPy ni PySide6 hasta que se usa un nombre)
+from importlib import import_module
+
+_EXPORTS = {
+    "Entity": ".models", "FMTransmitter": ".models", "Aircraft": ".models", "ControlTower": ".models", "Scene": ".models",
+    "SceneController": ".controller",
+    "UnitsConverter": ".utils", "frange": ".utils",
+}
+__all__ = list(_EXPORTS)
+
+def __getattr__(name: str):
+    mod = _EXPORTS.get(name)
+    if mod is None: raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(mod, __name__), name)
+    globals()[name] = value  # siguientes accesos sin pasar por aquí
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,163 @@
+from __future__ import annotations
+import argparse
+import csv
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from .models import Scene
+from .scenefile import load_scene
+from .links import LinkCache
+from .intermod import IMCache, IMLimitError, IM_KINDS
+
+# Una fila por (escena, receptor): métricas de enlace e intermodulación
+FIELDS = ["escena", "receptor", "tipo", "n_fm", "p_total_kW",
+          "fspl_min_dB", "fspl_avg_dB", "fspl_max_dB", "mejor_fm", "d_mejor_km",
+          "prx_max_dBm", "prx_total_dBm", "n_sin_los",
+          "n_im", "im_peor_dBm", "im_peor_canal_MHz", "im_peor_tipo", "im_peor_fuentes", "error"]
+
+# --- evaluación de una escena (se ejecuta en los procesos trabajadores) ---
+def evaluate_scene(scene: Scene, name: str = "", tol_Hz: float = 5e3,
+                   max_products: Optional[int] = 5_000_000) -> List[Dict]:
+    """Métricas FSPL / potencia recibida / IM de todas las emisoras hacia cada avión y torre.
+
+    Si la tabla de IM supera `max_products` se conservan las métricas de enlace: las
+    columnas de IM quedan vacías y `error` dice por qué.
+    """
+    links = LinkCache(); res = links.result(scene.entities)
+    tx = res.tx; n = len(tx)
+    im_cache = IMCache(tol_Hz=tol_Hz, max_products=max_products)
+    try: im = im_cache.products(tx.f_Hz); err = None
+    except IMLimitError as e: im = None; err = f"IMLimitError: {e}"
+    rows = []
+    for r, rx_id in enumerate(links.rx_ids):
+        row = {"escena": name, "receptor": rx_id, "tipo": scene.entities.kind_of(scene.entities.get(rx_id)),
+               "n_fm": n, "p_total_kW": float(tx.potencia_W.sum())/1e3}
+        if im is not None: row["n_im"] = len(im)
+        else: row["error"] = err
+        if n:
+            L = res.fspl_dB[r]; prx = res.prx_dBm[r]; best = int(np.argmin(L))
+            row.update(fspl_min_dB=float(L[best]), fspl_avg_dB=float(L.mean()), fspl_max_dB=float(L.max()),
+                       mejor_fm=tx.nombres[best], d_mejor_km=float(res.d_km[r, best]),
+                       prx_max_dBm=float(prx.max()), prx_total_dBm=float(10*np.log10(np.sum(10**(prx/10)))),
+                       n_sin_los=int((~res.los[r]).sum()))
+        if im is not None and len(im):
+            lv = im_cache.levels(tx.f_Hz, res.prx_dBm[r]); p = int(np.argmax(lv))
+            src = [tx.nombres[i] for i in (im.i[p], im.j[p], im.k[p]) if i >= 0]
+            row.update(im_peor_dBm=float(lv[p]), im_peor_canal_MHz=float(im.channels_Hz[im.channel[p]])/1e6,
+                       im_peor_tipo=IM_KINDS[im.kind[p]], im_peor_fuentes="+".join(src))
+        rows.append(row)
+    return rows
+
+def evaluate_file(path: str, tol_Hz: float = 5e3) -> List[Dict]:
+    """Carga una escena (JSON o binaria, ver scenefile.load_scene) y la evalúa.
+
+    Los errores se devuelven como fila con la columna `error` en lugar de abortar el lote.
+    """
+    name = os.path.basename(path)
+    try:
+        scene = load_scene(path)
+        return evaluate_scene(scene, name, tol_Hz)
+    except Exception as e:
+        return [{"escena": name, "error": f"{type(e).__name__}: {e}"}]
+
+# --- salida en streaming ---
+class CsvSink:
+    def __init__(self, path: str):
+        self._f = open(path, "w", newline="", encoding="utf-8")
+        self._w = csv.DictWriter(self._f, fieldnames=FIELDS, restval=""); self._w.writeheader()
+
+    def write(self, rows: List[Dict]):
+        self._w.writerows(rows); self._f.flush()
+
+    def close(self): self._f.close()
+
+class ParquetSink:
+    """Escribe por grupos de filas (requiere pyarrow, dependencia opcional)."""
+    def __init__(self, path: str, group_rows: int = 4096):
+        try:
+            import pyarrow as pa, pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("La salida Parquet requiere pyarrow (pip install pyarrow)") from e
+        self._pa = pa; self._buf: List[Dict] = []; self.group_rows = group_rows
+        text = {"escena", "receptor", "tipo", "mejor_fm", "im_peor_tipo", "im_peor_fuentes", "error"}
+        ints = {"n_fm", "n_sin_los", "n_im"}
+        self._schema = pa.schema([(c, pa.string() if c in text else pa.int64() if c in ints else pa.float64()) for c in FIELDS])
+        self._w = pq.ParquetWriter(path, self._schema)
+
+    def write(self, rows: List[Dict]):
+        self._buf.extend(rows)
+        if len(self._buf) >= self.group_rows: self._flush()
+
+    def _flush(self):
+        if not self._buf: return
+        cols = {c: [r.get(c) for r in self._buf] for c in FIELDS}
+        self._w.write_table(self._pa.Table.from_pydict(cols, schema=self._schema)); self._buf = []
+
+    def close(self): self._flush(); self._w.close()
+
+def open_sink(path: str, fmt: Optional[str] = None):
+    fmt = fmt or ("parquet" if path.lower().endswith((".parquet", ".pq")) else "csv")
+    return ParquetSink(path) if fmt == "parquet" else CsvSink(path)
+
+# --- lote ---
+def scene_files(directory: str, pattern: str = "*.json") -> List[str]:
+    return sorted(str(p) for p in Path(directory).glob(pattern) if p.is_file())
+
+def iter_results(paths: Iterable[str], workers: Optional[int] = None, tol_Hz: float = 5e3,
+                 max_pending: Optional[int] = None) -> Iterator[List[Dict]]:
+    """Evalúa las escenas en un ProcessPoolExecutor y entrega las filas a medida que terminan.
+
+    Como mucho `max_pending` escenas en vuelo (por defecto 4 por proceso), para que
+    miles de archivos no acumulen futuros ni resultados en memoria.
+    """
+    paths = list(paths)
+    if workers == 1 or len(paths) <= 1:
+        for p in paths: yield evaluate_file(p, tol_Hz)
+        return
+    workers = workers or os.cpu_count() or 1
+    limit = max_pending or 4*workers
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        pending = set()
+        for p in paths:
+            pending.add(ex.submit(evaluate_file, p, tol_Hz))
+            if len(pending) >= limit:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done: yield fut.result()
+        for fut in wait(pending).done: yield fut.result()
+
+def run_batch(directory: str, out_path: str, workers: Optional[int] = None, pattern: str = "*.json",
+              fmt: Optional[str] = None, tol_Hz: float = 5e3,
+              progress: Optional[Callable[[int, int], None]] = None) -> int:
+    """Evalúa todas las escenas de `directory` y escribe las filas en `out_path`. Devuelve nº de escenas."""
+    paths = scene_files(directory, pattern)
+    sink = open_sink(out_path, fmt)
+    try:
+        for done, rows in enumerate(iter_results(paths, workers, tol_Hz), 1):
+            sink.write(rows)
+            if progress is not None: progress(done, len(paths))
+    finally:
+        sink.close()
+    return len(paths)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m h_simulador.batch",
+                                 description="Evalúa en lote escenas JSON (FSPL, potencia recibida, intermodulación) sin interfaz gráfica.")
+    ap.add_argument("directorio", help="carpeta con escenas .json (formato de 'Guardar escena')")
+    ap.add_argument("-o", "--salida", default="resultados.csv", help="archivo de salida (.csv o .parquet)")
+    ap.add_argument("-j", "--procesos", type=int, default=None, help="procesos trabajadores (por defecto: núcleos)")
+    ap.add_argument("--patron", default="*.json", help="patrón glob de archivos")
+    ap.add_argument("--formato", choices=("csv", "parquet"), default=None)
+    ap.add_argument("--tol-khz", type=float, default=5.0, help="tolerancia de IM respecto al canal (kHz)")
+    a = ap.parse_args(argv)
+    progress = lambda i, n: print(f"\r{i}/{n} escenas", end="", file=sys.stderr, flush=True)
+    n = run_batch(a.directorio, a.salida, a.procesos, a.patron, a.formato, a.tol_khz*1e3, progress)
+    print(f"\n{n} escenas → {a.salida}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
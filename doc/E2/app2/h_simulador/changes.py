@@ -0,0 +1,47 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, Set, Iterable
+
+# Campos que cambian juntos al mover una entidad
+POSITION = ("x_km", "y_km")
+
+@dataclass
+class ChangeSet:
+    """Conjunto sucio acumulado entre dos notificaciones del controlador.
+
+    - entities: id → nombres de campo modificados (p.ej. {"AVION1": {"x_km","y_km"}})
+    - structural: altas, bajas, renombres o escena nueva; los consumidores
+      deben reconstruir lo que indexen por id o por fila.
+    """
+    entities: Dict[str, Set[str]] = field(default_factory=dict)
+    structural: bool = False
+
+    def __bool__(self) -> bool:
+        return self.structural or bool(self.entities)
+
+    def touch(self, entity_id: str, fields: Iterable[str]) -> None:
+        self.entities.setdefault(entity_id, set()).update(fields)
+
+    def merge(self, other: "ChangeSet") -> None:
+        self.structural = self.structural or other.structural
+        for eid, flds in other.entities.items(): self.touch(eid, flds)
+
+    @property
+    def ids(self) -> Set[str]:
+        return set(self.entities)
+
+    @property
+    def fields(self) -> Set[str]:
+        out: Set[str] = set()
+        for flds in self.entities.values(): out |= flds
+        return out
+
+    def touches(self, *fields: str) -> bool:
+        """True si algún campo de `fields` cambió (o si el cambio es estructural)."""
+        if self.structural: return True
+        want = set(fields)
+        return any(flds & want for flds in self.entities.values())
+
+    def ids_with(self, *fields: str) -> Set[str]:
+        want = set(fields)
+        return {eid for eid, flds in self.entities.items() if flds & want}
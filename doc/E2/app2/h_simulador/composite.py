@@ -0,0 +1,228 @@
+from __future__ import annotations
+import argparse
+import csv
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+
+from .models import Scene, Aircraft
+from .links import LinkCache
+from .intermod import AERO_BAND_HZ, IMLevelModel, aero_channels
+
+# ---------------------------------------------------------------------------
+# Señal compuesta en el receptor: todas las emisoras FM de una escena, cada una en
+# su frecuencia con la potencia recibida (P_tx − FSPL), y la no linealidad del
+# receptor. Envolvente compleja centrada en f0 (zona 1): los productos de orden
+# impar 2f1−f2, f1+f2−f3, 3f1−2f2… caen alrededor de la banda FM, incluida la
+# banda aeronáutica; armónicos y productos de orden par quedan fuera de la zona.
+#
+# Síntesis por FFT con solapamiento-suma: cada emisora se genera a baja tasa
+# (fs_nb) con fase FM analítica evaluada en tiempo absoluto (vectorizado sobre
+# todas las emisoras), su espectro se coloca en el bin de su frecuencia dentro de
+# una FFT ancha (fs = D·fs_nb) y una sola IFFT por trama da la suma. Tramas con
+# ventana de Hann al 50 %, que suman 1.
+# ---------------------------------------------------------------------------
+
+def _dbm_to_w(dbm): return 10.0**((np.asarray(dbm, dtype=np.float64) - 30.0)/10.0)
+def _w_to_dbm(w): return 10.0*np.log10(np.maximum(w, 1e-30)) + 30.0
+
+@dataclass
+class BandpassNonlinearity:
+    """y = g·z·(1 + b3·|z|² + b5·|z|⁴) con |z|² en W (potencia de la envolvente).
+
+    from_model usa los puntos de intercepción de IMLevelModel, así los niveles
+    sintetizados coinciden con los analíticos de intermod: b3 = −1/P_IIP3 da
+    P(2f1−f2) = 2·P1 + P2 − 2·IIP3 (y +6 dB para f1+f2−f3); b5 = −1/P_IIP5²
+    da P(3f1−2f2) = 3·P1 + 2·P2 − 4·IIP5.
+    """
+    b3: float = 0.0
+    b5: float = 0.0
+    gain_dB: float = 0.0
+
+    @classmethod
+    def from_model(cls, model: IMLevelModel, order: int = 5, gain_dB: float = 0.0) -> "BandpassNonlinearity":
+        return cls(b3=-1.0/float(_dbm_to_w(model.iip3_dBm)),
+                   b5=-1.0/float(_dbm_to_w(model.iip5_dBm))**2 if order >= 5 else 0.0, gain_dB=gain_dB)
+
+    @property
+    def order(self) -> int: return 5 if self.b5 else 3 if self.b3 else 1
+
+    def apply(self, z: np.ndarray) -> np.ndarray:
+        p = z.real*z.real + z.imag*z.imag
+        k = 1.0 + self.b3*p
+        if self.b5: k += self.b5*p*p
+        if self.gain_dB: k *= 10.0**(self.gain_dB/20.0)
+        return z*k
+
+@dataclass
+class Stations:
+    """Emisoras tal como llegan al receptor."""
+    f_Hz: np.ndarray
+    prx_dBm: np.ndarray
+    nombres: List[str] = field(default_factory=list)
+
+    def __len__(self) -> int: return len(self.f_Hz)
+
+    @property
+    def total_dBm(self) -> float: return float(_w_to_dbm(np.sum(_dbm_to_w(self.prx_dBm))))
+
+def stations_at(scene: Scene, receiver_id: Optional[str] = None) -> Stations:
+    """Frecuencia y potencia recibida de cada emisora en el receptor (por defecto, el primer avión)."""
+    links = LinkCache(); res = links.result(scene.entities)
+    if receiver_id is None:
+        av = scene.entities.first(Aircraft)
+        if av is None: raise ValueError("La escena no tiene avión: indique el receptor")
+        receiver_id = av.id
+    r = links.rx_index(receiver_id)
+    if r is None: raise ValueError(f"Receptor desconocido: {receiver_id}")
+    return Stations(np.array(res.tx.f_Hz, dtype=np.float64), np.array(res.prx_dBm[r], dtype=np.float64), list(res.tx.nombres))
+
+class StreamingPSD:
+    """PSD de Welch (Blackman-Harris, 50 %) acumulada por bloques de longitud arbitraria."""
+    def __init__(self, nfft: int, samp_rate: float):
+        self.nfft = nfft; self.samp_rate = samp_rate
+        n = np.arange(nfft)
+        self.win = (0.35875 - 0.48829*np.cos(2*np.pi*n/nfft) + 0.14128*np.cos(4*np.pi*n/nfft)
+                    - 0.01168*np.cos(6*np.pi*n/nfft))
+        self._acc = np.zeros(nfft); self._n = 0; self._tail = np.zeros(0, np.complex128)
+
+    def feed(self, x: np.ndarray) -> None:
+        buf = np.concatenate([self._tail, x]); step = self.nfft//2; s = 0
+        while s + self.nfft <= len(buf):
+            self._acc += np.abs(np.fft.fft(buf[s:s + self.nfft]*self.win))**2; self._n += 1; s += step
+        self._tail = buf[s:]
+
+    def psd(self) -> np.ndarray:
+        """W/Hz por bin, centrada (fftshift)."""
+        if not self._n: return np.zeros(self.nfft)
+        return np.fft.fftshift(self._acc/(self._n*self.samp_rate*np.sum(self.win**2)))
+
+@dataclass
+class CompositeSpectrum:
+    f_Hz: np.ndarray            # eje absoluto
+    psd_lineal: np.ndarray      # W/Hz sin no linealidad
+    psd: np.ndarray             # W/Hz tras la no linealidad del receptor
+    samp_rate: float
+    duration_s: float
+
+    def band_power_dBm(self, f_lo: float, f_hi: float, nonlinear: bool = True) -> float:
+        m = (self.f_Hz >= f_lo) & (self.f_Hz <= f_hi); df = self.f_Hz[1] - self.f_Hz[0]
+        return float(_w_to_dbm(np.sum((self.psd if nonlinear else self.psd_lineal)[m])*df))
+
+    def channel_power_dBm(self, f_Hz: float, bw_Hz: float = 25e3, nonlinear: bool = True) -> float:
+        return self.band_power_dBm(f_Hz - bw_Hz/2, f_Hz + bw_Hz/2, nonlinear)
+
+    def report(self, band: Tuple[float, float] = AERO_BAND_HZ, channels: Optional[np.ndarray] = None,
+               bw_Hz: float = 25e3, top: int = 10) -> Dict:
+        """Potencia total en la banda (con y sin no linealidad) y los canales más fuertes (por defecto, aero_channels)."""
+        lo, hi = band; ch = aero_channels() if channels is None else np.asarray(channels, dtype=np.float64)
+        p = np.array([self.channel_power_dBm(c, bw_Hz) for c in ch]); p_lin = np.array([self.channel_power_dBm(c, bw_Hz, False) for c in ch])
+        order = np.argsort(p)[::-1][:top]
+        return {"banda_MHz": (lo/1e6, hi/1e6), "p_total_dBm": self.band_power_dBm(lo, hi),
+                "p_total_lineal_dBm": self.band_power_dBm(lo, hi, False),
+                "canales": [{"f_MHz": float(ch[i])/1e6, "p_dBm": float(p[i]), "p_lineal_dBm": float(p_lin[i])} for i in order]}
+
+class CompositeSynth:
+    """Generador por bloques de la envolvente compleja en el receptor.
+
+        syn = CompositeSynth(stations_at(scene), BandpassNonlinearity.from_model(IMLevelModel()))
+        spec = syn.spectrum(duration_s=0.02)
+    """
+    def __init__(self, stations: Stations, rx: Optional[BandpassNonlinearity] = None,
+                 deviation_Hz: float = 75e3, audio_Hz: Tuple[float, ...] = (400.0, 1900.0, 7300.0),
+                 fs_nb: float = 512e3, n_nb: int = 1024, band: Tuple[float, float] = AERO_BAND_HZ,
+                 f0_Hz: Optional[float] = None, seed: int = 0):
+        if not len(stations): raise ValueError("No hay emisoras que sintetizar")
+        self.st = stations; self.rx = rx or BandpassNonlinearity()
+        f = stations.f_Hz; occ = 2*(deviation_Hz + max(audio_Hz, default=0.0))  # Carson
+        lo, hi = f.min() - occ/2, f.max() + occ/2
+        self.f0 = float(f0_Hz if f0_Hz is not None else (lo + hi)/2)
+        # sin aliasing: los productos de orden n ocupan n·(hi − lo); además debe verse la banda pedida
+        need = max(self.rx.order*(hi - lo), 2*max(abs(band[0] - self.f0), abs(band[1] - self.f0)) + occ)*1.05
+        self.D = D = int(np.ceil(need/fs_nb)); self.samp_rate = D*fs_nb
+        self.fs_nb = fs_nb; self.n_nb = n_nb; self.n_w = D*n_nb
+        # colocación: bin entero + resto en la fase de banda estrecha (posición exacta)
+        df = fs_nb/n_nb; off = f - self.f0
+        self._k = np.round(off/df).astype(np.int64); self._delta = off - self._k*df
+        self._amp = np.sqrt(_dbm_to_w(stations.prx_dBm))*D  # D: escala de la interpolación por relleno espectral
+        rng = np.random.default_rng(seed); S = len(f); J = len(audio_Hz)
+        a = rng.uniform(0.3, 1.0, (S, J)); a /= a.sum(axis=1, keepdims=True)  # pico de desviación = deviation_Hz
+        self._fm = np.asarray(audio_Hz, dtype=np.float64)*rng.uniform(0.9, 1.1, (S, J))
+        self._beta = deviation_Hz*a/self._fm if J else np.zeros((S, 0))  # índice de modulación por tono
+        self._psi = rng.uniform(0, 2*np.pi, (S, J)); self._phi0 = rng.uniform(0, 2*np.pi, S)
+        m = np.arange(n_nb) - n_nb//2
+        self._idx = ((self._k[:, None] + m[None, :]) % self.n_w).ravel()
+        n = np.arange(n_nb); self._win = 0.5 - 0.5*np.cos(2*np.pi*n/n_nb)  # Hann periódica: suma 1 al 50 %
+        self._frame = 0; self._ola = np.zeros(self.n_w, np.complex128)
+
+    def _narrowband(self, frame: int) -> np.ndarray:
+        """(S, n_nb) envolventes de cada emisora en la trama (fase analítica en tiempo absoluto)."""
+        t = (frame*(self.n_nb//2) + np.arange(self.n_nb))/self.fs_nb
+        ph = self._phi0[:, None] + 2*np.pi*self._delta[:, None]*t[None, :]
+        for j in range(self._beta.shape[1]):
+            ph += self._beta[:, j, None]*np.sin(2*np.pi*self._fm[:, j, None]*t[None, :] + self._psi[:, j, None])
+        return np.exp(1j*ph)*(self._amp[:, None]*self._win[None, :])
+
+    def blocks(self) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """(x, y) por bloques de n_w/2 muestras: compuesta lineal y tras la no linealidad."""
+        hop = self.n_w//2
+        while True:
+            X = np.fft.fftshift(np.fft.fft(self._narrowband(self._frame), axis=1), axes=1).ravel()
+            W = np.bincount(self._idx, X.real, self.n_w) + 1j*np.bincount(self._idx, X.imag, self.n_w)
+            self._ola += np.fft.ifft(W)
+            out = self._ola[:hop].copy()
+            self._ola[:hop] = self._ola[hop:]; self._ola[hop:] = 0
+            first = self._frame == 0; self._frame += 1
+            if first: continue  # media trama inicial con una sola ventana
+            yield out, self.rx.apply(out)
+
+    def spectrum(self, duration_s: float = 0.02, nfft: Optional[int] = None, progress=None) -> CompositeSpectrum:
+        """PSD (lineal y no lineal) de `duration_s` segundos de señal; resolución ~ samp_rate/nfft."""
+        nfft = nfft or int(2**np.ceil(np.log2(self.samp_rate/5e3)))
+        p_lin = StreamingPSD(nfft, self.samp_rate); p_nl = StreamingPSD(nfft, self.samp_rate)
+        total = int(duration_s*self.samp_rate); done = 0
+        for x, y in self.blocks():
+            p_lin.feed(x); p_nl.feed(y); done += len(x)
+            if progress is not None: progress(min(1.0, done/total))
+            if done >= total: break
+        f = self.f0 + np.fft.fftshift(np.fft.fftfreq(nfft, 1.0/self.samp_rate))
+        return CompositeSpectrum(f, p_lin.psd(), p_nl.psd(), self.samp_rate, done/self.samp_rate)
+
+# --- línea de comandos ---
+def main(argv=None) -> int:
+    from .scenefile import load_scene
+    ap = argparse.ArgumentParser(prog="python -m h_simulador.composite",
+                                 description="Espectro de la señal compuesta FM en el receptor (banda aeronáutica).")
+    ap.add_argument("escena", help="escena guardada (JSON o binaria)")
+    ap.add_argument("--receptor", help="id del receptor (por defecto, el primer avión)")
+    ap.add_argument("--duracion-ms", type=float, default=20.0)
+    ap.add_argument("--iip3", type=float, default=-10.0, help="IIP3 del receptor (dBm)")
+    ap.add_argument("--iip5", type=float, default=None, help="IIP5 (dBm); sin él, solo tercer orden")
+    ap.add_argument("--desviacion-khz", type=float, default=75.0)
+    ap.add_argument("--csv", help="guardar f_MHz, PSD lineal y no lineal (dBm/Hz)")
+    a = ap.parse_args(argv)
+
+    st = stations_at(load_scene(a.escena), a.receptor)
+    model = IMLevelModel(iip3_dBm=a.iip3, iip5_dBm=a.iip5 if a.iip5 is not None else a.iip3)
+    rx = BandpassNonlinearity.from_model(model, order=5 if a.iip5 is not None else 3)
+    syn = CompositeSynth(st, rx, deviation_Hz=a.desviacion_khz*1e3)
+    if st.total_dBm > a.iip3 - 10.0:  # el polinomio solo vale muy por debajo de compresión
+        print(f"Aviso: potencia total de entrada {st.total_dBm:.1f} dBm cerca o por encima del IIP3; "
+              "niveles de IM sobreestimados", file=sys.stderr)
+    print(f"{len(st)} emisoras, fs = {syn.samp_rate/1e6:.2f} MS/s centrada en {syn.f0/1e6:.3f} MHz", file=sys.stderr)
+    spec = syn.spectrum(a.duracion_ms/1e3)
+    rep = spec.report()
+    print(f"Banda {rep['banda_MHz'][0]:.3f}–{rep['banda_MHz'][1]:.3f} MHz: {rep['p_total_dBm']:.1f} dBm "
+          f"(lineal {rep['p_total_lineal_dBm']:.1f} dBm)")
+    for c in rep["canales"]:
+        print(f"  {c['f_MHz']:9.3f} MHz  {c['p_dBm']:7.1f} dBm  (lineal {c['p_lineal_dBm']:7.1f})")
+    if a.csv:
+        with open(a.csv, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f); w.writerow(["f_MHz", "psd_lineal_dBm_Hz", "psd_dBm_Hz"])
+            for row in zip(spec.f_Hz/1e6, _w_to_dbm(spec.psd_lineal), _w_to_dbm(spec.psd)):
+                w.writerow([f"{v:.6f}" for v in row])
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
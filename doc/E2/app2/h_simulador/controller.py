@@ -1,82 +1,185 @@
 from __future__ import annotations
 import math
-from typing import Optional, List, Dict
-from PySide6 import QtCore
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Sequence, Iterable, Tuple
+import numpy as np
 
 from .models import Scene, Entity, FMTransmitter, Aircraft, ControlTower
+from .propagation import TxColumns, PathLossResult, compute_path_loss
+from .changes import ChangeSet, POSITION
+from .spatial import GridIndex
+from .links import LinkCache
+from .intermod import IMProducts, IMCache, IM_KINDS, find_im_products
+from .events import Event, ImmediateDispatcher
+from .trajectory import Trajectory, TrajectoryMetrics, evaluate_trajectory
 
-class SceneController(QtCore.QObject):
-    sceneChanged = QtCore.Signal()
-    hudChanged = QtCore.Signal()
+class SceneController:
+    """Lógica y cálculos de la escena, sin Qt.
 
-    def __init__(self, scene: Scene):
-        super().__init__()
+    Notifica con `Event` (sceneChanged, hudChanged, changed(ChangeSet)); por
+    defecto entrega de forma síncrona al terminar cada mutación o lote. La interfaz
+    usa ui.qt_controller.QtSceneController, que cambia el despachador por uno con
+    QTimer (coalescencia por frame) y expone las notificaciones como señales Qt.
+    """
+    def __init__(self, scene: Scene, cell_km: float = 2.0, dispatcher=None):
+        self.sceneChanged = Event(); self.hudChanged = Event()
+        self.changed = Event()  # ChangeSet (qué entidades y campos cambiaron)
         self.scene = scene
+        self.spatial = GridIndex(cell_km)
+        self._spatial_key = None  # (escena, structure_rev) con que se construyó el índice
+        self.links = LinkCache()  # enlaces emisora→avión/torre compartidos por HUD, tabla, stats y lienzo
+        self.intermod = IMCache()  # combinaciones de IM (solo dependen de las frecuencias)
+        self._pending = ChangeSet(); self._batch_depth = 0
+        self._dispatcher = dispatcher or ImmediateDispatcher(self._deliver)
+
+    # --- notificaciones ---
+    @contextmanager
+    def batch(self):
+        """Agrupa varias mutaciones en una sola notificación (anidable).
+
+            with controller.batch():
+                controller.set_position(...); controller.update_fm_params(...)
+        """
+        self._batch_depth += 1
+        try: yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._pending: self._dispatcher.schedule()
+
+    def _mark(self, entity_id: Optional[str] = None, fields: Iterable[str] = (), structural: bool = False):
+        self.links.invalidate(entity_id, fields, structural); self.intermod.invalidate(entity_id, fields, structural)
+        if entity_id is not None: self._pending.touch(entity_id, fields)
+        if structural: self._pending.structural = True
+        if self._batch_depth == 0: self._dispatcher.schedule()
+
+    def flush(self):
+        """Entrega ya la notificación pendiente (sin esperar al event loop)."""
+        self._dispatcher.cancel(); self._deliver()
+
+    def _deliver(self):
+        cs = self._pending
+        if not cs: return
+        self._pending = ChangeSet()
+        self.changed.emit(cs); self.sceneChanged.emit(); self.hudChanged.emit()
 
     # --- consulta entidades ---
     def get_entity(self, entity_id: str) -> Optional[Entity]:
-        for e in self.scene.entities:
-            if e.id == entity_id:
-                return e
-        return None
+        return self.scene.entities.get(entity_id)
 
     def get_aircraft(self) -> Optional[Aircraft]:
-        for e in self.scene.entities:
-            if isinstance(e, Aircraft): return e
-        return None
+        return self.scene.entities.first(Aircraft)
 
     def get_control_tower(self) -> Optional[ControlTower]:
-        for e in self.scene.entities:
-            if isinstance(e, ControlTower): return e
-        return None
+        return self.scene.entities.first(ControlTower)
 
     def get_all_fms(self) -> List[FMTransmitter]:
-        return [e for e in self.scene.entities if isinstance(e, FMTransmitter)]
+        return self.scene.entities.of_kind(FMTransmitter)
 
     def has_control_tower(self) -> bool:
         return self.get_control_tower() is not None
 
+    # --- índice espacial ---
+    def _spatial_index(self) -> GridIndex:
+        """Índice espacial al día; se reconstruye solo tras altas/bajas o escena nueva."""
+        store = self.scene.entities
+        key = (id(store), store.structure_rev)
+        if key != self._spatial_key:
+            self.spatial.clear()
+            for kind, d in store.iter_rows(): self.spatial.insert(d["id"], d["x_km"], d["y_km"], kind)
+            self._spatial_key = key
+        return self.spatial
+
+    def entities_in_rect(self, x0_km: float, y0_km: float, x1_km: float, y1_km: float,
+                         kinds: Optional[Iterable[type]] = None) -> List[Entity]:
+        kset = {k.__name__ for k in kinds} if kinds is not None else None
+        return [self.get_entity(i) for i in self._spatial_index().query_rect(x0_km, y0_km, x1_km, y1_km, kset)]
+
+    def pick_entity(self, x_km: float, y_km: float, half_km: float,
+                    exclude: Iterable[type] = (ControlTower,)) -> Optional[Entity]:
+        eid = self._spatial_index().pick(x_km, y_km, half_km, {k.__name__ for k in exclude})
+        return self.get_entity(eid) if eid is not None else None
+
+    def nearest_fm(self, x_km: float, y_km: float) -> Optional[FMTransmitter]:
+        hit = self._spatial_index().nearest(x_km, y_km, {"FMTransmitter"})
+        return self.get_entity(hit[0]) if hit else None
+
     # --- mutaciones ---
     def add_control_tower(self, x_km: float, y_km: float, h_km: float = 0.05) -> Optional[ControlTower]:
         if self.has_control_tower(): return None
         t = ControlTower(id="TWR1", nombre="Torre", x_km=x_km, y_km=y_km, h_km=h_km)
         self._clamp_entity(t); self.scene.entities.append(t)
-        self.sceneChanged.emit(); self.hudChanged.emit()
+        self._mark(t.id, structural=True)
         return t
 
-    def _unique_fm_name(self, desired: str) -> str:
-        names = {e.nombre for e in self.get_all_fms()}
-        if desired not in names: return desired
-        base = desired; i = 2
-        while f"{base}_{i}" in names: i += 1
-        return f"{base}_{i}"
+    def _unique_fm_name(self, desired: str, taken: Optional[set] = None, counters: Optional[Dict[str, int]] = None) -> str:
+        """Nombre libre: `desired` o `desired_2`, `desired_3`…
+
+        En altas masivas se pasan `taken` (nombres ocupados, se actualiza) y `counters`
+        (siguiente sufijo por base) para que cada nombre cueste O(1) y no O(n).
+        """
+        names = taken if taken is not None else set(self.scene.entities.table(FMTransmitter).nombres)
+        name = desired
+        if desired in names:
+            i = counters.get(desired, 2) if counters is not None else 2
+            while f"{desired}_{i}" in names: i += 1
+            name = f"{desired}_{i}"
+            if counters is not None: counters[desired] = i + 1
+        if taken is not None: taken.add(name)
+        return name
 
     def add_fm(self, nombre: str, x_km: float, y_km: float, h_km: float, f_MHz: float, p_kW: float) -> FMTransmitter:
         nombre = self._unique_fm_name(nombre or "FM")
         fm = FMTransmitter(id=nombre, nombre=nombre, x_km=x_km, y_km=y_km, h_km=h_km,
                            f_Hz=f_MHz*1e6, potencia_W=p_kW*1e3)
         self._clamp_entity(fm); self.scene.entities.append(fm)
-        self.sceneChanged.emit(); self.hudChanged.emit()
+        self._mark(fm.id, structural=True)
         return fm
 
+    def add_fms_bulk(self, chunks: Iterable[Dict]) -> int:
+        """Alta masiva de emisoras en una sola transacción (una notificación estructural).
+
+        Cada bloque es un dict de columnas: nombre (lista), x_km, y_km, h_km, f_Hz,
+        potencia_W (arrays). Se consume bloque a bloque, sin materializar el total.
+        Devuelve el número de emisoras agregadas.
+        """
+        store = self.scene.entities; taken = set(store.table(FMTransmitter).nombres)
+        counters: Dict[str, int] = {}; total = 0
+        with self.batch():
+            for ch in chunks:
+                n = len(ch["nombre"])
+                if n == 0: continue
+                names = [self._unique_fm_name(str(nm) or "FM", taken, counters) for nm in ch["nombre"]]
+                cols = {"id": names, "nombre": names,
+                        "x_km": np.clip(ch["x_km"], 0.0, self.scene.ancho_km),
+                        "y_km": np.clip(ch["y_km"], 0.0, self.scene.alto_km),
+                        "h_km": np.maximum(ch["h_km"], 0.0), "f_Hz": ch["f_Hz"], "potencia_W": ch["potencia_W"]}
+                store.extend_rows(FMTransmitter, cols, n); total += n
+            if total: self._mark(structural=True)
+        return total
+
     def update_fm_params(self, fm_id: str, nombre: Optional[str]=None,
                          f_MHz: Optional[float]=None, p_kW: Optional[float]=None):
         e = self.get_entity(fm_id)
         if not isinstance(e, FMTransmitter): return
+        fields = set(); structural = False
         if nombre and nombre.strip():
             new_name = nombre.strip()
             if new_name != e.nombre:
                 new_name = self._unique_fm_name(new_name)
-                e.nombre = new_name; e.id = new_name
-        if f_MHz and f_MHz > 0: e.f_Hz = f_MHz*1e6
-        if p_kW and p_kW > 0:   e.potencia_W = p_kW*1e3
-        self.sceneChanged.emit(); self.hudChanged.emit()
+                old_id = e.id; e.nombre = new_name; e.id = new_name
+                self.spatial.rename(old_id, new_name)
+                fields |= {"nombre", "id"}; structural = True
+        if f_MHz and f_MHz > 0: e.f_Hz = f_MHz*1e6; fields.add("f_Hz")
+        if p_kW and p_kW > 0:   e.potencia_W = p_kW*1e3; fields.add("potencia_W")
+        self._mark(e.id, fields, structural=structural)
 
-    def set_position(self, entity_id: str, x_km: float, y_km: float):
+    def set_position(self, entity_id: str, x_km: float, y_km: float, h_km: Optional[float] = None):
         e = self.get_entity(entity_id)
         if not e: return
         e.move_to(x_km, y_km); self._clamp_entity(e)
-        self.sceneChanged.emit(); self.hudChanged.emit()
+        if h_km is not None: e.h_km = max(0.0, h_km)
+        self.spatial.move(e.id, e.x_km, e.y_km)
+        self._mark(e.id, POSITION + (("h_km",) if h_km is not None else ()))
 
     def _clamp_entity(self, e: Entity):
         e.x_km = max(0.0, min(self.scene.ancho_km, e.x_km))
@@ -93,31 +196,92 @@ class SceneController(QtCore.QObject):
         if not av: return []
         return self.fspl_all_to_target(av)
 
+    def tx_columns(self) -> TxColumns:
+        return TxColumns.from_table(self.scene.entities.table(FMTransmitter))
+
+    def path_loss(self, targets: Sequence[Entity]) -> PathLossResult:
+        """d (3D) y FSPL de todas las emisoras a todos los `targets` en una sola llamada."""
+        col = lambda attr: np.fromiter((getattr(t, attr) for t in targets), dtype=np.float64, count=len(targets))
+        return compute_path_loss(self.tx_columns(), col("x_km"), col("y_km"), col("h_km"))
+
+    def link_budget(self) -> PathLossResult:
+        """Enlaces cacheados de todas las emisoras a todos los aviones/torres (filas = links.rx_ids)."""
+        return self.links.result(self.scene.entities)
+
+    def links_for(self, target: Entity) -> Optional[Tuple[PathLossResult, int]]:
+        """(resultado cacheado, fila) del receptor `target`, o None si no es avión/torre de la escena."""
+        res = self.link_budget()
+        r = self.links.rx_index(target.id) if target is not None else None
+        return (res, r) if r is not None else None
+
     def fspl_all_to_target(self, target: Entity) -> List[Dict]:
-        out = []
-        if not target: return out
-        for fm in self.get_all_fms():
-            d_km = math.hypot(fm.x_km - target.x_km, fm.y_km - target.y_km)
-            f_MHz = fm.f_Hz/1e6
-            fspl  = self.compute_fspl_db(d_km, f_MHz)
-            out.append({"id": fm.id, "nombre": fm.nombre, "f_MHz": f_MHz,
-                        "p_kW": fm.potencia_W/1e3, "d_km": d_km, "fspl_dB": fspl})
-        return out
+        if not target: return []
+        hit = self.links_for(target)
+        if hit: return hit[0].rows(hit[1])
+        return self.path_loss([target]).rows(0)
 
     def stats_overview(self) -> Dict:
-        rows = self.fspl_all_to_aircraft()
-        if not rows:
+        av = self.get_aircraft()
+        hit = self.links_for(av) if av else None
+        if hit is None or len(hit[0].tx) == 0:
             return {"count":0,"p_total_kW":0.0,"fspl_min":None,"fspl_max":None,"fspl_avg":None,"best_fm":None}
-        count = len(rows)
-        p_total = sum(r["p_kW"] for r in rows)
-        fspls = [r["fspl_dB"] for r in rows]
-        best = min(rows, key=lambda r: r["fspl_dB"])
-        return {"count":count, "p_total_kW":p_total,
-                "fspl_min":min(fspls), "fspl_max":max(fspls),
-                "fspl_avg":sum(fspls)/count, "best_fm":best}
+        res, r = hit
+        L = res.fspl_dB[r]; i_best = int(np.argmin(L))
+        return {"count":len(res.tx), "p_total_kW":float(res.p_kW.sum()),
+                "fspl_min":float(L[i_best]), "fspl_max":float(L.max()),
+                "fspl_avg":float(L.mean()), "best_fm":res.row(i_best, r)}
+
+    # --- intermodulación ---
+    def intermod_products(self, channels_Hz: Optional[np.ndarray] = None, tol_Hz: Optional[float] = None) -> IMProducts:
+        """Productos de IM entre emisoras que caen en canales aeronáuticos (índices = filas de tx_columns()).
+
+        Sin argumentos devuelve la tabla memorizada (parámetros de `self.intermod`).
+        """
+        if channels_Hz is None and tol_Hz is None: return self.intermod.products(self.tx_columns().f_Hz)
+        return find_im_products(self.tx_columns().f_Hz, channels_Hz, self.intermod.tol_Hz if tol_Hz is None else tol_Hz,
+                                max_products=self.intermod.max_products)
+
+    def im_levels(self, target: Entity) -> Optional[np.ndarray]:
+        """Nivel (dBm) en `target` (avión/torre) de cada producto de `intermod_products()`."""
+        hit = self.links_for(target) if target is not None else None
+        if hit is None: return None
+        res, r = hit
+        return self.intermod.levels(res.tx.f_Hz, res.prx_dBm[r])
+
+    def worst_im(self, target: Entity) -> Optional[Dict]:
+        """Producto de IM más fuerte en `target`, o None si no hay ninguno en banda."""
+        lv = self.im_levels(target)
+        if lv is None or not len(lv): return None
+        p = int(np.argmax(lv)); im = self.intermod.products(self.tx_columns().f_Hz)
+        names = self.scene.entities.table(FMTransmitter).nombres
+        return {"level_dBm": float(lv[p]), "tipo": IM_KINDS[im.kind[p]], "n_products": len(im),
+                "canal_MHz": float(im.channels_Hz[im.channel[p]])/1e6,
+                "f1": names[im.i[p]], "f2": names[im.j[p]], "f3": names[im.k[p]] if im.k[p] >= 0 else None}
+
+    # --- trayectorias ---
+    def evaluate_trajectory(self, traj: Trajectory) -> TrajectoryMetrics:
+        """Métricas de todas las emisoras a lo largo de `traj` (pasos × emisoras, una pasada)."""
+        return evaluate_trajectory(self.tx_columns().copy(), traj, self.intermod)
+
+    def trajectory_job(self, traj: Trajectory):
+        """Igual que evaluate_trajectory, pero como tarea fn(token, progress) para otro hilo:
+        toma ahora una foto de las emisoras y de la configuración de IM."""
+        tx = self.tx_columns().copy(); im = self.intermod.spawn()
+        return lambda token, progress: evaluate_trajectory(tx, traj, im)
 
     def reset_scene(self):
-        for e in self.scene.entities:
-            if isinstance(e, Aircraft):
-                e.move_to(self.scene.ancho_km*0.5, self.scene.alto_km*0.5)
-        self.sceneChanged.emit(); self.hudChanged.emit()
+        tbl = self.scene.entities.table(Aircraft)
+        tbl["x_km"][:] = self.scene.ancho_km*0.5; tbl["y_km"][:] = self.scene.alto_km*0.5
+        with self.batch():
+            for eid in tbl.ids:
+                self.spatial.move(eid, self.scene.ancho_km*0.5, self.scene.alto_km*0.5)
+                self._mark(eid, POSITION)
+
+    def release_mapped(self):
+        """Copia a memoria las columnas mapeadas del archivo cargado (antes de sobrescribirlo)."""
+        if self.scene.entities.release_mapped(): self.links.clear()  # sus vistas apuntaban al mapa
+
+    def set_scene(self, scene: Scene):
+        """Sustituye la escena completa (p.ej. al cargar desde archivo)."""
+        self.scene = scene
+        self._mark(structural=True)
@@ -0,0 +1,137 @@
+from __future__ import annotations
+import math
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+
+from .propagation import TxColumns, D_MIN_KM
+
+# FSPL lineal: 10^(32.44/10) · d_km² · f_MHz²
+_FSPL_K = 10.0**(32.44/10.0)
+
+TX_PARAMS = ("x_km", "y_km", "h_km", "f_Hz", "potencia_W")  # columnas de TxColumns que usa el raster
+
+class CoverageRaster:
+    """Potencia FM recibida total (suma de todas las emisoras) sobre la escena.
+
+    Rejilla de celdas de `cell_km` sobre ancho_km × alto_km, evaluada en el centro
+    de cada celda a la altitud `h_rx_km` (altura del receptor/avión). Cada emisora
+    aporta P_rx = P_tx / FSPL (lineal, mW), con distancia oblicua 3D.
+
+    - `compute_all` evalúa celdas × emisoras por bloques de filas y de emisoras, de
+      modo que la matriz temporal no supera `max_block` elementos (salvo que una
+      sola fila, nx celdas, ya lo supere).
+    - `update` compara con la copia de las columnas del último cálculo y solo resta
+      y vuelve a sumar la contribución de las que cambiaron (o aparecieron/salieron).
+    """
+    def __init__(self, ancho_km: float, alto_km: float, cell_km: float = 0.1, h_rx_km: float = 2.0,
+                 max_block: int = 4_000_000, refresh_every: int = 256):
+        self.ancho_km = float(ancho_km); self.alto_km = float(alto_km)
+        self.cell_km = float(cell_km); self.h_rx_km = float(h_rx_km)
+        self.max_block = int(max_block); self.refresh_every = int(refresh_every)
+        self.nx = max(1, int(math.ceil(self.ancho_km/self.cell_km)))
+        self.ny = max(1, int(math.ceil(self.alto_km/self.cell_km)))
+        self.xs = (np.arange(self.nx) + 0.5)*self.cell_km
+        self.ys = (np.arange(self.ny) + 0.5)*self.cell_km
+        self.total_mW = np.zeros((self.ny, self.nx))  # fila 0 = sur (y pequeño)
+        self._ids: List[str] = []; self._cols = np.zeros((len(TX_PARAMS), 0))
+        self._incremental = 0
+        self.revision = 0  # cambia cada vez que total_mW cambia
+
+    @property
+    def shape(self) -> Tuple[int, int]: return (self.ny, self.nx)
+
+    def power_dbm(self) -> np.ndarray:
+        return 10.0*np.log10(np.maximum(self.total_mW, 1e-30))
+
+    # --- cálculo ---
+    def _block_shape(self, n_tx: int) -> Tuple[int, int]:
+        """(filas, emisoras) por bloque: filas × nx × emisoras <= max_block."""
+        per_tx = max(1, min(n_tx, self.max_block // self.nx))
+        return max(1, self.max_block // (self.nx*per_tx)), per_tx
+
+    def _block_mW(self, j0: int, j1: int, x, y, h, f, p) -> np.ndarray:
+        """Contribución de las emisoras (x,y,h,f,p: arreglos 1D) a las filas [j0, j1)."""
+        dx = self.xs[None, :, None] - x[None, None, :]
+        dy = self.ys[j0:j1, None, None] - y[None, None, :]
+        d2 = dx*dx + dy*dy + (self.h_rx_km - h)[None, None, :]**2
+        np.maximum(d2, D_MIN_KM*D_MIN_KM, out=d2)
+        f_MHz = f/1e6
+        return ((p*1e3)/(_FSPL_K*f_MHz*f_MHz))[None, None, :] / d2
+
+    def _accumulate(self, x, y, h, f, p, sign: float = 1.0,
+                    progress: Optional[Callable[[float], None]] = None,
+                    cancelled: Optional[Callable[[], bool]] = None) -> bool:
+        rows, per_tx = self._block_shape(len(x))
+        for j0 in range(0, self.ny, rows):
+            if cancelled is not None and cancelled(): return False
+            j1 = min(self.ny, j0 + rows); acc = self.total_mW[j0:j1]
+            for k0 in range(0, len(x), per_tx):  # muchas emisoras: se suman por tramos
+                k = slice(k0, k0 + per_tx)
+                acc += sign*self._block_mW(j0, j1, x[k], y[k], h[k], f[k], p[k]).sum(axis=2)
+            if progress is not None: progress(j1/self.ny)
+        return True
+
+    def compute_all(self, tx: TxColumns, progress: Optional[Callable[[float], None]] = None,
+                    cancelled: Optional[Callable[[], bool]] = None) -> bool:
+        """Recalcula desde cero. Devuelve False si se canceló (el raster queda sin cambios)."""
+        saved = self.total_mW
+        self.total_mW = np.zeros_like(saved)
+        ok = self._accumulate(tx.x_km, tx.y_km, tx.h_km, tx.f_Hz, tx.potencia_W,
+                              progress=progress, cancelled=cancelled)
+        if not ok: self.total_mW = saved; return False
+        self._store(tx); self._incremental = 0; self.revision += 1
+        return True
+
+    def _store(self, tx: TxColumns):
+        self._ids = list(tx.ids)
+        self._cols = np.array([getattr(tx, c) for c in TX_PARAMS], dtype=np.float64).reshape(len(TX_PARAMS), -1)
+
+    def update(self, tx: TxColumns) -> bool:
+        """Actualización incremental. Devuelve True si el raster cambió.
+
+        Compara las columnas de `tx` con la copia guardada (vectorizado): sin cambios
+        en las emisoras, p.ej. al arrastrar el avión, no se copia nada.
+        """
+        cols = [getattr(tx, c) for c in TX_PARAMS]
+        if tx.ids == self._ids:
+            changed = np.zeros(len(tx), dtype=bool)
+            for c, old in zip(cols, self._cols): changed |= c != old
+            if not changed.any(): return False
+            new = np.array(cols, dtype=np.float64)
+            sub = self._cols[:, changed]; add = new[:, changed]; n = add.shape[1]
+        else:  # altas/bajas: se empareja por id
+            new = np.array(cols, dtype=np.float64).reshape(len(TX_PARAMS), -1)
+            pos = {i: k for k, i in enumerate(self._ids)}
+            old_idx = np.array([pos.get(i, -1) for i in tx.ids], dtype=np.intp).reshape(-1)
+            kept = old_idx >= 0; changed = ~kept
+            changed[kept] = (new[:, kept] != self._cols[:, old_idx[kept]]).any(axis=0)
+            stale = np.ones(len(self._ids), dtype=bool); stale[old_idx[kept & ~changed]] = False
+            sub = self._cols[:, stale]; add = new[:, changed]
+            n = add.shape[1] + int(stale.sum()) - int((kept & changed).sum())  # nuevas/cambiadas + bajas
+        if self._incremental + n > self.refresh_every:
+            # evitar deriva numérica de sumas/restas repetidas
+            return self.compute_all(tx)
+        for params, sign in ((sub, -1.0), (add, 1.0)):
+            if params.shape[1]: self._accumulate(*params, sign)
+        np.maximum(self.total_mW, 0.0, out=self.total_mW)
+        self._ids = list(tx.ids); self._cols = new; self._incremental += n; self.revision += 1
+        return True
+
+# --- color ---
+def _colormap_lut(n: int = 256) -> np.ndarray:
+    """Paleta azul→verde→amarillo→rojo (RGBA uint8), de baja a alta potencia."""
+    stops = np.array([[0.0, 20, 40, 120], [0.35, 0, 150, 170], [0.6, 90, 200, 70],
+                      [0.8, 250, 210, 40], [1.0, 220, 40, 30]])
+    t = np.linspace(0.0, 1.0, n)
+    lut = np.empty((n, 4), dtype=np.uint8)
+    for c in range(3): lut[:, c] = np.interp(t, stops[:, 0], stops[:, c+1]).astype(np.uint8)
+    lut[:, 3] = 150
+    return lut
+
+_LUT = _colormap_lut()
+
+def raster_rgba(power_dbm: np.ndarray, vmin_dBm: float = -70.0, vmax_dBm: float = 0.0) -> np.ndarray:
+    """Raster (fila 0 = sur) → imagen RGBA (fila 0 = norte, como en pantalla)."""
+    t = (power_dbm[::-1] - vmin_dBm)/(vmax_dBm - vmin_dBm)
+    idx = np.clip(t*(len(_LUT)-1), 0, len(_LUT)-1).astype(np.intp)
+    return np.ascontiguousarray(_LUT[idx])
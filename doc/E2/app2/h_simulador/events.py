@@ -0,0 +1,33 @@
+from __future__ import annotations
+from typing import Callable, List
+
+class Event:
+    """Observador mínimo sin dependencias (misma API connect/disconnect/emit que una señal Qt).
+
+        ev = Event(); ev.connect(print); ev.emit("hola")
+    """
+    __slots__ = ("_slots",)
+
+    def __init__(self):
+        self._slots: List[Callable] = []
+
+    def connect(self, slot: Callable) -> None:
+        if slot not in self._slots: self._slots.append(slot)
+
+    def disconnect(self, slot: Callable = None) -> None:
+        """Quita `slot` (o todos si no se indica); ignora slots no conectados."""
+        if slot is None: self._slots.clear()
+        elif slot in self._slots: self._slots.remove(slot)
+
+    def emit(self, *args) -> None:
+        for slot in tuple(self._slots): slot(*args)  # copia: un slot puede desconectarse al ejecutarse
+
+    def __len__(self) -> int: return len(self._slots)
+
+class ImmediateDispatcher:
+    """Planificador por defecto del núcleo: entrega en cuanto se pide (sin event loop)."""
+    def __init__(self, deliver: Callable[[], None]):
+        self._deliver = deliver
+
+    def schedule(self): self._deliver()
+    def cancel(self): pass
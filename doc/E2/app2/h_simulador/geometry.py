@@ -0,0 +1,40 @@
+from __future__ import annotations
+from dataclasses import dataclass
+import numpy as np
+
+# Tierra efectiva (refracción troposférica estándar, k = 4/3)
+R_EARTH_KM = 6371.0
+K_FACTOR = 4.0/3.0
+
+def _col(a) -> np.ndarray:
+    return np.atleast_1d(np.asarray(a, dtype=np.float64))
+
+def radio_horizon_km(h1_km, h2_km, k: float = K_FACTOR) -> np.ndarray:
+    """Distancia máxima con visión directa entre dos antenas de alturas h1, h2 (km).
+
+    d = √(2kR·h1) + √(2kR·h2)  (≈ 4.12·(√h1_m + √h2_m) km con k = 4/3).
+    """
+    two_kr = 2.0*k*R_EARTH_KM
+    h1 = np.maximum(np.asarray(h1_km, dtype=np.float64), 0.0)
+    h2 = np.maximum(np.asarray(h2_km, dtype=np.float64), 0.0)
+    return np.sqrt(two_kr*h1) + np.sqrt(two_kr*h2)
+
+@dataclass
+class LinkGeometry:
+    """Geometría de los enlaces transmisor→receptor, matrices de forma (n_rx, n_tx)."""
+    ground_km: np.ndarray   # distancia horizontal
+    slant_km: np.ndarray    # distancia oblicua 3D (la que usa el FSPL)
+    elev_deg: np.ndarray    # elevación del receptor vista desde el transmisor (con curvatura)
+    los: np.ndarray         # bool: el receptor está dentro del horizonte radioeléctrico
+
+def link_geometry(tx_x, tx_y, tx_h, rx_x, rx_y, rx_h, k: float = K_FACTOR) -> LinkGeometry:
+    """Geometría 3D de todos los pares receptor×transmisor en una sola pasada (broadcasting)."""
+    tx_x, tx_y, tx_h = _col(tx_x)[None, :], _col(tx_y)[None, :], _col(tx_h)[None, :]
+    rx_x, rx_y, rx_h = _col(rx_x)[:, None], _col(rx_y)[:, None], _col(rx_h)[:, None]
+    g = np.hypot(rx_x - tx_x, rx_y - tx_y)
+    dh = rx_h - tx_h
+    slant = np.sqrt(g*g + dh*dh)
+    # la caída de la tierra efectiva a distancia g es g²/(2kR): resta g/(2kR) rad al ángulo
+    elev = np.degrees(np.arctan2(dh, g) - g/(2.0*k*R_EARTH_KM))
+    los = g <= radio_horizon_km(tx_h, rx_h, k)
+    return LinkGeometry(ground_km=g, slant_km=slant, elev_deg=elev, los=los)
@@ -0,0 +1,243 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+
+# Productos de intermodulación FM→banda aeronáutica (ITU-R SM.1009, interferencia tipo A1).
+# (nombre, orden, a, b): dos señales f = a·f1 − b·f2; la de tres señales es f1 + f2 − f3.
+IM_TWO_SIGNAL: Tuple[Tuple[str, int, int, int], ...] = (("2f1-f2", 3, 2, 1), ("3f1-2f2", 5, 3, 2))
+IM_THREE_SIGNAL = ("f1+f2-f3", 3)
+IM_KINDS: Tuple[str, ...] = tuple(k[0] for k in IM_TWO_SIGNAL) + (IM_THREE_SIGNAL[0],)
+IM_ORDERS = np.array([k[1] for k in IM_TWO_SIGNAL] + [IM_THREE_SIGNAL[1]], dtype=np.int8)
+
+AERO_BAND_HZ = (117.975e6, 136.0e6)
+
+def aero_channels(f_lo_Hz: float = 118.0e6, f_hi_Hz: float = 136.0e6, step_Hz: float = 25e3) -> np.ndarray:
+    """Canales aeronáuticos protegidos (por defecto VHF COM 118–136 MHz cada 25 kHz)."""
+    n = int(round((f_hi_Hz - f_lo_Hz)/step_Hz)) + 1
+    return f_lo_Hz + step_Hz*np.arange(n)
+
+@dataclass
+class IMProducts:
+    """Productos de intermodulación que caen en canales protegidos (un elemento por producto).
+
+    `i`, `j`, `k` son índices de emisora en el orden de entrada (k = −1 en los de dos
+    señales): 2f1−f2 y 3f1−2f2 usan f1 = f[i], f2 = f[j]; f1+f2−f3 usa f[i] + f[j] − f[k].
+    `channel` indexa `channels_Hz` y `offset_Hz` = f_Hz − canal.
+    """
+    kind: np.ndarray
+    i: np.ndarray
+    j: np.ndarray
+    k: np.ndarray
+    f_Hz: np.ndarray
+    channel: np.ndarray
+    offset_Hz: np.ndarray
+    channels_Hz: np.ndarray
+
+    def __len__(self) -> int: return len(self.kind)
+
+    @property
+    def order(self) -> np.ndarray: return IM_ORDERS[self.kind]
+
+    def channels_hit(self) -> Dict[float, int]:
+        """Canal (MHz) → número de productos que lo alcanzan."""
+        ch, n = np.unique(self.channel, return_counts=True)
+        return {float(self.channels_Hz[c])/1e6: int(m) for c, m in zip(ch, n)}
+
+    def rows(self, names: Sequence[str], limit: Optional[int] = None) -> List[Dict]:
+        """Filas tipo dict (para tablas/exportación), hasta `limit` productos."""
+        n = len(self) if limit is None else min(limit, len(self))
+        name = lambda idx: names[idx] if idx >= 0 else None
+        return [{"tipo": IM_KINDS[self.kind[p]], "orden": int(IM_ORDERS[self.kind[p]]),
+                 "f1": name(int(self.i[p])), "f2": name(int(self.j[p])), "f3": name(int(self.k[p])),
+                 "f_MHz": float(self.f_Hz[p])/1e6, "canal_MHz": float(self.channels_Hz[self.channel[p]])/1e6,
+                 "offset_kHz": float(self.offset_Hz[p])/1e3} for p in range(n)]
+
+# --- núcleo vectorizado ---
+class IMLimitError(ValueError):
+    """La tabla de IM superaría `max_products` (crece ~n³ con el número de emisoras)."""
+
+def _expand(lo: np.ndarray, hi: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Para cada tramo [lo[p], hi[p]) devuelve (p repetido, índices del tramo), sin bucles."""
+    cnt = np.maximum(hi - lo, 0)
+    p = np.repeat(np.arange(len(lo)), cnt)
+    start = np.repeat(lo - (np.cumsum(cnt) - cnt), cnt)
+    return p, start + np.arange(int(cnt.sum()))
+
+def _match(f: np.ndarray, channels: np.ndarray, tol_Hz: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Canal más cercano a cada f; devuelve (máscara |offset| ≤ tol, canal, offset)."""
+    if len(channels) == 1:
+        off = f - channels[0]; return np.abs(off) <= tol_Hz, np.zeros(len(f), dtype=np.intp), off
+    idx = np.clip(np.searchsorted(channels, f), 1, len(channels) - 1)
+    left = channels[idx - 1]; right = channels[idx]
+    ch = np.where(f - left <= right - f, idx - 1, idx)
+    off = f - channels[ch]
+    return np.abs(off) <= tol_Hz, ch, off
+
+def _chunks(counts: np.ndarray, max_block: int):
+    """Cortes [p0, p1) de manera que cada tramo expanda como mucho ~max_block candidatos."""
+    cum = np.cumsum(counts); p0 = 0; n = len(counts)
+    while p0 < n:
+        base = cum[p0-1] if p0 else 0
+        p1 = max(p0 + 1, int(np.searchsorted(cum, base + max_block, side="right")))
+        yield p0, min(p1, n); p0 = p1
+
+def find_im_products(f_Hz, channels_Hz: Optional[np.ndarray] = None, tol_Hz: float = 5e3,
+                     kinds: Sequence[str] = IM_KINDS, max_block: int = 2_000_000,
+                     max_products: Optional[int] = None) -> IMProducts:
+    """Busca todos los productos de IM de las frecuencias `f_Hz` que caen a ≤ tol de un canal.
+
+    Las frecuencias se ordenan una vez; para cada f1 (o par f1, f2) el rango de la
+    otra frecuencia que deja el producto dentro de la banda protegida se obtiene con
+    `searchsorted`, así solo se generan candidatos que ya caen en banda. Los
+    candidatos se procesan por bloques de como mucho `max_block` elementos. Con
+    `max_products` se aborta (IMLimitError) en cuanto la tabla lo supera, antes de
+    agotar la memoria.
+    """
+    f = np.asarray(f_Hz, dtype=np.float64)
+    ch = np.sort(aero_channels() if channels_Hz is None else np.asarray(channels_Hz, dtype=np.float64))
+    perm = np.argsort(f, kind="stable"); fs = f[perm]; n = len(fs)
+    lo = ch[0] - tol_Hz; hi = ch[-1] + tol_Hz
+    out = {name: [] for name in ("kind", "i", "j", "k", "f_Hz", "channel", "offset_Hz")}; total = [0]
+
+    def emit(kind_id, i, j, k, fim):
+        ok, c, off = _match(fim, ch, tol_Hz)
+        total[0] += int(ok.sum())
+        if max_products is not None and total[0] > max_products:
+            raise IMLimitError(f"Más de {max_products} productos de IM con {n} emisoras")
+        for name, v in (("kind", np.full(int(ok.sum()), kind_id, dtype=np.int8)), ("i", perm[i[ok]]), ("j", perm[j[ok]]),
+                        ("k", perm[k[ok]] if k is not None else np.full(int(ok.sum()), -1, dtype=np.intp)),
+                        ("f_Hz", fim[ok]), ("channel", c[ok]), ("offset_Hz", off[ok])):
+            out[name].append(v)
+
+    if n and len(ch):
+        for kind_id, (name, _, a, b) in enumerate(IM_TWO_SIGNAL):
+            if name not in kinds: continue
+            # a·f1 − b·f2 ∈ [lo, hi]  ⇔  f2 ∈ [(a·f1 − hi)/b, (a·f1 − lo)/b]
+            j0 = np.searchsorted(fs, (a*fs - hi)/b, side="left")
+            j1 = np.searchsorted(fs, (a*fs - lo)/b, side="right")
+            for p0, p1 in _chunks(j1 - j0, max_block):
+                pi, j = _expand(j0[p0:p1], j1[p0:p1]); i = pi + p0
+                keep = i != j; i = i[keep]; j = j[keep]
+                emit(kind_id, i, j, None, a*fs[i] - b*fs[j])
+        if IM_THREE_SIGNAL[0] in kinds and n >= 3:
+            kind_id = len(IM_TWO_SIGNAL)
+            # pares i < j por bloques de filas; f3 ∈ [f1 + f2 − hi, f1 + f2 − lo]
+            rows_per = max(1, max_block // n)
+            for r0 in range(0, n - 1, rows_per):
+                r1 = min(n - 1, r0 + rows_per)
+                pi, pj = _expand(np.arange(r0, r1) + 1, np.full(r1 - r0, n)); pi = pi + r0
+                s = fs[pi] + fs[pj]
+                k0 = np.searchsorted(fs, s - hi, side="left"); k1 = np.searchsorted(fs, s - lo, side="right")
+                for p0, p1 in _chunks(k1 - k0, max_block):
+                    q, k = _expand(k0[p0:p1], k1[p0:p1]); i = pi[p0:p1][q]; j = pj[p0:p1][q]
+                    keep = (k != i) & (k != j); i = i[keep]; j = j[keep]; k = k[keep]
+                    emit(kind_id, i, j, k, fs[i] + fs[j] - fs[k])
+
+    cat = lambda name, dt: np.concatenate(out[name]).astype(dt, copy=False) if out[name] else np.empty(0, dtype=dt)
+    return IMProducts(kind=cat("kind", np.int8), i=cat("i", np.intp), j=cat("j", np.intp), k=cat("k", np.intp),
+                      f_Hz=cat("f_Hz", np.float64), channel=cat("channel", np.intp),
+                      offset_Hz=cat("offset_Hz", np.float64), channels_Hz=ch)
+
+# --- niveles en el receptor ---
+@dataclass
+class IMLevelModel:
+    """Modelo de punto de intercepción del receptor (dBm referidos a la entrada).
+
+    Dos señales a·f1 − b·f2 (orden n = a + b): P_IM = a·P1 + b·P2 − (n − 1)·IIP_n.
+    Tres señales f1 + f2 − f3: P_IM = P1 + P2 + P3 − 2·IIP3 + 6 dB.
+    """
+    iip3_dBm: float = -10.0
+    iip5_dBm: float = -10.0
+    three_signal_dB: float = 6.0
+
+    def kind_coefficients(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(A, B, C, K) por tipo de producto (índices de IM_KINDS): P_IM = A·P[i] + B·P[j] + C·P[k] + K."""
+        iip = {3: self.iip3_dBm, 5: self.iip5_dBm}
+        a = [t[2] for t in IM_TWO_SIGNAL] + [1]; b = [t[3] for t in IM_TWO_SIGNAL] + [1]
+        c = [0]*len(IM_TWO_SIGNAL) + [1]
+        k = [-(t[1]-1)*iip[t[1]] for t in IM_TWO_SIGNAL] + [-2*self.iip3_dBm + self.three_signal_dB]
+        return tuple(np.asarray(v, dtype=np.float64) for v in (a, b, c, k))
+
+    def coefficients(self, kind: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(A, B, C, K) por producto."""
+        return tuple(v[kind] for v in self.kind_coefficients())
+
+class IMCache:
+    """Tabla de combinaciones de IM memorizada + niveles recalculados al vuelo.
+
+    La tabla solo depende de las frecuencias: `invalidate` (mismos argumentos que
+    SceneController._mark) la descarta ante cambios de f_Hz o altas/bajas de
+    emisoras; los movimientos no la tocan y `levels` solo reevalúa la suma
+    vectorizada con las potencias recibidas nuevas.
+    """
+    def __init__(self, model: Optional[IMLevelModel] = None, tol_Hz: float = 5e3,
+                 channels_Hz: Optional[np.ndarray] = None, max_products: Optional[int] = 5_000_000):
+        self.model = model or IMLevelModel()
+        self.tol_Hz = tol_Hz; self.channels_Hz = channels_Hz
+        self.max_products = max_products  # ~57 bytes por producto
+        self._im: Union[IMProducts, IMLimitError, None] = None; self._coef = None
+        self.builds = 0  # número de veces que se rehízo la tabla
+
+    def invalidate(self, entity_id: Optional[str] = None, fields: Sequence[str] = (), structural: bool = False):
+        if structural or "f_Hz" in fields: self._im = None
+
+    def configure(self, tol_Hz: Optional[float] = None, channels_Hz: Optional[np.ndarray] = None,
+                  model: Optional[IMLevelModel] = None):
+        if tol_Hz is not None: self.tol_Hz = tol_Hz; self._im = None
+        if channels_Hz is not None: self.channels_Hz = channels_Hz; self._im = None
+        if model is not None: self.model = model; self._coef = None
+
+    def spawn(self) -> "IMCache":
+        """Caché independiente con la misma configuración (para usar desde otro hilo).
+
+        Comparte la tabla ya calculada, que nunca se modifica en sitio.
+        """
+        c = IMCache(self.model, self.tol_Hz, self.channels_Hz, self.max_products); c._im = self._im
+        return c
+
+    def products(self, f_Hz: np.ndarray) -> IMProducts:
+        if self._im is None:
+            self.builds += 1; self._coef = None
+            try: self._im = find_im_products(f_Hz, self.channels_Hz, self.tol_Hz, max_products=self.max_products)
+            except IMLimitError as e: self._im = e  # se recuerda: no reintentar en cada refresco
+        if isinstance(self._im, IMLimitError): raise IMLimitError(*self._im.args)
+        return self._im
+
+    def levels(self, f_Hz: np.ndarray, prx_dBm: np.ndarray) -> np.ndarray:
+        """Nivel (dBm) de cada producto dadas las potencias recibidas de cada emisora.
+
+        `prx_dBm` puede tener forma (n_tx,) o (..., n_tx) (p.ej. pasos × emisoras);
+        el resultado tiene forma (..., n_productos).
+        """
+        im = self.products(f_Hz)
+        if self._coef is None: self._coef = self.model.coefficients(im.kind)
+        if not len(im): return np.empty(np.shape(prx_dBm)[:-1] + (0,))
+        a, b, c, k = self._coef
+        return a*prx_dBm[..., im.i] + b*prx_dBm[..., im.j] + c*prx_dBm[..., im.k] + k
+
+    def worst(self, f_Hz: np.ndarray, prx_dBm: np.ndarray, max_block: int = 4_000_000) -> Tuple[np.ndarray, np.ndarray]:
+        """Producto más fuerte en cada fila de `prx_dBm` (pasos × emisoras): (nivel_dBm, índice o −1).
+
+        Equivale a `levels(...).max(axis=-1)` sin materializar pasos × productos: recorre
+        los productos por tipo (coeficientes escalares) en bloques, sobre la matriz
+        transpuesta emisora × paso para que cada gather copie filas contiguas.
+        """
+        im = self.products(f_Hz); prx = np.atleast_2d(prx_dBm); T = prx.shape[0]
+        best = np.full(T, -np.inf); arg = np.full(T, -1, dtype=np.intp)
+        if not len(im) or not T: return np.full(T, np.nan), arg
+        pT = np.ascontiguousarray(prx.T)
+        A, B, C, K = self.model.kind_coefficients(); blk = max(1, max_block // T)
+        for kid in range(len(IM_KINDS)):
+            idx = np.flatnonzero(im.kind == kid)
+            for p0 in range(0, len(idx), blk):
+                sel = idx[p0:p0+blk]
+                lv = pT[im.i[sel]]
+                if A[kid] != 1: lv *= A[kid]
+                tmp = pT[im.j[sel]]
+                if B[kid] != 1: tmp *= B[kid]
+                lv += tmp
+                if C[kid]: lv += pT[im.k[sel]]
+                am = lv.argmax(axis=0); m = lv[am, np.arange(T)] + K[kid]
+                better = m > best; best[better] = m[better]; arg[better] = sel[am[better]]
+        return best, arg
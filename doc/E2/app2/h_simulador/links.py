@@ -0,0 +1,90 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+import numpy as np
+
+from .geometry import link_geometry
+from .propagation import TxColumns, PathLossResult, fspl_db
+
+class LinkCache:
+    """Enlaces emisora→receptor (avión/torre) calculados una vez y compartidos.
+
+    Guarda un PathLossResult 3D de forma (n_rx, n_tx) para todos los receptores
+    de la escena. `invalidate` recibe lo mismo que SceneController._mark; al pedir
+    `result` solo se recalculan las columnas de las emisoras que se movieron
+    (o cambiaron de frecuencia) y las filas de los receptores que se movieron.
+    Altas, bajas y renombres reconstruyen todo. Las matrices se actualizan en
+    sitio: quien necesite comparar con valores anteriores debe copiarlas.
+    """
+    TX_FIELDS = frozenset({"x_km", "y_km", "h_km", "f_Hz"})
+    RX_FIELDS = frozenset({"x_km", "y_km", "h_km"})
+
+    def __init__(self, tx_kind: str = "FMTransmitter", rx_kinds: Sequence[str] = ("Aircraft", "ControlTower")):
+        self.tx_kind = tx_kind; self.rx_kinds = tuple(rx_kinds)
+        self._res: Optional[PathLossResult] = None
+        self._key = None  # (store, structure_rev) del último cálculo completo
+        self._tx_col: Dict[str, int] = {}; self._rx_row: Dict[str, int] = {}
+        self._rx_ids: List[str] = []
+        self._dirty: Set[str] = set(); self._full = True
+        self.revision = 0  # cambia cada vez que se recalcula algo
+
+    # --- invalidación ---
+    def invalidate(self, entity_id: Optional[str] = None, fields: Iterable[str] = (), structural: bool = False):
+        if structural: self._full = True
+        if entity_id is not None and (self.TX_FIELDS | self.RX_FIELDS).intersection(fields):
+            self._dirty.add(entity_id)
+
+    def clear(self):
+        """Descarta el resultado (y sus vistas de las columnas de la escena); se recalcula al pedirlo."""
+        self._res = None; self._full = True
+
+    # --- consulta ---
+    @property
+    def rx_ids(self) -> List[str]: return self._rx_ids
+
+    def rx_index(self, entity_id: str) -> Optional[int]: return self._rx_row.get(entity_id)
+    def tx_index(self, entity_id: str) -> Optional[int]: return self._tx_col.get(entity_id)
+
+    def result(self, store) -> PathLossResult:
+        key = (id(store), store.structure_rev)
+        if self._full or key != self._key or self._res is None:
+            self._rebuild(store); self._key = key
+        elif self._dirty:
+            self._refresh(store)
+        return self._res
+
+    # --- cálculo ---
+    def _rx_columns(self, store):
+        tbls = [store.table(k) for k in self.rx_kinds]
+        cat = lambda c: np.concatenate([t[c] for t in tbls]) if tbls else np.empty(0)
+        return cat("x_km"), cat("y_km"), cat("h_km")
+
+    def _rebuild(self, store):
+        tx = TxColumns.from_table(store.table(self.tx_kind))
+        self._rx_ids = [i for k in self.rx_kinds for i in store.table(k).ids]
+        self._tx_col = {eid: i for i, eid in enumerate(tx.ids)}
+        self._rx_row = {eid: r for r, eid in enumerate(self._rx_ids)}
+        rx_x, rx_y, rx_h = self._rx_columns(store)
+        g = link_geometry(tx.x_km, tx.y_km, tx.h_km, rx_x, rx_y, rx_h)
+        self._res = PathLossResult(tx=tx, d_km=g.slant_km, fspl_dB=fspl_db(g.slant_km, (tx.f_Hz/1e6)[None, :]),
+                                   ground_km=g.ground_km, elev_deg=g.elev_deg, los=g.los)
+        self._dirty.clear(); self._full = False; self.revision += 1
+
+    def _store(self, rows, cols, g, f_MHz):
+        r = self._res
+        r.d_km[rows, cols] = g.slant_km; r.fspl_dB[rows, cols] = fspl_db(g.slant_km, f_MHz)
+        r.ground_km[rows, cols] = g.ground_km; r.elev_deg[rows, cols] = g.elev_deg; r.los[rows, cols] = g.los
+
+    def _refresh(self, store):
+        tx = self._res.tx
+        cols = np.array(sorted(self._tx_col[i] for i in self._dirty if i in self._tx_col), dtype=np.intp)
+        rows = np.array(sorted(self._rx_row[i] for i in self._dirty if i in self._rx_row), dtype=np.intp)
+        self._dirty.clear()
+        if not len(cols) and not len(rows): return
+        rx_x, rx_y, rx_h = self._rx_columns(store)
+        if len(cols):  # emisoras modificadas × todos los receptores
+            g = link_geometry(tx.x_km[cols], tx.y_km[cols], tx.h_km[cols], rx_x, rx_y, rx_h)
+            self._store(slice(None), cols, g, (tx.f_Hz[cols]/1e6)[None, :])
+        if len(rows):  # receptores movidos × todas las emisoras
+            g = link_geometry(tx.x_km, tx.y_km, tx.h_km, rx_x[rows], rx_y[rows], rx_h[rows])
+            self._store(rows, slice(None), g, (tx.f_Hz/1e6)[None, :])
+        self.revision += 1
@@ -1,6 +1,8 @@
 from __future__ import annotations
 from dataclasses import dataclass, asdict, field
-from typing import List, Dict
+from typing import Dict
+
+from .store import SceneStore, bind_fields
 
 @dataclass
 class Entity:
@@ -28,49 +30,59 @@ class Aircraft(Entity): ...
 @dataclass
 class ControlTower(Entity): ...
 
+# Los campos pasan a ser vistas sobre las columnas de SceneStore (ver store.py)
+ENTITY_KINDS: Dict[str, type] = {"Entity": Entity, "FMTransmitter": FMTransmitter,
+                                 "Aircraft": Aircraft, "ControlTower": ControlTower}
+for _cls in ENTITY_KINDS.values(): bind_fields(_cls)
+
+def new_store(entities=()) -> SceneStore:
+    return SceneStore(ENTITY_KINDS, entities)
+
 @dataclass
 class Scene:
     ancho_km: float = 100.0
     alto_km: float = 60.0
     frecuencia_Hz: float = 100e6  # compat
-    entities: List[Entity] = field(default_factory=list)
+    entities: SceneStore = field(default_factory=new_store)
+
+    def __post_init__(self):
+        if not isinstance(self.entities, SceneStore):
+            self.entities = new_store(self.entities)
 
     def to_dict(self) -> dict:
         ents = []
-        for e in self.entities:
-            if isinstance(e, FMTransmitter): etype = "FMTransmitter"
-            elif isinstance(e, Aircraft):    etype = "Aircraft"
-            elif isinstance(e, ControlTower): etype = "ControlTower"
-            else:                             etype = "Entity"
-            d = e.to_dict(); d["type"] = etype
+        for etype, d in self.entities.iter_rows():
+            d["type"] = etype
             ents.append(d)
         return {"scene": {"ancho_km": self.ancho_km, "alto_km": self.alto_km, "frecuencia_Hz": self.frecuencia_Hz},
                 "entities": ents}
 
+    def set_params(self, s: dict):
+        """Aplica la cabecera "scene" del JSON (dimensiones y frecuencia por defecto)."""
+        self.ancho_km = float(s.get("ancho_km", 100.0))
+        self.alto_km = float(s.get("alto_km", 60.0))
+        self.frecuencia_Hz = float(s.get("frecuencia_Hz", 100e6))
+
     @staticmethod
     def from_dict(data: dict) -> "Scene":
-        s = data.get("scene", {})
-        ancho_km = float(s.get("ancho_km", 100.0))
-        alto_km = float(s.get("alto_km", 60.0))
-        frecuencia_Hz = float(s.get("frecuencia_Hz", 100e6))
-        ents: List[Entity] = []
+        scene = Scene(); scene.set_params(data.get("scene", {}))
         for ej in data.get("entities", []):
-            etype = ej.get("type", "Entity")
-            base = dict(
-                id=str(ej.get("id","")),
-                nombre=str(ej.get("nombre","")),
-                x_km=float(ej.get("x_km",0.0)),
-                y_km=float(ej.get("y_km",0.0)),
-                h_km=float(ej.get("h_km",0.0)),
-            )
-            if etype == "FMTransmitter":
-                ents.append(FMTransmitter(**base,
-                    potencia_W=float(ej.get("potencia_W",10e3)),
-                    f_Hz=float(ej.get("f_Hz",frecuencia_Hz))))
-            elif etype == "Aircraft":
-                ents.append(Aircraft(**base))
-            elif etype == "ControlTower":
-                ents.append(ControlTower(**base))
-            else:
-                ents.append(Entity(**base))
-        return Scene(ancho_km=ancho_km, alto_km=alto_km, frecuencia_Hz=frecuencia_Hz, entities=ents)
+            etype, values = entity_row(ej, scene.frecuencia_Hz)
+            scene.entities.append_row(etype, **values)
+        return scene
+
+def entity_row(ej: dict, frecuencia_Hz: float = 100e6):
+    """(tipo, valores) de una entidad del JSON, lista para SceneStore.append_row."""
+    etype = ej.get("type", "Entity")
+    if etype not in ENTITY_KINDS: etype = "Entity"
+    base = dict(
+        id=str(ej.get("id","")),
+        nombre=str(ej.get("nombre","")),
+        x_km=float(ej.get("x_km",0.0)),
+        y_km=float(ej.get("y_km",0.0)),
+        h_km=float(ej.get("h_km",0.0)),
+    )
+    if etype == "FMTransmitter":
+        base["potencia_W"] = float(ej.get("potencia_W",10e3))
+        base["f_Hz"] = float(ej.get("f_Hz",frecuencia_Hz))
+    return etype, base
@@ -0,0 +1,205 @@
+from __future__ import annotations
+import argparse
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+
+from .propagation import TxColumns, compute_path_loss
+from .intermod import IMCache
+
+# --- estadística en streaming (combinable entre procesos) ---
+class RunningStats:
+    """Media/varianza de Welford + mín/máx; `merge` usa la fórmula de Chan (resultado exacto)."""
+    __slots__ = ("n", "mean", "m2", "min", "max")
+
+    def __init__(self):
+        self.n = 0; self.mean = 0.0; self.m2 = 0.0; self.min = math.inf; self.max = -math.inf
+
+    def add(self, x: float):
+        self.n += 1; d = x - self.mean
+        self.mean += d/self.n; self.m2 += d*(x - self.mean)
+        if x < self.min: self.min = x
+        if x > self.max: self.max = x
+
+    def merge(self, o: "RunningStats") -> "RunningStats":
+        if o.n == 0: return self
+        n = self.n + o.n; d = o.mean - self.mean
+        self.mean += d*o.n/n; self.m2 += o.m2 + d*d*self.n*o.n/n; self.n = n
+        self.min = min(self.min, o.min); self.max = max(self.max, o.max)
+        return self
+
+    @property
+    def var(self) -> float: return self.m2/(self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def std(self) -> float: return math.sqrt(self.var)
+
+class HistogramSketch:
+    """Cuantiles aproximados con histograma fijo [lo, hi) de `bins` celdas (memoria constante).
+
+    El error de un cuantil es como mucho el ancho de celda; valores fuera de rango
+    se acumulan en las celdas extremas. Dos sketches con la misma rejilla se suman.
+    """
+    __slots__ = ("lo", "hi", "counts")
+
+    def __init__(self, lo: float, hi: float, bins: int = 2000):
+        self.lo = float(lo); self.hi = float(hi); self.counts = np.zeros(int(bins), dtype=np.int64)
+
+    @property
+    def width(self) -> float: return (self.hi - self.lo)/len(self.counts)
+
+    def add(self, x: float):
+        i = int(math.floor((x - self.lo)/self.width))
+        self.counts[min(max(i, 0), len(self.counts) - 1)] += 1
+
+    def merge(self, o: "HistogramSketch") -> "HistogramSketch":
+        if (o.lo, o.hi, len(o.counts)) != (self.lo, self.hi, len(self.counts)): raise ValueError("Rejillas distintas")
+        self.counts += o.counts; return self
+
+    def quantile(self, q: float) -> float:
+        total = int(self.counts.sum())
+        if total == 0: return math.nan
+        cum = np.cumsum(self.counts); target = q*total
+        i = int(np.searchsorted(cum, target, side="left")); i = min(i, len(cum) - 1)
+        prev = cum[i-1] if i else 0
+        frac = (target - prev)/self.counts[i] if self.counts[i] else 0.0  # interpolación dentro de la celda
+        return self.lo + (i + frac)*self.width
+
+class MetricSummary:
+    """RunningStats + HistogramSketch de una métrica."""
+    def __init__(self, lo: float = -250.0, hi: float = 50.0, bins: int = 3000):
+        self.stats = RunningStats(); self.sketch = HistogramSketch(lo, hi, bins)
+
+    def add(self, x: float):
+        if x == x: self.stats.add(x); self.sketch.add(x)  # NaN: métrica no definida en ese ensayo
+
+    def merge(self, o: "MetricSummary") -> "MetricSummary":
+        self.stats.merge(o.stats); self.sketch.merge(o.sketch); return self
+
+    def to_dict(self) -> Dict:
+        s = self.stats
+        return {"n": s.n, "media": s.mean if s.n else None, "desv": s.std if s.n else None,
+                "min": s.min if s.n else None, "max": s.max if s.n else None,
+                **{f"p{int(q*100):02d}": (self.sketch.quantile(q) if s.n else None) for q in (0.05, 0.5, 0.95, 0.99)}}
+
+# --- muestreo ---
+@dataclass
+class DeploymentSampler:
+    """Distribuciones de un despliegue aleatorio de emisoras y de la posición del avión."""
+    ancho_km: float = 100.0
+    alto_km: float = 60.0
+    n_fm: Tuple[int, int] = (10, 40)              # uniforme entero [min, max]
+    f_MHz: Tuple[float, float] = (88.1, 107.9)    # banda FM, en la rejilla f_step_MHz
+    f_step_MHz: float = 0.1
+    p_kW: Tuple[float, float] = (0.5, 50.0)       # log-uniforme
+    h_fm_km: Tuple[float, float] = (0.02, 0.3)
+    h_av_km: Tuple[float, float] = (0.5, 3.0)
+    tol_Hz: float = 5e3
+
+    def sample(self, rng: np.random.Generator) -> Tuple[TxColumns, Tuple[float, float, float]]:
+        n = int(rng.integers(self.n_fm[0], self.n_fm[1] + 1))
+        steps = int(round((self.f_MHz[1] - self.f_MHz[0])/self.f_step_MHz))
+        f = (self.f_MHz[0] + self.f_step_MHz*rng.integers(0, steps + 1, n))*1e6
+        p = np.exp(rng.uniform(np.log(self.p_kW[0]), np.log(self.p_kW[1]), n))*1e3
+        ids = [f"FM_{i+1}" for i in range(n)]
+        tx = TxColumns(ids=ids, nombres=ids, x_km=rng.uniform(0, self.ancho_km, n), y_km=rng.uniform(0, self.alto_km, n),
+                       h_km=rng.uniform(*self.h_fm_km, n), f_Hz=f, potencia_W=p)
+        av = (float(rng.uniform(0, self.ancho_km)), float(rng.uniform(0, self.alto_km)), float(rng.uniform(*self.h_av_km)))
+        return tx, av
+
+# métrica → rejilla del histograma (lo, hi, celdas)
+METRICS: Dict[str, Tuple[float, float, int]] = {
+    "im_peor_dBm": (-250.0, 50.0, 3000), "n_im": (0.0, 50000.0, 5000),
+    "prx_max_dBm": (-250.0, 50.0, 3000), "prx_total_dBm": (-250.0, 50.0, 3000), "fspl_min_dB": (0.0, 300.0, 3000)}
+
+def trial_metrics(tx: TxColumns, av: Tuple[float, float, float], tol_Hz: float = 5e3) -> Dict[str, float]:
+    """Métricas del peor caso en el avión para un despliegue."""
+    res = compute_path_loss(tx, [av[0]], [av[1]], [av[2]]); prx = res.prx_dBm[0]
+    im_cache = IMCache(tol_Hz=tol_Hz); worst, _ = im_cache.worst(tx.f_Hz, prx[None, :])
+    return {"im_peor_dBm": float(worst[0]), "n_im": float(len(im_cache.products(tx.f_Hz))),
+            "prx_max_dBm": float(prx.max()), "prx_total_dBm": float(10*np.log10(np.sum(10**(prx/10)))),
+            "fspl_min_dB": float(res.fspl_dB[0].min())}
+
+@dataclass
+class MonteCarloResult:
+    trials: int = 0
+    con_im: int = 0  # ensayos con al menos un producto en banda
+    metrics: Dict[str, MetricSummary] = field(default_factory=lambda: {m: MetricSummary(*g) for m, g in METRICS.items()})
+
+    def add(self, m: Dict[str, float]):
+        self.trials += 1; self.con_im += m["n_im"] > 0
+        for k, v in m.items(): self.metrics[k].add(v)
+
+    def merge(self, o: "MonteCarloResult") -> "MonteCarloResult":
+        self.trials += o.trials; self.con_im += o.con_im
+        for k in self.metrics: self.metrics[k].merge(o.metrics[k])
+        return self
+
+    def to_dict(self) -> Dict:
+        return {"ensayos": self.trials, "p_con_im": self.con_im/self.trials if self.trials else None,
+                **{k: v.to_dict() for k, v in self.metrics.items()}}
+
+def run_chunk(sampler: DeploymentSampler, seed: np.random.SeedSequence, n_trials: int) -> MonteCarloResult:
+    """Ensayos de un bloque con su propio flujo aleatorio; solo devuelve el resumen (tamaño fijo)."""
+    rng = np.random.default_rng(seed); out = MonteCarloResult()
+    for _ in range(n_trials):
+        tx, av = sampler.sample(rng); out.add(trial_metrics(tx, av, sampler.tol_Hz))
+    return out
+
+def run_montecarlo(sampler: DeploymentSampler, n_trials: int, seed: int = 0, workers: Optional[int] = None,
+                   chunk_trials: int = 250, progress: Optional[Callable[[int, int], None]] = None) -> MonteCarloResult:
+    """Ejecuta `n_trials` ensayos repartidos en bloques sobre procesos trabajadores.
+
+    Cada bloque recibe un hijo de SeedSequence(seed).spawn(): el resultado solo
+    depende de (seed, n_trials, chunk_trials), no del número de procesos ni del orden
+    en que terminan, porque los resúmenes se combinan en el orden de los bloques.
+    """
+    sizes = [min(chunk_trials, n_trials - s) for s in range(0, n_trials, chunk_trials)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    total = MonteCarloResult(); done_trials = 0
+
+    def results() -> Iterator[Tuple[int, MonteCarloResult]]:
+        if workers == 1 or len(sizes) <= 1:
+            for c, (s, n) in enumerate(zip(seeds, sizes)): yield c, run_chunk(sampler, s, n)
+            return
+        nproc = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=nproc) as ex:
+            pending = {}; todo = iter(enumerate(zip(seeds, sizes)))
+            for c, (s, n) in todo:
+                pending[ex.submit(run_chunk, sampler, s, n)] = c
+                if len(pending) >= 2*nproc:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in done: yield pending.pop(fut), fut.result()
+            for fut in wait(pending).done: yield pending[fut], fut.result()
+
+    ready: Dict[int, MonteCarloResult] = {}; next_chunk = 0
+    for c, res in results():
+        ready[c] = res
+        while next_chunk in ready:  # combinar en orden de bloque (determinista)
+            r = ready.pop(next_chunk); total.merge(r); done_trials += r.trials; next_chunk += 1
+            if progress is not None: progress(done_trials, n_trials)
+    return total
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m h_simulador.montecarlo",
+                                 description="Monte Carlo de despliegues FM: distribución de métricas de interferencia en el avión.")
+    ap.add_argument("-n", "--ensayos", type=int, default=1000)
+    ap.add_argument("--semilla", type=int, default=0)
+    ap.add_argument("-j", "--procesos", type=int, default=None)
+    ap.add_argument("--bloque", type=int, default=250, help="ensayos por bloque (unidad de reparto y de semilla)")
+    ap.add_argument("--n-fm", type=int, nargs=2, default=(10, 40), metavar=("MIN", "MAX"))
+    ap.add_argument("--tol-khz", type=float, default=5.0)
+    a = ap.parse_args(argv)
+    sampler = DeploymentSampler(n_fm=tuple(a.n_fm), tol_Hz=a.tol_khz*1e3)
+    progress = lambda i, n: print(f"\r{i}/{n} ensayos", end="", file=sys.stderr, flush=True)
+    res = run_montecarlo(sampler, a.ensayos, a.semilla, a.procesos, a.bloque, progress)
+    print(file=sys.stderr); print(json.dumps(res.to_dict(), indent=2, ensure_ascii=False))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
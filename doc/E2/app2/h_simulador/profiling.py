@@ -0,0 +1,152 @@
+from __future__ import annotations
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# Instrumentación opcional: tiempos por manejador (slots de las notificaciones del
+# controlador, paintEvent, entrega de cada frame) con ventana móvil p50/p95/max y
+# exportación a Chrome trace-event JSON (chrome://tracing, Perfetto).
+#
+# Es opt-in: sin instalar no hay envoltorios (coste cero); instalado y en pausa
+# (`enabled = False`) cada llamada cuesta una comprobación de atributo.
+# ---------------------------------------------------------------------------
+
+class RollingStats:
+    """Últimas `window` duraciones (ms) de un manejador en un búfer circular."""
+    __slots__ = ("_buf", "_i", "count", "total_ms")
+
+    def __init__(self, window: int = 512):
+        self._buf = np.empty(window); self._i = 0; self.count = 0; self.total_ms = 0.0
+
+    def add(self, ms: float) -> None:
+        self._buf[self._i % len(self._buf)] = ms; self._i += 1; self.count += 1; self.total_ms += ms
+
+    def values(self) -> np.ndarray:
+        return self._buf[:min(self._i, len(self._buf))]
+
+    def summary(self) -> Dict[str, float]:
+        v = self.values()
+        if not len(v): return {"n": 0, "p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0, "total_ms": 0.0}
+        p50, p95 = np.percentile(v, [50, 95])
+        return {"n": self.count, "p50_ms": float(p50), "p95_ms": float(p95), "max_ms": float(v.max()),
+                "total_ms": self.total_ms}
+
+def handler_name(fn: Callable) -> str:
+    """"Clase.método" para métodos ligados; si no, el __qualname__ (o repr)."""
+    owner = getattr(fn, "__self__", None)
+    if owner is not None and hasattr(fn, "__func__"): return f"{type(owner).__name__}.{fn.__name__}"
+    return getattr(fn, "__qualname__", None) or repr(fn)
+
+class Profiler:
+    """Acumula duraciones por nombre y, mientras está activo, eventos de traza.
+
+        prof = Profiler()
+        slot = prof.timed("HUDWidget.update_hud", hud.update_hud)
+        with prof.span("cálculo"): ...
+        prof.export_chrome_trace("traza.json")
+    """
+    def __init__(self, window: int = 512, max_trace_events: int = 200_000, enabled: bool = True):
+        self.enabled = enabled; self.window = window
+        self.stats: Dict[str, RollingStats] = {}
+        self._cats: Dict[str, str] = {}
+        self._trace: deque = deque(maxlen=max_trace_events)  # (nombre, cat, t0_ns, dur_ns, hilo)
+        self._t0 = time.perf_counter_ns()
+        self._lock = threading.Lock()
+
+    def record(self, name: str, t0_ns: int, dur_ns: int, cat: str = "slot") -> None:
+        with self._lock:
+            st = self.stats.get(name)
+            if st is None: st = self.stats[name] = RollingStats(self.window); self._cats[name] = cat
+            st.add(dur_ns/1e6)
+            self._trace.append((name, cat, t0_ns, dur_ns, threading.get_ident()))
+
+    def timed(self, name: str, fn: Callable, cat: str = "slot") -> Callable:
+        """Envoltorio de `fn` que mide cada llamada cuando `enabled`."""
+        def wrapper(*args, **kwargs):
+            if not self.enabled: return fn(*args, **kwargs)
+            t0 = time.perf_counter_ns()
+            try: return fn(*args, **kwargs)
+            finally: self.record(name, t0, time.perf_counter_ns() - t0, cat)
+        wrapper.__wrapped__ = fn; wrapper.__qualname__ = name
+        return wrapper
+
+    @contextmanager
+    def span(self, name: str, cat: str = "span"):
+        if not self.enabled: yield; return
+        t0 = time.perf_counter_ns()
+        try: yield
+        finally: self.record(name, t0, time.perf_counter_ns() - t0, cat)
+
+    def reset(self) -> None:
+        with self._lock: self.stats.clear(); self._cats.clear(); self._trace.clear()
+
+    def summary(self) -> List[Dict]:
+        """Una fila por manejador, de mayor a menor p95."""
+        with self._lock: items = [(k, self._cats[k], s.summary()) for k, s in self.stats.items()]
+        rows = [{"nombre": k, "categoria": c, **s} for k, c, s in items]
+        return sorted(rows, key=lambda r: r["p95_ms"], reverse=True)
+
+    def chrome_trace(self) -> Dict:
+        """Documento trace-event (eventos completos "X", tiempos en µs)."""
+        with self._lock: trace = list(self._trace)
+        pid = os.getpid(); names = {t.ident: t.name for t in threading.enumerate()}
+        events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": names.get(tid, str(tid))}}
+                  for tid in sorted({e[4] for e in trace})]
+        events += [{"name": n, "cat": c, "ph": "X", "pid": pid, "tid": tid,
+                    "ts": (t0 - self._t0)/1e3, "dur": dur/1e3} for n, c, t0, dur, tid in trace]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: str) -> int:
+        """Escribe la traza en `path`; devuelve el número de eventos."""
+        doc = self.chrome_trace()
+        with open(path, "w", encoding="utf-8") as f: json.dump(doc, f)
+        return sum(1 for e in doc["traceEvents"] if e["ph"] == "X")
+
+class ProfiledSignal:
+    """Envoltura de una notificación (Event del núcleo o señal Qt): los slots que se
+    conecten a través de ella se miden como "<señal> → Clase.método".
+
+    Si el dueño del slot tiene señal `destroyed` (QObject), el envoltorio se desconecta
+    al destruirse, como haría Qt con el slot original.
+    """
+    def __init__(self, signal, name: str, profiler: Profiler):
+        self._signal = signal; self.name = name; self.profiler = profiler
+        self._wrappers: Dict[Callable, Callable] = {}
+
+    def connect(self, slot: Callable, *args):
+        if slot in self._wrappers: return None
+        w = self._wrappers[slot] = self.profiler.timed(f"{self.name} → {handler_name(slot)}", slot)
+        destroyed = getattr(getattr(slot, "__self__", None), "destroyed", None)
+        if destroyed is not None: destroyed.connect(lambda *_, s=slot: self.disconnect(s))
+        return self._signal.connect(w, *args)
+
+    def disconnect(self, slot: Optional[Callable] = None):
+        if slot is None: self._wrappers.clear(); return self._signal.disconnect()
+        w = self._wrappers.pop(slot, None)
+        if w is None: return None
+        try: return self._signal.disconnect(w)
+        except (RuntimeError, TypeError): return None  # emisor ya destruido
+
+    def emit(self, *args): self._signal.emit(*args)
+
+    def __getattr__(self, attr): return getattr(self._signal, attr)
+
+NOTIFICATIONS = ("changed", "sceneChanged", "hudChanged")
+
+def instrument_controller(controller, profiler: Profiler) -> None:
+    """Mide los slots de changed/sceneChanged/hudChanged y cada entrega de notificaciones.
+
+    Debe llamarse antes de que los widgets se conecten al controlador.
+    """
+    for name in NOTIFICATIONS:
+        sig = getattr(controller, name)
+        if not isinstance(sig, ProfiledSignal): setattr(controller, name, ProfiledSignal(sig, name, profiler))
+    disp = controller._dispatcher
+    if not hasattr(disp._deliver, "__wrapped__"):
+        disp._deliver = profiler.timed("entrega (frame)", disp._deliver, cat="frame")
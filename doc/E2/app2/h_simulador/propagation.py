@@ -0,0 +1,108 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import List, Dict, Sequence, Optional
+import numpy as np
+
+from .geometry import link_geometry
+
+# Límites numéricos (mismos que SceneController.compute_fspl_db)
+D_MIN_KM = 1e-9
+F_MIN_MHZ = 1e-9
+
+def fspl_db(d_km, f_MHz) -> np.ndarray:
+    """FSPL (dB) = 32.44 + 20log10(d_km) + 20log10(f_MHz), vectorizado (broadcasting)."""
+    d = np.maximum(np.asarray(d_km, dtype=np.float64), D_MIN_KM)
+    f = np.maximum(np.asarray(f_MHz, dtype=np.float64), F_MIN_MHZ)
+    return 32.44 + 20.0*np.log10(d) + 20.0*np.log10(f)
+
+@dataclass
+class TxColumns:
+    """Transmisores en formato columnar (un arreglo por atributo)."""
+    ids: List[str]
+    nombres: List[str]
+    x_km: np.ndarray
+    y_km: np.ndarray
+    h_km: np.ndarray
+    f_Hz: np.ndarray
+    potencia_W: np.ndarray
+
+    def __len__(self) -> int: return len(self.ids)
+
+    def copy(self) -> "TxColumns":
+        """Foto independiente del store (para resultados que sobreviven a ediciones)."""
+        return TxColumns(ids=list(self.ids), nombres=list(self.nombres), x_km=self.x_km.copy(), y_km=self.y_km.copy(),
+                         h_km=self.h_km.copy(), f_Hz=self.f_Hz.copy(), potencia_W=self.potencia_W.copy())
+
+    @classmethod
+    def from_table(cls, tbl) -> "TxColumns":
+        """Vistas sin copia sobre la ColumnTable de FMTransmitter de un SceneStore."""
+        return cls(ids=tbl.ids, nombres=tbl.nombres, x_km=tbl["x_km"], y_km=tbl["y_km"],
+                   h_km=tbl["h_km"], f_Hz=tbl["f_Hz"], potencia_W=tbl["potencia_W"])
+
+    @classmethod
+    def from_entities(cls, fms: Sequence) -> "TxColumns":
+        n = len(fms)
+        col = lambda attr: np.fromiter((getattr(e, attr) for e in fms), dtype=np.float64, count=n)
+        return cls(ids=[e.id for e in fms], nombres=[e.nombre for e in fms],
+                   x_km=col("x_km"), y_km=col("y_km"), h_km=col("h_km"),
+                   f_Hz=col("f_Hz"), potencia_W=col("potencia_W"))
+
+@dataclass
+class PathLossResult:
+    """Distancia y FSPL de todos los transmisores a uno o varios receptores.
+
+    Las matrices tienen forma (n_rx, n_tx): fila = receptor, columna = transmisor.
+    `d_km` es la distancia oblicua 3D cuando se dieron alturas de receptor; en ese
+    caso también se rellenan distancia horizontal, elevación y visión directa.
+    """
+    tx: TxColumns
+    d_km: np.ndarray
+    fspl_dB: np.ndarray
+    ground_km: Optional[np.ndarray] = None
+    elev_deg: Optional[np.ndarray] = None
+    los: Optional[np.ndarray] = None
+
+    @property
+    def f_MHz(self) -> np.ndarray: return self.tx.f_Hz/1e6
+
+    @property
+    def p_kW(self) -> np.ndarray: return self.tx.potencia_W/1e3
+
+    @property
+    def prx_dBm(self) -> np.ndarray:
+        """Potencia recibida (dBm) con antenas isotrópicas: P_tx(dBm) − FSPL."""
+        return 10.0*np.log10(np.maximum(self.tx.potencia_W, 1e-12)*1e3)[None, :] - self.fspl_dB
+
+    def row(self, i: int, rx: int = 0) -> Dict:
+        """Fila tipo dict del transmisor `i` hacia el receptor `rx`."""
+        return {"id": self.tx.ids[i], "nombre": self.tx.nombres[i],
+                "f_MHz": float(self.tx.f_Hz[i])/1e6, "p_kW": float(self.tx.potencia_W[i])/1e3,
+                "d_km": float(self.d_km[rx, i]), "fspl_dB": float(self.fspl_dB[rx, i])}
+
+    def rows(self, rx: int = 0) -> List[Dict]:
+        """Filas tipo dict (API histórica de fspl_all_to_target) para el receptor `rx`."""
+        f_MHz = self.f_MHz.tolist(); p_kW = self.p_kW.tolist()
+        d = self.d_km[rx].tolist(); L = self.fspl_dB[rx].tolist()
+        return [{"id": i, "nombre": n, "f_MHz": f, "p_kW": p, "d_km": dk, "fspl_dB": l}
+                for i, n, f, p, dk, l in zip(self.tx.ids, self.tx.nombres, f_MHz, p_kW, d, L)]
+
+def distance_matrix(tx_x, tx_y, rx_x, rx_y) -> np.ndarray:
+    """Distancia horizontal (km) receptor×transmisor, forma (n_rx, n_tx)."""
+    dx = np.asarray(rx_x, dtype=np.float64)[:, None] - np.asarray(tx_x, dtype=np.float64)[None, :]
+    dy = np.asarray(rx_y, dtype=np.float64)[:, None] - np.asarray(tx_y, dtype=np.float64)[None, :]
+    return np.hypot(dx, dy)
+
+def compute_path_loss(tx: TxColumns, rx_x, rx_y, rx_h=None) -> PathLossResult:
+    """Calcula en una sola pasada d y FSPL de todos los transmisores a todos los receptores.
+
+    Con `rx_h` (km) usa geometría 3D (alturas de transmisor y receptor); sin ella,
+    distancia horizontal como antes.
+    """
+    rx_x = np.atleast_1d(np.asarray(rx_x, dtype=np.float64))
+    rx_y = np.atleast_1d(np.asarray(rx_y, dtype=np.float64))
+    if rx_h is None:
+        d = distance_matrix(tx.x_km, tx.y_km, rx_x, rx_y)
+        return PathLossResult(tx=tx, d_km=d, fspl_dB=fspl_db(d, (tx.f_Hz/1e6)[None, :]))
+    g = link_geometry(tx.x_km, tx.y_km, tx.h_km, rx_x, rx_y, rx_h)
+    return PathLossResult(tx=tx, d_km=g.slant_km, fspl_dB=fspl_db(g.slant_km, (tx.f_Hz/1e6)[None, :]),
+                          ground_km=g.ground_km, elev_deg=g.elev_deg, los=g.los)
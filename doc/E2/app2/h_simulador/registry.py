@@ -0,0 +1,151 @@
+from __future__ import annotations
+import csv
+import math
+import os
+from dataclasses import dataclass
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+
+from .geometry import R_EARTH_KM
+
+# nombres de columna aceptados (en minúsculas) → campo
+_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "nombre": ("nombre", "name", "indicativo", "callsign", "estacion", "estación"),
+    "lat": ("lat", "latitud", "latitude"), "lon": ("lon", "lng", "longitud", "longitude"),
+    "x_km": ("x_km", "x"), "y_km": ("y_km", "y"),
+    "h_km": ("h_km",), "h_m": ("h_m", "altura_m", "altura", "height_m"),
+    "f_MHz": ("f_mhz", "frecuencia_mhz", "frecuencia", "freq_mhz"),
+    "p_kW": ("erp_kw", "pre_kw", "p_kw", "potencia_kw"), "p_W": ("erp_w", "pre_w", "p_w", "potencia_w"),
+}
+H_DEFAULT_KM = 0.1
+P_DEFAULT_W = 10e3
+
+@dataclass
+class LocalProjection:
+    """Proyección equirectangular local: (lat, lon) en grados → km de escena.
+
+    El punto de referencia (lat0, lon0) cae en (x0_km, y0_km); x crece hacia el
+    este e y hacia el norte. Error < 0.1 % en unos cientos de km alrededor de lat0.
+    """
+    lat0_deg: float
+    lon0_deg: float
+    x0_km: float = 0.0
+    y0_km: float = 0.0
+
+    def to_km(self, lat_deg, lon_deg) -> Tuple[np.ndarray, np.ndarray]:
+        k = math.pi/180.0*R_EARTH_KM
+        x = self.x0_km + k*math.cos(math.radians(self.lat0_deg))*(np.asarray(lon_deg, dtype=np.float64) - self.lon0_deg)
+        y = self.y0_km + k*(np.asarray(lat_deg, dtype=np.float64) - self.lat0_deg)
+        return x, y
+
+def _resolve_columns(header: List[str]) -> Dict[str, int]:
+    low = [h.strip().lower() for h in header]; cols = {}
+    for key, names in _COLUMNS.items():
+        hit = [low.index(n) for n in names if n in low]
+        if hit: cols[key] = hit[0]
+    if "f_MHz" not in cols: raise ValueError("Falta la columna de frecuencia (f_MHz/frecuencia_MHz)")
+    if not ({"lat", "lon"} <= cols.keys() or {"x_km", "y_km"} <= cols.keys()):
+        raise ValueError("Faltan las coordenadas: lat/lon o x_km/y_km")
+    return cols
+
+class RegistryReader:
+    """Lee un CSV de emisoras por bloques de `chunk_rows` filas (memoria acotada).
+
+    Cada bloque es un dict de columnas listo para SceneController.add_fms_bulk.
+    Separador `,`, `;` o tabulador (autodetectado); con `;` o tabulador se admite
+    coma decimal. Las filas ilegibles y las que caen fuera del área (`area_km`)
+    se descartan y se cuentan en `invalidas` y `fuera_area`.
+
+    Con lat/lon y sin `projection`, el centroide del primer bloque se coloca en el
+    centro del área.
+    """
+    def __init__(self, path: str, area_km: Tuple[float, float], projection: Optional[LocalProjection] = None,
+                 chunk_rows: int = 10_000):
+        self.path = path; self.area_km = area_km; self.projection = projection; self.chunk_rows = chunk_rows
+        self.leidas = 0; self.invalidas = 0; self.fuera_area = 0
+        self.size = os.path.getsize(path); self.chars_read = 0
+
+    @property
+    def progress(self) -> float:
+        """Fracción aproximada del archivo ya leída (caracteres ≈ bytes)."""
+        return min(1.0, self.chars_read/self.size) if self.size else 1.0
+
+    def _lines(self, f) -> Iterator[str]:
+        for line in f: self.chars_read += len(line); yield line
+
+    def __iter__(self) -> Iterator[Dict]:
+        with open(self.path, newline="", encoding="utf-8-sig") as f:
+            sample = f.read(4096); f.seek(0)
+            try: dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+            except csv.Error: dialect = csv.excel
+            decimal_comma = dialect.delimiter != ","
+            reader = csv.reader(self._lines(f), dialect)
+            cols = _resolve_columns(next(reader))
+            while True:
+                rows = list(islice(reader, self.chunk_rows))
+                if not rows: break
+                chunk = self._parse(rows, cols, decimal_comma)
+                if chunk is not None: yield chunk
+
+    def _parse(self, rows: List[List[str]], cols: Dict[str, int], decimal_comma: bool) -> Optional[Dict]:
+        num_keys = [k for k in cols if k != "nombre"]
+        names: List[str] = []; vals = {k: [] for k in num_keys}
+        for r in rows:
+            if not any(c.strip() for c in r): continue
+            self.leidas += 1
+            try:
+                v = {}
+                for k in num_keys:
+                    cell = r[cols[k]].strip()
+                    v[k] = float(cell.replace(",", ".") if decimal_comma else cell) if cell else math.nan
+            except (ValueError, IndexError):
+                self.invalidas += 1; continue
+            for k in num_keys: vals[k].append(v[k])
+            names.append(r[cols["nombre"]].strip() if "nombre" in cols and cols["nombre"] < len(r) else "")
+        if not names: return None
+        a = {k: np.asarray(v, dtype=np.float64) for k, v in vals.items()}
+        if "lat" in a and "lon" in a:
+            if self.projection is None:
+                ok = np.isfinite(a["lat"]) & np.isfinite(a["lon"])
+                if not ok.any(): self.invalidas += len(names); return None
+                self.projection = LocalProjection(float(a["lat"][ok].mean()), float(a["lon"][ok].mean()),
+                                                  self.area_km[0]*0.5, self.area_km[1]*0.5)
+            x, y = self.projection.to_km(a["lat"], a["lon"])
+        else:
+            x, y = a["x_km"], a["y_km"]
+        h = a["h_km"] if "h_km" in a else a["h_m"]/1e3 if "h_m" in a else np.full(len(x), H_DEFAULT_KM)
+        p = a["p_kW"]*1e3 if "p_kW" in a else a["p_W"] if "p_W" in a else np.full(len(x), P_DEFAULT_W)
+        h = np.where(np.isfinite(h), h, H_DEFAULT_KM); p = np.where(np.isfinite(p), p, P_DEFAULT_W)
+        f = a["f_MHz"]*1e6
+        valid = np.isfinite(x) & np.isfinite(y) & np.isfinite(f) & (f > 0) & (p > 0)
+        inside = valid & (x >= 0) & (x <= self.area_km[0]) & (y >= 0) & (y <= self.area_km[1])
+        self.invalidas += int((~valid).sum()); self.fuera_area += int((valid & ~inside).sum())
+        keep = np.flatnonzero(inside)
+        return {"nombre": [names[i] or "FM" for i in keep], "x_km": x[keep], "y_km": y[keep],
+                "h_km": h[keep], "f_Hz": f[keep], "potencia_W": p[keep]}
+
+def read_registry(path: str, area_km: Tuple[float, float], projection: Optional[LocalProjection] = None,
+                  chunk_rows: int = 10_000, progress: Optional[Callable[[float], None]] = None
+                  ) -> Tuple[List[Dict], RegistryReader]:
+    """Lee y convierte todo el CSV sin tocar la escena (apto para un hilo de trabajo).
+
+    Devuelve los bloques para SceneController.add_fms_bulk y el lector (contadores).
+    """
+    reader = RegistryReader(path, area_km, projection, chunk_rows); chunks = []
+    for ch in reader:
+        chunks.append(ch)
+        if progress is not None: progress(reader.progress)
+    return chunks, reader
+
+def add_registry(controller, chunks: Iterable[Dict], reader: RegistryReader) -> Dict[str, int]:
+    """Da de alta los bloques leídos (una transacción, una notificación) y devuelve el resumen."""
+    n = controller.add_fms_bulk(chunks)
+    return {"leidas": reader.leidas, "importadas": n, "fuera_area": reader.fuera_area, "invalidas": reader.invalidas}
+
+def import_registry(controller, path: str, projection: Optional[LocalProjection] = None,
+                    chunk_rows: int = 10_000) -> Dict[str, int]:
+    """Importa el CSV en la escena de `controller` (una transacción, una notificación)."""
+    sc = controller.scene
+    reader = RegistryReader(path, (sc.ancho_km, sc.alto_km), projection, chunk_rows)
+    return add_registry(controller, reader, reader)
@@ -0,0 +1,242 @@
+from __future__ import annotations
+import codecs
+import io
+import json
+import os
+import re
+import struct
+import tempfile
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, Tuple
+import numpy as np
+
+from .models import Scene, new_store, entity_row
+
+# ---------------------------------------------------------------------------
+# Contenedor binario: MAGIC | u64 longitud de cabecera | cabecera JSON | arrays
+# alineados a ALIGN bytes. La cabecera describe cada array (dtype, forma, offset
+# absoluto) y lleva los metadatos; los datos numéricos se pueden mapear en memoria
+# sin copiarlos ni convertirlos.
+# ---------------------------------------------------------------------------
+MAGIC = b"HSIMBIN\x00"
+VERSION = 1
+ALIGN = 64
+BINARY_EXT = ".hsim"
+
+def _align(n: int) -> int: return (n + ALIGN - 1)//ALIGN*ALIGN
+
+@contextmanager
+def _atomic_file(path: str):
+    """Archivo binario temporal junto a `path` que lo reemplaza (os.replace) solo si todo fue bien.
+
+    Un guardado interrumpido no deja el destino a medias, y quien tenga mapeado el
+    archivo anterior sigue viendo el suyo (en POSIX; en Windows el reemplazo falla
+    mientras siga mapeado: ver SceneStore.release_mapped).
+    """
+    fd, tmp = tempfile.mkstemp(prefix=".tmp_", dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, "wb") as f: yield f
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp): os.unlink(tmp)
+        raise
+
+def write_container(path: str, meta: Dict, arrays: Dict[str, np.ndarray]) -> None:
+    """Escribe `arrays` + `meta` (serializable en JSON) de forma atómica."""
+    arrays = {k: np.ascontiguousarray(v) for k, v in arrays.items()}
+    desc = {k: {"dtype": a.dtype.str, "shape": list(a.shape), "offset": 0} for k, a in arrays.items()}
+    head = {"version": VERSION, "meta": meta, "arrays": desc}
+    # los offsets dependen de la longitud de la cabecera y viceversa: se reserva de sobra
+    raw = json.dumps(head, ensure_ascii=False).encode("utf-8")
+    base = _align(len(MAGIC) + 8 + len(raw) + 24*len(arrays) + 64)
+    off = base
+    for k, a in arrays.items(): desc[k]["offset"] = off; off = _align(off + a.nbytes)
+    raw = json.dumps(head, ensure_ascii=False).encode("utf-8")
+    if len(MAGIC) + 8 + len(raw) > base: raise RuntimeError("Cabecera del contenedor más larga de lo previsto")
+    with _atomic_file(path) as f:
+        f.write(MAGIC); f.write(struct.pack("<Q", len(raw))); f.write(raw)
+        for k, a in arrays.items():
+            f.seek(desc[k]["offset"]); f.write(a.tobytes(order="C"))
+        f.truncate(max(off, base))
+
+def is_container(path: str) -> bool:
+    with open(path, "rb") as f: return f.read(len(MAGIC)) == MAGIC
+
+def read_container(path: str, mmap: bool = True) -> Tuple[Dict, Dict[str, np.ndarray]]:
+    """(meta, arrays). Con `mmap` los arrays son vistas copy-on-write del archivo (np.memmap
+    modo "c"): se pueden modificar en memoria sin tocar el disco y solo se leen las
+    páginas que se usan.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC: raise ValueError(f"{path}: no es un contenedor binario de escena")
+        (n,) = struct.unpack("<Q", f.read(8)); head = json.loads(f.read(n).decode("utf-8"))
+        if head.get("version", 0) > VERSION: raise ValueError(f"{path}: versión {head['version']} no soportada")
+        buf = np.memmap(f, dtype=np.uint8, mode="c") if mmap else np.frombuffer(f.read(), dtype=np.uint8)
+    start = 0 if mmap else len(MAGIC) + 8 + n
+    arrays = {}
+    for k, d in head["arrays"].items():
+        dt = np.dtype(d["dtype"]); shape = tuple(d["shape"]); o = d["offset"] - start
+        nbytes = dt.itemsize*int(np.prod(shape, dtype=np.int64))
+        arrays[k] = buf[o:o + nbytes].view(dt).reshape(shape)
+    return head["meta"], arrays
+
+# ---------------------------------------------------------------------------
+# Escenas
+# ---------------------------------------------------------------------------
+def scene_to_container(scene: Scene) -> Tuple[Dict, Dict[str, np.ndarray]]:
+    store = scene.entities; kinds = list(store.kinds)
+    meta = {"tipo": "escena", "scene": {"ancho_km": scene.ancho_km, "alto_km": scene.alto_km,
+                                        "frecuencia_Hz": scene.frecuencia_Hz}, "kinds": {}}
+    arrays: Dict[str, np.ndarray] = {}
+    for kind in kinds:
+        tbl = store.table(kind)
+        meta["kinds"][kind] = {"n": tbl.n, "texto": {c: tbl._text[c] for c in tbl.text_names}}
+        for c in tbl.num_names: arrays[f"{kind}/{c}"] = tbl[c]
+    ref = {id(store.table(k)): i for i, k in enumerate(kinds)}
+    meta["orden_tipos"] = kinds
+    arrays["orden/tipo"] = np.fromiter((ref[id(t)] for t, _ in store._order), dtype=np.uint8, count=len(store))
+    arrays["orden/fila"] = np.fromiter((r for _, r in store._order), dtype=np.int64, count=len(store))
+    return meta, arrays
+
+def scene_from_container(meta: Dict, arrays: Dict[str, np.ndarray]) -> Scene:
+    if meta.get("tipo") != "escena": raise ValueError("El contenedor no guarda una escena")
+    store = new_store(); tables = {}
+    for kind, info in meta["kinds"].items():
+        if kind not in store.kinds: continue
+        tbl = store.table(kind); n = int(info["n"])
+        cols = {c: arrays.get(f"{kind}/{c}", np.zeros(n)) for c in tbl.num_names}
+        tables[kind] = (cols, info["texto"], n)
+    kinds = meta["orden_tipos"]
+    order = [(kinds[t], r) for t, r in zip(arrays["orden/tipo"].tolist(), arrays["orden/fila"].tolist())]
+    store.load_columns(tables, order)
+    s = meta["scene"]
+    return Scene(ancho_km=float(s["ancho_km"]), alto_km=float(s["alto_km"]),
+                 frecuencia_Hz=float(s["frecuencia_Hz"]), entities=store)
+
+# ---------------------------------------------------------------------------
+# JSON incremental: el array "entities" se decodifica elemento a elemento
+# ---------------------------------------------------------------------------
+_WS = re.compile(r"\s*")
+
+class _JsonCursor:
+    """Lectura por bloques de bytes con json.JSONDecoder.raw_decode sobre un búfer acotado."""
+    def __init__(self, f, chunk_bytes: int):
+        self.f = f; self.chunk_bytes = chunk_bytes; self.nbytes = 0
+        self.buf = ""; self.pos = 0; self.eof = False
+        self._utf8 = codecs.getincrementaldecoder("utf-8")(); self._dec = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof: return False
+        data = self.f.read(self.chunk_bytes); self.nbytes += len(data)
+        if not data: self.eof = True
+        self.buf = self.buf[self.pos:] + self._utf8.decode(data, final=not data); self.pos = 0
+        return bool(data)
+
+    def peek(self) -> str:
+        """Siguiente carácter no blanco ("" al final del archivo)."""
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf): return self.buf[self.pos]
+            if not self._fill(): return ""
+
+    def expect(self, ch: str):
+        c = self.peek()
+        if c != ch: raise ValueError(f"JSON de escena inválido cerca del byte {self.nbytes}: se esperaba {ch!r}, hay {c!r}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                v, end = self._dec.raw_decode(self.buf, self.pos)
+                # un número al final del búfer puede estar cortado: se exige ver lo que sigue
+                if end < len(self.buf) or self.eof: self.pos = end; return v
+            except json.JSONDecodeError:
+                if self.eof: raise
+            self._fill()
+
+def iter_scene_json(f, chunk_bytes: int = 1 << 20) -> Iterator[Tuple[str, object]]:
+    """Recorre un JSON de escena como (clave, valor) de primer nivel, salvo "entities",
+    que se entrega como ("entity", dict) por elemento. `f` es un archivo binario.
+    """
+    cur = _JsonCursor(f, chunk_bytes); cur.expect("{")
+    if cur.peek() == "}": return
+    while True:
+        key = cur.value(); cur.expect(":")
+        if key == "entities":
+            cur.expect("[")
+            if cur.peek() == "]": cur.pos += 1
+            else:
+                while True:
+                    yield "entity", cur.value()
+                    c = cur.peek(); cur.expect("]" if c == "]" else ",")
+                    if c == "]": break
+        else:
+            yield key, cur.value()
+        if cur.peek() == "}": return
+        cur.expect(",")
+
+class StreamingSceneLoader:
+    """Carga incremental de un JSON de escena directamente en el store.
+
+    `scene` es válida en todo momento (contiene lo leído hasta ahora); `step()`
+    procesa un número acotado de entidades, así la interfaz puede intercalar
+    pasos con su event loop y mostrar progreso. La cabecera "scene" se aplica al
+    aparecer (Scene.to_dict la escribe antes de las entidades).
+    """
+    def __init__(self, path: str, chunk_bytes: int = 1 << 20):
+        self._f = open(path, "rb"); self.size = os.fstat(self._f.fileno()).st_size
+        self.scene = Scene(); self.n_entities = 0; self.done = False
+        self._it = iter_scene_json(self._f, chunk_bytes)
+
+    @property
+    def bytes_read(self) -> int:
+        return self._f.tell() if not self._f.closed else self.size
+
+    @property
+    def progress(self) -> float:
+        return 1.0 if self.done or not self.size else min(1.0, self.bytes_read/self.size)
+
+    def step(self, max_entities: int = 2000) -> bool:
+        """Procesa hasta `max_entities` entidades; devuelve True mientras quede archivo."""
+        if self.done: return False
+        store = self.scene.entities; n = 0
+        try:
+            for key, v in self._it:
+                if key == "entity":
+                    etype, values = entity_row(v, self.scene.frecuencia_Hz)
+                    store.append_row(etype, **values); self.n_entities += 1; n += 1
+                    if n >= max_entities: return True
+                elif key == "scene": self.scene.set_params(v)
+        except BaseException:
+            self.close(); raise
+        self.close(); self.done = True
+        return False
+
+    def close(self):
+        if not self._f.closed: self._f.close()
+
+    def run(self, progress: Optional[Callable[[float], None]] = None, max_entities: int = 2000) -> Scene:
+        while self.step(max_entities):
+            if progress is not None: progress(self.progress)
+        return self.scene
+
+def snapshot_scene(scene: Scene) -> Scene:
+    """Copia independiente de la escena (columnas copiadas en bloque), p.ej. para guardarla
+    desde otro hilo mientras la original se sigue editando."""
+    meta, arrays = scene_to_container(scene)
+    return scene_from_container(meta, {k: np.array(a) for k, a in arrays.items()})
+
+def save_scene(scene: Scene, path: str) -> None:
+    """Guarda en binario si la extensión es BINARY_EXT; si no, JSON (formato de intercambio).
+    En ambos casos la escritura es atómica. Antes se sueltan las columnas mapeadas de
+    `scene` (os.replace sobre un archivo aún mapeado falla en Windows)."""
+    scene.entities.release_mapped()
+    if path.lower().endswith(BINARY_EXT): write_container(path, *scene_to_container(scene)); return
+    with _atomic_file(path) as raw, io.TextIOWrapper(raw, encoding="utf-8") as f:
+        json.dump(scene.to_dict(), f, ensure_ascii=False, indent=2)
+
+def load_scene(path: str, mmap: bool = True, progress: Optional[Callable[[float], None]] = None) -> Scene:
+    """Carga una escena detectando el formato por contenido (binario o JSON), no por extensión."""
+    if is_container(path): return scene_from_container(*read_container(path, mmap))
+    return StreamingSceneLoader(path).run(progress)
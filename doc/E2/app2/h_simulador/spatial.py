@@ -0,0 +1,124 @@
+from __future__ import annotations
+import math
+from typing import Dict, List, Optional, Set, Tuple, Iterable
+
+Cell = Tuple[int, int]
+
+class GridIndex:
+    """Índice espacial de rejilla uniforme (celdas de `cell_km` × `cell_km`).
+
+    Guarda id → (x, y, tipo, secuencia). Las consultas por rectángulo/radio solo
+    visitan las celdas que tocan la zona, y `nearest` explora anillos de celdas
+    alrededor del punto hasta que ningún anillo exterior puede mejorar el resultado.
+    La secuencia de inserción permite elegir la entidad "de arriba" al hacer clic.
+    """
+    def __init__(self, cell_km: float = 2.0):
+        self.cell_km = float(cell_km)
+        self._cells: Dict[Cell, Set[str]] = {}
+        self._items: Dict[str, Tuple[float, float, str, int]] = {}
+        self._seq = 0
+        self._bounds: Optional[List[int]] = None  # celdas extremas ocupadas alguna vez (cota para nearest)
+
+    def __len__(self) -> int: return len(self._items)
+    def __contains__(self, entity_id: str) -> bool: return entity_id in self._items
+
+    def _cell(self, x: float, y: float) -> Cell:
+        return (int(math.floor(x/self.cell_km)), int(math.floor(y/self.cell_km)))
+
+    # --- mantenimiento ---
+    def clear(self):
+        self._cells.clear(); self._items.clear(); self._seq = 0; self._bounds = None
+
+    def _add_to_cell(self, c: Cell, entity_id: str):
+        self._cells.setdefault(c, set()).add(entity_id)
+        b = self._bounds
+        if b is None: self._bounds = [c[0], c[1], c[0], c[1]]
+        else: b[0] = min(b[0], c[0]); b[1] = min(b[1], c[1]); b[2] = max(b[2], c[0]); b[3] = max(b[3], c[1])
+
+    def insert(self, entity_id: str, x: float, y: float, kind: str = "Entity"):
+        if entity_id in self._items: self.remove(entity_id)
+        self._seq += 1
+        self._items[entity_id] = (x, y, kind, self._seq)
+        self._add_to_cell(self._cell(x, y), entity_id)
+
+    def remove(self, entity_id: str):
+        it = self._items.pop(entity_id, None)
+        if it is None: return
+        c = self._cell(it[0], it[1]); ids = self._cells.get(c)
+        if ids is not None:
+            ids.discard(entity_id)
+            if not ids: del self._cells[c]
+
+    def move(self, entity_id: str, x: float, y: float):
+        it = self._items.get(entity_id)
+        if it is None: return
+        old_c = self._cell(it[0], it[1]); new_c = self._cell(x, y)
+        self._items[entity_id] = (x, y, it[2], it[3])
+        if old_c != new_c:
+            ids = self._cells[old_c]; ids.discard(entity_id)
+            if not ids: del self._cells[old_c]
+            self._add_to_cell(new_c, entity_id)
+
+    def rename(self, old_id: str, new_id: str):
+        it = self._items.pop(old_id, None)
+        if it is None: return
+        self._items[new_id] = it
+        ids = self._cells[self._cell(it[0], it[1])]; ids.discard(old_id); ids.add(new_id)
+
+    # --- consultas ---
+    def _ids_in_cells(self, cx0: int, cy0: int, cx1: int, cy1: int) -> Iterable[str]:
+        # recorrer las celdas ocupadas si el rectángulo cubre más celdas que las existentes
+        if (cx1-cx0+1)*(cy1-cy0+1) > len(self._cells):
+            for (cx, cy), ids in self._cells.items():
+                if cx0 <= cx <= cx1 and cy0 <= cy <= cy1: yield from ids
+            return
+        for cx in range(cx0, cx1+1):
+            for cy in range(cy0, cy1+1):
+                ids = self._cells.get((cx, cy))
+                if ids: yield from ids
+
+    def query_rect(self, x0: float, y0: float, x1: float, y1: float, kinds: Optional[Set[str]] = None) -> List[str]:
+        """Ids dentro del rectángulo [x0,x1]×[y0,y1] (km), en orden de inserción."""
+        (cx0, cy0), (cx1, cy1) = self._cell(x0, y0), self._cell(x1, y1)
+        out = []
+        for eid in self._ids_in_cells(cx0, cy0, cx1, cy1):
+            x, y, kind, seq = self._items[eid]
+            if x0 <= x <= x1 and y0 <= y <= y1 and (kinds is None or kind in kinds):
+                out.append((seq, eid))
+        return [eid for _, eid in sorted(out)]
+
+    def pick(self, x: float, y: float, half_km: float, exclude: Set[str] = frozenset()) -> Optional[str]:
+        """Entidad más reciente (la pintada encima) dentro del cuadrado de semilado `half_km`."""
+        best = None; best_seq = -1
+        (cx0, cy0), (cx1, cy1) = self._cell(x-half_km, y-half_km), self._cell(x+half_km, y+half_km)
+        for eid in self._ids_in_cells(cx0, cy0, cx1, cy1):
+            ex, ey, kind, seq = self._items[eid]
+            if kind in exclude or seq <= best_seq: continue
+            if abs(ex-x) <= half_km and abs(ey-y) <= half_km: best, best_seq = eid, seq
+        return best
+
+    def nearest(self, x: float, y: float, kinds: Optional[Set[str]] = None) -> Optional[Tuple[str, float]]:
+        """(id, distancia_km) de la entidad más cercana (opcionalmente filtrando por tipo)."""
+        if not self._cells: return None
+        cx, cy = self._cell(x, y)
+        b = self._bounds
+        max_ring = max(abs(cx-b[0]), abs(cx-b[2]), abs(cy-b[1]), abs(cy-b[3]))
+        best: Optional[Tuple[str, float]] = None
+        for ring in range(max_ring+1):
+            # cualquier punto de este anillo está al menos a (ring-1)*cell del punto
+            if best is not None and (ring-1)*self.cell_km > best[1]: break
+            for c in self._ring(cx, cy, ring):
+                for eid in self._cells.get(c, ()):
+                    ex, ey, kind, _ = self._items[eid]
+                    if kinds is not None and kind not in kinds: continue
+                    d = math.hypot(ex-x, ey-y)
+                    if best is None or d < best[1]: best = (eid, d)
+        return best
+
+    @staticmethod
+    def _ring(cx: int, cy: int, r: int) -> Iterable[Cell]:
+        if r == 0: yield (cx, cy); return
+        for i in range(-r, r+1):
+            yield (cx+i, cy-r); yield (cx+i, cy+r)
+        for j in range(-r+1, r):
+            yield (cx-r, cy+j); yield (cx+r, cy+j)
@@ -0,0 +1,298 @@
+from __future__ import annotations
+from dataclasses import fields
+from typing import Dict, List, Optional, Tuple, Iterable, Iterator, Union
+import mmap
+import numpy as np
+
+def is_mapped(a) -> bool:
+    """True si `a` es (una vista de) un archivo mapeado en memoria."""
+    while a is not None:
+        if isinstance(a, (np.memmap, mmap.mmap)): return True
+        a = getattr(a, "base", None)
+    return False
+
+# ---------------------------------------------------------------------------
+# Descriptores: un atributo de entidad vive en la tabla de su escena si la
+# entidad está ligada (vista), o en el propio objeto si está suelta.
+# ---------------------------------------------------------------------------
+class _Column:
+    """Atributo numérico respaldado por una columna float64 de ColumnTable."""
+    def __init__(self, name: str):
+        self.name = name; self.key = "_v_" + name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None: return self
+        d = obj.__dict__; tbl = d.get("_tbl")
+        if tbl is None:
+            try: return d[self.key]
+            except KeyError: raise AttributeError(self.name) from None
+        return float(tbl._cols[self.name][d["_row"]])
+
+    def __set__(self, obj, value):
+        d = obj.__dict__; tbl = d.get("_tbl")
+        if tbl is None: d[self.key] = value
+        else: tbl._cols[self.name][d["_row"]] = value
+
+class _Text(_Column):
+    """Atributo de texto (id, nombre) respaldado por una lista de ColumnTable."""
+    def __get__(self, obj, objtype=None):
+        if obj is None: return self
+        d = obj.__dict__; tbl = d.get("_tbl")
+        if tbl is None:
+            try: return d[self.key]
+            except KeyError: raise AttributeError(self.name) from None
+        return tbl._text[self.name][d["_row"]]
+
+    def __set__(self, obj, value):
+        d = obj.__dict__; tbl = d.get("_tbl")
+        if tbl is None: d[self.key] = value; return
+        row = d["_row"]; old = tbl._text[self.name][row]
+        tbl._text[self.name][row] = value
+        if self.name == "id" and old != value: tbl.store._reindex(old, value, (tbl, row))
+
+def _is_text(f) -> bool:
+    return f.type in ("str", str)
+
+def bind_fields(cls) -> None:
+    """Sustituye los campos del dataclass `cls` por descriptores respaldados por tabla.
+
+    Debe llamarse después de @dataclass (los valores por defecto ya quedaron en __init__).
+    """
+    for f in fields(cls):
+        setattr(cls, f.name, _Text(f.name) if _is_text(f) else _Column(f.name))
+
+# ---------------------------------------------------------------------------
+class ColumnTable:
+    """Entidades de un mismo tipo en columnas contiguas (una fila por entidad).
+
+    `tbl["x_km"]` devuelve una vista (sin copia) de las n filas ocupadas.
+    """
+    def __init__(self, store: "SceneStore", kind: str, cls: type, capacity: int = 16):
+        self.store = store; self.kind = kind; self.cls = cls; self.n = 0
+        flds = fields(cls)
+        self.field_names = [f.name for f in flds]
+        self.text_names = [f.name for f in flds if _is_text(f)]
+        self.num_names = [f.name for f in flds if not _is_text(f)]
+        self._cols: Dict[str, np.ndarray] = {c: np.zeros(capacity, dtype=np.float64) for c in self.num_names}
+        self._text: Dict[str, List[str]] = {c: [] for c in self.text_names}
+        self._views: List[Optional[object]] = []
+
+    def __len__(self) -> int: return self.n
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self._cols[name][:self.n]
+
+    @property
+    def ids(self) -> List[str]: return self._text["id"]
+
+    @property
+    def nombres(self) -> List[str]: return self._text["nombre"]
+
+    def _reserve(self, extra: int) -> None:
+        need = self.n + extra
+        cap = len(next(iter(self._cols.values()))) if self._cols else need
+        if need <= cap: return
+        cap = max(2*cap, need)
+        for c, old in self._cols.items():
+            new = np.zeros(cap, dtype=np.float64); new[:self.n] = old[:self.n]
+            self._cols[c] = new
+
+    def append_values(self, values: Dict) -> int:
+        self._reserve(1); row = self.n
+        for c in self.num_names: self._cols[c][row] = values[c]
+        for c in self.text_names: self._text[c].append(values[c])
+        self._views.append(None); self.n += 1
+        return row
+
+    def extend_values(self, columns: Dict, n: int) -> int:
+        """Agrega `n` filas de golpe (columnas numéricas como arrays, texto como listas). Devuelve la primera fila."""
+        self._reserve(n); row = self.n
+        for c in self.num_names: self._cols[c][row:row+n] = columns[c]
+        for c in self.text_names: self._text[c].extend(columns[c])
+        self._views.extend([None]*n); self.n += n
+        return row
+
+    def adopt(self, columns: Dict[str, np.ndarray], text: Dict[str, List[str]], n: int) -> None:
+        """Toma `columns` sin copiarlas (p.ej. vistas de un np.memmap) como contenido de la tabla.
+
+        Se copian solo al crecer la tabla (_reserve reserva arrays nuevos).
+        """
+        for c in self.num_names: self._cols[c] = columns[c]
+        for c in self.text_names: self._text[c] = list(text[c])
+        self._views = [None]*n; self.n = n
+
+    def release_mapped(self) -> bool:
+        """Copia a memoria las columnas adoptadas de un archivo mapeado. Devuelve True si copió alguna."""
+        hit = [c for c, a in self._cols.items() if is_mapped(a)]
+        for c in hit: self._cols[c] = np.array(self._cols[c])
+        return bool(hit)
+
+    def view(self, row: int):
+        """Entidad (dataclass) ligada a la fila `row`; se crea bajo demanda y se reutiliza."""
+        e = self._views[row]
+        if e is None:
+            e = self.cls.__new__(self.cls)
+            e.__dict__["_tbl"] = self; e.__dict__["_row"] = row
+            self._views[row] = e
+        return e
+
+    def row_dict(self, row: int) -> Dict:
+        d = {}
+        for c in self.field_names:
+            d[c] = self._text[c][row] if c in self._text else float(self._cols[c][row])
+        return d
+
+    def delete(self, row: int) -> None:
+        e = self._views[row]
+        if e is not None:  # la entidad borrada queda suelta con sus valores actuales
+            vals = self.row_dict(row); d = e.__dict__
+            del d["_tbl"]; del d["_row"]
+            for c, v in vals.items(): d["_v_" + c] = v
+        last = self.n - 1
+        for col in self._cols.values(): col[row:last] = col[row+1:self.n]
+        for lst in self._text.values(): del lst[row]
+        del self._views[row]; self.n = last
+        for r in range(row, self.n):
+            v = self._views[r]
+            if v is not None: v.__dict__["_row"] = r
+
+# ---------------------------------------------------------------------------
+KindLike = Union[str, type]
+
+class SceneStore:
+    """Almacén columnar de la escena.
+
+    - una ColumnTable por tipo de entidad (índice por tipo, columnas contiguas)
+    - índice hash id → fila para búsquedas O(1)
+    - orden global de inserción (para pintar/serializar como la lista original)
+
+    Se comporta como una secuencia de entidades (iterar, len, append, extend…),
+    de modo que `scene.entities` conserva la API de lista.
+    """
+    def __init__(self, kinds: Dict[str, type], entities: Iterable = ()):
+        self.kinds = dict(kinds)
+        self._tables: Dict[str, ColumnTable] = {k: ColumnTable(self, k, c) for k, c in self.kinds.items()}
+        self._order: List[Tuple[ColumnTable, int]] = []
+        self._by_id: Dict[str, Tuple[ColumnTable, int]] = {}
+        self.structure_rev = 0  # se incrementa en altas/bajas
+        self.extend(entities)
+
+    # --- tipos ---
+    def kind_of(self, e) -> str:
+        for c in type(e).__mro__:
+            if c.__name__ in self._tables: return c.__name__
+        raise TypeError(f"Tipo de entidad no soportado: {type(e).__name__}")
+
+    def _kind_name(self, kind: KindLike) -> str:
+        return kind if isinstance(kind, str) else kind.__name__
+
+    def table(self, kind: KindLike) -> ColumnTable:
+        return self._tables[self._kind_name(kind)]
+
+    def of_kind(self, kind: KindLike) -> List:
+        tbl = self.table(kind)
+        return [tbl.view(r) for r in range(tbl.n)]
+
+    def first(self, kind: KindLike):
+        tbl = self.table(kind)
+        return tbl.view(0) if tbl.n else None
+
+    # --- índice por id ---
+    def get(self, entity_id: str):
+        loc = self._by_id.get(entity_id)
+        return loc[0].view(loc[1]) if loc else None
+
+    def row_of(self, entity_id: str) -> Optional[int]:
+        """Fila de la entidad dentro de la tabla de su tipo (None si no existe)."""
+        loc = self._by_id.get(entity_id)
+        return loc[1] if loc else None
+
+    def _reindex(self, old_id: str, new_id: str, loc: Tuple[ColumnTable, int]) -> None:
+        if self._by_id.get(old_id) == loc: del self._by_id[old_id]
+        self._by_id.setdefault(new_id, loc)
+
+    def _rebuild_index(self) -> None:
+        self._by_id = {}
+        for t, r in self._order: self._by_id.setdefault(t.ids[r], (t, r))
+
+    # --- altas/bajas ---
+    def append_row(self, kind: KindLike, **values) -> int:
+        """Agrega una fila sin crear el objeto entidad (carga masiva)."""
+        tbl = self.table(kind); row = tbl.append_values(values)
+        self._order.append((tbl, row)); self._by_id.setdefault(tbl.ids[row], (tbl, row))
+        self.structure_rev += 1
+        return row
+
+    def extend_rows(self, kind: KindLike, columns: Dict, n: int) -> range:
+        """Agrega `n` filas de un tipo en una sola operación (una revisión estructural). Devuelve sus filas."""
+        tbl = self.table(kind); row = tbl.extend_values(columns, n)
+        for r in range(row, row + n):
+            self._order.append((tbl, r)); self._by_id.setdefault(tbl.ids[r], (tbl, r))
+        self.structure_rev += 1
+        return range(row, row + n)
+
+    def release_mapped(self) -> bool:
+        """Suelta el archivo del que se cargaron las columnas (ColumnTable.release_mapped en
+        todas las tablas), p.ej. antes de sobrescribirlo: en Windows no se puede reemplazar
+        un archivo mientras siga mapeado."""
+        return any([t.release_mapped() for t in self._tables.values()])
+
+    def load_columns(self, tables: Dict[str, Tuple[Dict, Dict, int]],
+                     order: Optional[Iterable[Tuple[str, int]]] = None) -> None:
+        """Sustituye el contenido por columnas ya construidas: {tipo: (numéricas, texto, n)}.
+
+        `order` es el orden global como (tipo, fila); por defecto, tabla tras tabla.
+        """
+        for kind, (cols, text, n) in tables.items(): self.table(kind).adopt(cols, text, n)
+        if order is None: order = [(k, r) for k, t in self._tables.items() for r in range(t.n)]
+        self._order = [(self._tables[k], r) for k, r in order]
+        self._rebuild_index(); self.structure_rev += 1
+
+    def append(self, e) -> None:
+        if e.__dict__.get("_tbl") is not None:
+            raise ValueError(f"La entidad {e.id!r} ya pertenece a una escena")
+        tbl = self.table(self.kind_of(e)); d = e.__dict__
+        row = self.append_row(tbl.kind, **{c: d.pop("_v_" + c) for c in tbl.field_names})
+        d["_tbl"] = tbl; d["_row"] = row; tbl._views[row] = e
+
+    def extend(self, entities: Iterable) -> None:
+        for e in entities: self.append(e)
+
+    def remove(self, e) -> None:
+        tbl = e.__dict__.get("_tbl")
+        if tbl is None or tbl.store is not self: raise ValueError("La entidad no pertenece a esta escena")
+        row = e.__dict__["_row"]
+        self._order.remove((tbl, row))
+        self._order = [(t, r-1 if (t is tbl and r > row) else r) for t, r in self._order]
+        tbl.delete(row); self._rebuild_index(); self.structure_rev += 1
+
+    def clear(self) -> None:
+        for e in list(self): self.remove(e)
+
+    # --- protocolo de secuencia ---
+    def __len__(self) -> int: return len(self._order)
+
+    def __iter__(self) -> Iterator:
+        for t, r in self._order: yield t.view(r)
+
+    def __reversed__(self) -> Iterator:
+        for t, r in reversed(self._order): yield t.view(r)
+
+    def __getitem__(self, i: int):
+        t, r = self._order[i]
+        return t.view(r)
+
+    def __contains__(self, e) -> bool:
+        tbl = e.__dict__.get("_tbl") if hasattr(e, "__dict__") else None
+        return tbl is not None and tbl.store is self
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (SceneStore, list)): return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"SceneStore({list(self)!r})"
+
+    def iter_rows(self) -> Iterator[Tuple[str, Dict]]:
+        """(tipo, dict de campos) en orden global, sin materializar entidades."""
+        for t, r in self._order: yield t.kind, t.row_dict(r)
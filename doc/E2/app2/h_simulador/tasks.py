@@ -0,0 +1,42 @@
+from __future__ import annotations
+import math
+import threading
+import time
+from typing import Callable, Optional
+
+class Cancelled(Exception):
+    """La tarea se canceló (la lanza CancelToken.check o el callback de progreso)."""
+
+class CancelToken:
+    """Bandera de cancelación compartida entre el hilo que lanza una tarea y el que la ejecuta."""
+    __slots__ = ("_ev",)
+
+    def __init__(self):
+        self._ev = threading.Event()
+
+    def cancel(self) -> None: self._ev.set()
+
+    @property
+    def cancelled(self) -> bool: return self._ev.is_set()
+
+    def check(self) -> None:
+        if self._ev.is_set(): raise Cancelled()
+
+def throttled_progress(token: CancelToken, report: Callable[[float], None],
+                       min_interval_s: float = 0.05) -> Callable[[float], None]:
+    """Callback de progreso para el código de cálculo: comprueba la cancelación en cada
+    llamada y reenvía a `report` como mucho cada `min_interval_s` (y siempre el 100 %).
+    """
+    last = [-math.inf]
+    def progress(frac: float) -> None:
+        token.check(); now = time.monotonic()
+        if frac >= 1.0 or now - last[0] >= min_interval_s: last[0] = now; report(frac)
+    return progress
+
+# firma de las tareas: fn(token, progress) -> resultado
+TaskFn = Callable[[CancelToken, Callable[[float], None]], object]
+
+def run_inline(fn: TaskFn, token: Optional[CancelToken] = None):
+    """Ejecuta una tarea en el hilo actual (sin pool)."""
+    token = token or CancelToken()
+    return fn(token, lambda frac: token.check())
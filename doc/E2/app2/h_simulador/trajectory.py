@@ -0,0 +1,179 @@
+from __future__ import annotations
+import csv
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+import numpy as np
+
+from .propagation import TxColumns, PathLossResult, compute_path_loss
+from .intermod import IMCache, IMProducts, IMLimitError, IM_KINDS, find_im_products
+from .scenefile import write_container, read_container
+
+# nombres de columna aceptados en los CSV de trayectoria
+_CSV_COLUMNS = {"t_s": ("t_s", "t", "time", "tiempo"), "x_km": ("x_km", "x"),
+                "y_km": ("y_km", "y"), "h_km": ("h_km", "h", "alt_km")}
+
+@dataclass
+class Trajectory:
+    """Trayectoria muestreada del avión: tiempo (s) y posición (km) por paso."""
+    t_s: np.ndarray
+    x_km: np.ndarray
+    y_km: np.ndarray
+    h_km: np.ndarray
+
+    def __post_init__(self):
+        for c in ("t_s", "x_km", "y_km", "h_km"): setattr(self, c, np.asarray(getattr(self, c), dtype=np.float64))
+        if not (len(self.t_s) == len(self.x_km) == len(self.y_km) == len(self.h_km)):
+            raise ValueError("Las columnas de la trayectoria tienen longitudes distintas")
+        if len(self.t_s) > 1 and np.any(np.diff(self.t_s) < 0):
+            raise ValueError("El tiempo de la trayectoria debe ser creciente")
+
+    def __len__(self) -> int: return len(self.t_s)
+
+    @property
+    def duration_s(self) -> float: return float(self.t_s[-1] - self.t_s[0]) if len(self) else 0.0
+
+    def position_at(self, t_s: float) -> Tuple[float, float, float]:
+        """Posición interpolada linealmente en el instante `t_s` (se satura en los extremos)."""
+        return tuple(float(np.interp(t_s, self.t_s, c)) for c in (self.x_km, self.y_km, self.h_km))
+
+    def resample(self, dt_s: float) -> "Trajectory":
+        """Muestras cada `dt_s`; el último punto se conserva aunque la duración no sea múltiplo."""
+        if not len(self): return Trajectory(self.t_s, self.x_km, self.y_km, self.h_km)
+        t = np.arange(self.t_s[0], self.t_s[-1], dt_s)
+        t = np.append(t[t < self.t_s[-1] - 1e-6*dt_s], self.t_s[-1])  # sin casi-duplicado por redondeo
+        return Trajectory(t, *(np.interp(t, self.t_s, c) for c in (self.x_km, self.y_km, self.h_km)))
+
+    @classmethod
+    def from_waypoints(cls, points: Sequence[Tuple[float, float, float]], speed_kmh: float = 250.0,
+                       dt_s: float = 1.0) -> "Trajectory":
+        """Recorre los waypoints (x_km, y_km, h_km) a velocidad constante, muestreando cada dt_s."""
+        p = np.asarray(points, dtype=np.float64)
+        if p.ndim != 2 or p.shape[1] != 3 or len(p) < 2: raise ValueError("Se necesitan al menos 2 waypoints (x, y, h)")
+        seg = np.sqrt((np.diff(p, axis=0)**2).sum(axis=1))
+        t = np.concatenate([[0.0], np.cumsum(seg)]) / (speed_kmh/3600.0)
+        return cls(t, p[:, 0], p[:, 1], p[:, 2]).resample(dt_s)
+
+    @classmethod
+    def from_csv(cls, path: str) -> "Trajectory":
+        """CSV con cabecera: tiempo (t_s/t), x (x_km/x), y (y_km/y), altura (h_km/h)."""
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f); header = [h.strip().lower() for h in next(reader)]
+            cols = {}
+            for key, names in _CSV_COLUMNS.items():
+                hit = [header.index(n) for n in names if n in header]
+                if not hit: raise ValueError(f"Falta la columna '{key}' en {path}")
+                cols[key] = hit[0]
+            rows = [r for r in reader if r and any(c.strip() for c in r)]
+        data = {k: np.array([float(r[i]) for r in rows]) for k, i in cols.items()}
+        return cls(**data)
+
+@dataclass
+class TrajectoryMetrics:
+    """Métricas de todas las emisoras en todos los pasos (matrices tiempo × emisoras).
+
+    `links` es un PathLossResult con forma (n_pasos, n_emisoras): cada paso de la
+    trayectoria actúa como un receptor. `im_worst_dBm[t]` es el nivel del producto
+    de IM más fuerte en el paso t (NaN si no hay productos en banda); `im_levels`
+    da el nivel de cada producto de `im` en cualquier paso a partir de `im_coef`.
+    """
+    traj: Trajectory
+    links: PathLossResult
+    im: IMProducts
+    im_worst_dBm: np.ndarray
+    im_worst: np.ndarray  # índice del producto en `im` (−1 si no hay)
+    im_error: Optional[str] = None  # la IM no se tabuló (IMLimitError): métricas de IM vacías
+    im_coef: Optional[np.ndarray] = None  # (4, n_tipos): A, B, C, K de IMLevelModel.kind_coefficients
+
+    def __len__(self) -> int: return len(self.traj)
+
+    def im_levels(self, steps=slice(None)) -> np.ndarray:
+        """Nivel (dBm) de cada producto de `im` en los pasos `steps` (entero, slice o índices).
+
+        Devuelve (n_productos,) para un paso o (n_pasos, n_productos) para varios; se
+        calcula al pedirlo (pasos × productos puede no caber en memoria entero).
+        """
+        if self.im_coef is None: raise ValueError("La corrida no guarda los coeficientes de IM")
+        im = self.im; prx = self.links.prx_dBm[steps]
+        a, b, c, k = (v[im.kind] for v in self.im_coef)
+        return a*prx[..., im.i] + b*prx[..., im.j] + c*prx[..., im.k] + k
+
+    def steps(self, im_levels: bool = False) -> Iterator[Dict]:
+        """Un dict por paso (vistas por fila, sin copiar las matrices).
+
+        Con `im_levels` se agrega "im_dBm": el nivel de cada producto de `im` en ese paso.
+        """
+        L = self.links; tx = L.tx; prx = L.prx_dBm
+        for t in range(len(self)):
+            w = int(self.im_worst[t])
+            step = {"t_s": float(self.traj.t_s[t]), "x_km": float(self.traj.x_km[t]),
+                    "y_km": float(self.traj.y_km[t]), "h_km": float(self.traj.h_km[t]),
+                    "ids": tx.ids, "d_km": L.d_km[t], "fspl_dB": L.fspl_dB[t], "prx_dBm": prx[t], "los": L.los[t],
+                    "im_worst_dBm": float(self.im_worst_dBm[t]),
+                    "im_worst_canal_MHz": float(self.im.channels_Hz[self.im.channel[w]])/1e6 if w >= 0 else None,
+                    "im_worst_tipo": IM_KINDS[self.im.kind[w]] if w >= 0 else None}
+            if im_levels: step["im_dBm"] = self.im_levels(t)
+            yield step
+
+    def to_csv(self, path: str) -> int:
+        """Serie temporal completa en formato largo (una fila por paso y emisora). Devuelve nº de filas."""
+        L = self.links; names = L.tx.nombres; n = len(names); prx = L.prx_dBm
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["t_s", "x_km", "y_km", "h_km", "emisora", "d_km", "fspl_dB", "prx_dBm", "los",
+                        "im_peor_dBm", "im_peor_canal_MHz"])
+            for t, step in enumerate(self.steps()):
+                head = [f"{step[c]:.3f}" for c in ("t_s", "x_km", "y_km", "h_km")]
+                tail = ["" if step["im_worst_canal_MHz"] is None else f"{step['im_worst_dBm']:.2f}",
+                        "" if step["im_worst_canal_MHz"] is None else f"{step['im_worst_canal_MHz']:.3f}"]
+                w.writerows(head + [names[i], f"{L.d_km[t, i]:.4f}", f"{L.fspl_dB[t, i]:.2f}",
+                                    f"{prx[t, i]:.2f}", int(L.los[t, i])] + tail for i in range(n))
+        return len(self)*n
+
+    # --- persistencia binaria (contenedor de scenefile) ---
+    _TRAJ = ("t_s", "x_km", "y_km", "h_km")
+    _TX = ("x_km", "y_km", "h_km", "f_Hz", "potencia_W")
+    _LINKS = ("d_km", "fspl_dB", "ground_km", "elev_deg", "los")
+    _IM = ("kind", "i", "j", "k", "f_Hz", "channel", "offset_Hz", "channels_Hz")
+
+    def save(self, path: str) -> None:
+        """Guarda la corrida completa en el contenedor binario (matrices sin convertir a texto)."""
+        L = self.links
+        arrays = {**{f"traj/{c}": getattr(self.traj, c) for c in self._TRAJ},
+                  **{f"tx/{c}": getattr(L.tx, c) for c in self._TX},
+                  **{f"links/{c}": getattr(L, c) for c in self._LINKS if getattr(L, c) is not None},
+                  **{f"im/{c}": getattr(self.im, c) for c in self._IM},
+                  "im_worst_dBm": self.im_worst_dBm, "im_worst": self.im_worst,
+                  **({"im_coef": self.im_coef} if self.im_coef is not None else {})}
+        write_container(path, {"tipo": "trayectoria", "ids": list(L.tx.ids), "nombres": list(L.tx.nombres),
+                               "im_error": self.im_error}, arrays)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "TrajectoryMetrics":
+        meta, a = read_container(path, mmap)
+        if meta.get("tipo") != "trayectoria": raise ValueError("El contenedor no guarda una trayectoria")
+        tx = TxColumns(ids=meta["ids"], nombres=meta["nombres"], **{c: a[f"tx/{c}"] for c in cls._TX})
+        links = PathLossResult(tx=tx, **{c: a.get(f"links/{c}") for c in cls._LINKS})
+        return cls(traj=Trajectory(*(a[f"traj/{c}"] for c in cls._TRAJ)), links=links,
+                   im=IMProducts(**{c: a[f"im/{c}"] for c in cls._IM}),
+                   im_worst_dBm=a["im_worst_dBm"], im_worst=a["im_worst"], im_error=meta.get("im_error"),
+                   im_coef=a.get("im_coef"))
+
+def evaluate_trajectory(tx: TxColumns, traj: Trajectory, im_cache: Optional[IMCache] = None,
+                        max_block: int = 4_000_000) -> TrajectoryMetrics:
+    """Evalúa todos los pasos × todas las emisoras de una vez (sin bucle por frame).
+
+    Los niveles de IM (pasos × productos) se reducen al máximo por paso en bloques
+    de como mucho `max_block` elementos (IMCache.worst); los niveles por producto se
+    piden después con TrajectoryMetrics.im_levels. Si la tabla de IM excede el
+    límite del caché, los enlaces se devuelven igual y `im_error` explica por qué no hay IM.
+    """
+    links = compute_path_loss(tx, traj.x_km, traj.y_km, traj.h_km)
+    im_cache = im_cache or IMCache()
+    try:
+        im = im_cache.products(tx.f_Hz); err = None
+        worst, arg = im_cache.worst(tx.f_Hz, links.prx_dBm, max_block)
+    except IMLimitError as e:
+        im = find_im_products(np.empty(0), im_cache.channels_Hz); err = str(e)
+        worst = np.full(len(traj), np.nan); arg = np.full(len(traj), -1, dtype=np.intp)
+    return TrajectoryMetrics(traj=traj, links=links, im=im, im_worst_dBm=worst, im_worst=arg, im_error=err,
+                             im_coef=np.array(im_cache.model.kind_coefficients()))
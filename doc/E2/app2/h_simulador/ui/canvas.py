@@ -1,19 +1,26 @@
 from __future__ import annotations
-import math
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Set
+import numpy as np
 from PySide6 import QtCore, QtGui, QtWidgets
 
 from ..controller import SceneController
 from ..models import FMTransmitter, Aircraft, ControlTower, Entity
 from ..utils import frange, UnitsConverter
+from ..coverage import CoverageRaster, raster_rgba
+from ..trajectory import Trajectory
+from ..tasks import run_inline
+
+MAX_DIRTY_RECTS = 64  # líneas FM→avión repintadas por separado; con más, su caja envolvente
+LABEL_TEMPLATE = ": 999.99 km / 999.9 dB"  # parte numérica más ancha del rótulo de una línea
 
 class CanvasWidget(QtWidgets.QWidget):
     requestHudUpdate = QtCore.Signal()
 
-    def __init__(self, controller: SceneController, units: UnitsConverter, parent=None):
+    def __init__(self, controller: SceneController, units: UnitsConverter, parent=None, tasks=None):
         super().__init__(parent)
         self.controller = controller
         self.units = units
+        self.tasks = tasks  # ui.workers.TaskRunner opcional: recálculos pesados fuera del hilo GUI
         self.setMouseTracking(True)
         self.setFocusPolicy(QtCore.Qt.StrongFocus)
 
@@ -24,14 +31,70 @@ class CanvasWidget(QtWidgets.QWidget):
         self._drag_entity_id: Optional[str] = None
         self._last_mouse_pos = QtCore.QPoint(0,0)
 
-        self.controller.sceneChanged.connect(self.update)
+        self._static_cache: Optional[QtGui.QPixmap] = None
+        self._static_visible = QtCore.QRect()
+
+        # capa de cobertura (raster de potencia FM recibida), opcional
+        self._coverage: Optional[CoverageRaster] = None
+        self._coverage_on = False
+        self._coverage_img: Optional[QtGui.QImage] = None; self._coverage_img_rev = -1
+        self.coverage_cell_km = 0.1
+        self.coverage_h_km: Optional[float] = None  # None: altitud del avión
+        self._dynamic_region: Optional[QtGui.QRegion] = None
+        self._label_w = {}  # nombre -> ancho (px) del rótulo más largo de su línea
+        self._trajectory: Optional[Trajectory] = None  # ruta del avión (capa estática)
+
+        self.controller.changed.connect(self._on_changed)
         self.controller.hudChanged.connect(self.requestHudUpdate.emit)
         self._update_minimum_size()
 
     # ---- toggles
-    def toggle_grid(self): self._show_grid = not self._show_grid; self.update()
-    def toggle_propagation(self): self._show_propagation = not self._show_propagation; self.update()
-    def toggle_propagation_labels(self): self._show_propagation_labels = not self._show_propagation_labels; self.update()
+    def toggle_grid(self): self._show_grid = not self._show_grid; self.invalidate_static()
+    def toggle_propagation(self): self._show_propagation = not self._show_propagation; self._dynamic_region = None; self.update()
+    def toggle_propagation_labels(self): self._show_propagation_labels = not self._show_propagation_labels; self._dynamic_region = None; self.update()
+
+    def toggle_coverage(self):
+        self._coverage_on = not self._coverage_on
+        if self._coverage_on: self._build_coverage()
+        else:
+            if self.tasks is not None: self.tasks.cancel("cobertura")
+            self._coverage = None; self._coverage_img = None
+        self.invalidate_static()
+
+    def set_coverage_params(self, cell_km: float, h_km: Optional[float]):
+        self.coverage_cell_km = cell_km; self.coverage_h_km = h_km
+        if self._coverage_on: self._build_coverage()
+
+    def set_trajectory(self, traj: Optional[Trajectory]):
+        self._trajectory = traj; self.invalidate_static()
+
+    def _build_coverage(self):
+        """Raster completo; con `tasks`, en segundo plano si el último cálculo superó el presupuesto.
+        Mientras tanto se sigue mostrando el raster anterior."""
+        sc = self.controller.scene
+        cov = CoverageRaster(sc.ancho_km, sc.alto_km, self.coverage_cell_km, self._coverage_h())
+        tx = self.controller.tx_columns().copy()
+        def job(token, progress):
+            cov.compute_all(tx, progress); return cov
+        if self.tasks is None: self._set_coverage(run_inline(job))
+        else: self.tasks.run_budgeted("cobertura", job, self._set_coverage, label="Cobertura FM")
+
+    def _coverage_h(self) -> float:
+        """Altura del receptor del raster: la fija o, con coverage_h_km = None, la del avión."""
+        if self.coverage_h_km is not None: return self.coverage_h_km
+        av = self.controller.get_aircraft()
+        return av.h_km if av else 2.0
+
+    def _coverage_stale(self, cov: CoverageRaster) -> bool:
+        """El raster ya no corresponde a la escena: otras dimensiones u otra altura de receptor."""
+        sc = self.controller.scene
+        return (cov.ancho_km, cov.alto_km) != (sc.ancho_km, sc.alto_km) or cov.h_rx_km != self._coverage_h()
+
+    def _set_coverage(self, cov: CoverageRaster):
+        if not self._coverage_on: return
+        cov.update(self.controller.tx_columns())  # emisoras que cambiaron durante el cálculo
+        self._coverage = cov; self.invalidate_static()
+        if self._coverage_stale(cov): self._build_coverage()  # la escena cambió mientras se calculaba
 
     def _update_minimum_size(self):
         w = int(self.controller.scene.ancho_km * self.units.km_to_px)
@@ -42,17 +105,114 @@ class CanvasWidget(QtWidgets.QWidget):
         if event.key() == QtCore.Qt.Key_G: self.toggle_grid()
         elif event.key() == QtCore.Qt.Key_R: self.controller.reset_scene()
 
-    def paintEvent(self, event: QtGui.QPaintEvent) -> None:
-        painter = QtGui.QPainter(self); painter.setRenderHint(QtGui.QPainter.Antialiasing, True)
+    # --- capas ---
+    # Capa estática (fondo, marco, grilla y entidades que no se mueven) cacheada
+    # en un QPixmap; capa dinámica (avión, entidad arrastrada, líneas y etiquetas)
+    # pintada en cada frame solo dentro del rectángulo sucio.
+    def _scene_h_px(self) -> int:
+        return int(self.controller.scene.alto_km * self.units.km_to_px)
+
+    def _world_to_screen_px(self, x_km: float, y_km: float) -> Tuple[int,int]:
+        sx = int(round(x_km * self.units.km_to_px))
+        sy = int(round(self._scene_h_px() - y_km * self.units.km_to_px))
+        return sx, sy
+
+    def _screen_to_world_km(self, sx: float, sy: float) -> Tuple[float,float]:
+        k = self.units.km_to_px
+        return sx / k, (self._scene_h_px() - sy) / k
+
+    def _visible_rect(self) -> QtCore.QRect:
+        vis = self.visibleRegion().boundingRect()
+        return vis if not vis.isEmpty() else self.rect()
+
+    def _dynamic_ids(self) -> Set[str]:
+        ids = set(self.controller.scene.entities.table(Aircraft).ids)
+        if self._drag_entity_id: ids.add(self._drag_entity_id)
+        return ids
+
+    def _is_aircraft(self, entity_id: str) -> bool:
+        return entity_id in set(self.controller.scene.entities.table(Aircraft).ids)
+
+    def invalidate_static(self):
+        self._static_cache = None; self._dynamic_region = None; self.update()
+
+    def _on_changed(self, changes):
+        if self._coverage is not None:
+            cov = self._coverage
+            if self._coverage_stale(cov):  # p.ej. cambió la altitud del avión (edición o trayectoria)
+                if self.tasks is None or not self.tasks.is_busy("cobertura"): self._build_coverage()
+            elif cov.update(self.controller.tx_columns()):  # solo las emisoras que cambiaron
+                self.invalidate_static()
+        if changes.structural:
+            self._update_minimum_size(); self.invalidate_static(); return
+        if changes.ids - self._dynamic_ids():
+            self.invalidate_static(); return
+        # solo se movieron entidades dinámicas: repintar zona vieja ∪ zona nueva
+        new_region = self._dynamic_bounds()
+        old_region = self._dynamic_region
+        self._dynamic_region = new_region
+        self.update(new_region.united(old_region) if old_region is not None else new_region)
+
+    def _glyph_rect(self, sx: int, sy: int) -> QtCore.QRect:
+        # cubre cualquiera de los glifos (FM/avión/torre/genérico) y su rótulo
+        return QtCore.QRect(sx-40, sy-44, 80, 64)
+
+    def _label_half_widths(self, names) -> np.ndarray:
+        """Semiancho (px) del rótulo de cada línea, con su marco."""
+        fm = self.fontMetrics(); w = self._label_w
+        for n in names:
+            if n not in w: w[n] = fm.horizontalAdvance(n + LABEL_TEMPLATE) + 10
+        return np.fromiter((w[n] for n in names), dtype=np.int64, count=len(names))//2 + 1
+
+    def _line_boxes(self, av: Aircraft) -> np.ndarray:
+        """Cajas (x0, y0, x1, y1) en px de cada línea FM→`av`, rótulo incluido."""
+        tbl = self.controller.scene.entities.table(FMTransmitter)
+        k = self.units.km_to_px; h = self._scene_h_px()
+        sx1 = tbl["x_km"]*k; sy1 = h - tbl["y_km"]*k; sx2 = av.x_km*k; sy2 = h - av.y_km*k
+        box = np.stack([np.minimum(sx1, sx2), np.minimum(sy1, sy2), np.maximum(sx1, sx2), np.maximum(sy1, sy2)], axis=1)
+        if self._show_propagation_labels:
+            hw = self._label_half_widths(tbl.nombres); lh = self.fontMetrics().height()
+            midx = (sx1 + sx2)/2; midy = (sy1 + sy2)/2 - 16
+            np.minimum(box[:, 0], midx - hw, out=box[:, 0]); np.maximum(box[:, 2], midx + hw, out=box[:, 2])
+            np.minimum(box[:, 1], midy - lh, out=box[:, 1]); np.maximum(box[:, 3], midy + lh, out=box[:, 3])
+        return box
+
+    def _dynamic_bounds(self) -> QtGui.QRegion:
+        """Región (px) que ocupa la capa dinámica en el estado actual: glifos de las entidades
+        dinámicas y, una a una, las cajas de las líneas del avión (no su envolvente común)."""
+        region = QtGui.QRegion()
+        for i in self._dynamic_ids():
+            e = self.controller.get_entity(i)
+            if e: region = region.united(self._glyph_rect(*self._world_to_screen_px(e.x_km, e.y_km)))
+        av = self.controller.get_aircraft()
+        if self._show_propagation and av and len(self.controller.scene.entities.table(FMTransmitter)):
+            box = self._line_boxes(av)
+            if len(box) > MAX_DIRTY_RECTS: box = np.r_[box[:, :2].min(axis=0), box[:, 2:].max(axis=0)][None]
+            for x0, y0, x1, y1 in box.tolist():
+                region = region.united(QtCore.QRectF(x0, y0, x1-x0, y1-y0).toAlignedRect().adjusted(-2, -2, 2, 2))
+        return region
+
+    def _render_static(self) -> QtGui.QPixmap:
+        dpr = self.devicePixelRatioF()
+        pm = QtGui.QPixmap(self.size()*dpr); pm.setDevicePixelRatio(dpr)
+        painter = QtGui.QPainter(pm); painter.setRenderHint(QtGui.QPainter.Antialiasing, True)
         painter.fillRect(self.rect(), QtGui.QColor("#0b1020"))
         scene_w_px = int(self.controller.scene.ancho_km * self.units.km_to_px)
-        scene_h_px = int(self.controller.scene.alto_km * self.units.km_to_px)
+        scene_h_px = self._scene_h_px()
         scene_rect = QtCore.QRect(0,0,scene_w_px,scene_h_px)
 
-        def world_to_screen_px(x_km: float, y_km: float) -> Tuple[int,int]:
-            sx = int(round(x_km * self.units.km_to_px))
-            sy = int(round(scene_h_px - y_km * self.units.km_to_px))
-            return sx, sy
+        # cobertura
+        if self._coverage is not None:
+            cov = self._coverage
+            if self._coverage_img is None or self._coverage_img_rev != cov.revision:
+                rgba = raster_rgba(cov.power_dbm())
+                self._coverage_img = QtGui.QImage(rgba.data, cov.nx, cov.ny, cov.nx*4,
+                                                  QtGui.QImage.Format_RGBA8888).copy()
+                self._coverage_img_rev = cov.revision
+            # la última celda puede exceder el área: el raster mide nx·cell × ny·cell
+            k = self.units.km_to_px
+            target = QtCore.QRectF(0, scene_h_px - cov.ny*cov.cell_km*k, cov.nx*cov.cell_km*k, cov.ny*cov.cell_km*k)
+            painter.drawImage(target, self._coverage_img)
 
         # marco
         pen_scene = QtGui.QPen(QtGui.QColor("#8a9bb6")); pen_scene.setWidth(2)
@@ -63,41 +223,92 @@ class CanvasWidget(QtWidgets.QWidget):
             grid_pen = QtGui.QPen(QtGui.QColor(255,255,255,40)); grid_pen.setWidth(1)
             painter.setPen(grid_pen)
             for xk in frange(0.0, self.controller.scene.ancho_km, 5.0):
-                sx,_ = world_to_screen_px(xk, 0); painter.drawLine(sx,0,sx,scene_h_px)
+                sx,_ = self._world_to_screen_px(xk, 0); painter.drawLine(sx,0,sx,scene_h_px)
             for yk in frange(0.0, self.controller.scene.alto_km, 5.0):
-                _,sy = world_to_screen_px(0, yk); painter.drawLine(0,sy,scene_w_px,sy)
+                _,sy = self._world_to_screen_px(0, yk); painter.drawLine(0,sy,scene_w_px,sy)
+
+        # trayectoria del avión
+        if self._trajectory is not None and len(self._trajectory) > 1:
+            tr = self._trajectory; k = self.units.km_to_px
+            path = QtGui.QPolygonF([QtCore.QPointF(x*k, scene_h_px - y*k) for x, y in zip(tr.x_km.tolist(), tr.y_km.tolist())])
+            pen_tr = QtGui.QPen(QtGui.QColor("#7fdbff")); pen_tr.setWidth(2); pen_tr.setStyle(QtCore.Qt.DashLine)
+            painter.setPen(pen_tr); painter.drawPolyline(path)
+            painter.setBrush(QtGui.QColor("#7fdbff"))
+            for pt in (path.first(), path.last()): painter.drawEllipse(pt, 4, 4)
+            painter.setBrush(QtCore.Qt.NoBrush)
+
+        # entidades fijas (solo las que caen en la zona visible, vía índice espacial)
+        vis = self._visible_rect(); self._static_visible = vis
+        m = 40  # margen de glifo + rótulo (px)
+        x0, y1 = self._screen_to_world_km(vis.left()-m, vis.top()-m)
+        x1, y0 = self._screen_to_world_km(vis.right()+m, vis.bottom()+m)
+        dyn = self._dynamic_ids()
+        for e in self.controller.entities_in_rect(x0, y0, x1, y1):
+            if e.id not in dyn: self._draw_entity(painter, e)
+        painter.end()
+        return pm
+
+    def _draw_entity(self, painter: QtGui.QPainter, e: Entity):
+        sx, sy = self._world_to_screen_px(e.x_km, e.y_km)
+        if isinstance(e, FMTransmitter): self._draw_fm(painter, sx, sy, e)
+        elif isinstance(e, Aircraft):   self._draw_aircraft(painter, sx, sy, e)
+        elif isinstance(e, ControlTower): self._draw_tower(painter, sx, sy, e)
+        else: self._draw_generic(painter, sx, sy, e)
+
+    def resizeEvent(self, event: QtGui.QResizeEvent) -> None:
+        self._static_cache = None; super().resizeEvent(event)
+
+    def paintEvent(self, event: QtGui.QPaintEvent) -> None:
+        if (self._static_cache is None or self._static_cache.deviceIndependentSize().toSize() != self.size()
+                or not self._static_visible.contains(self._visible_rect())):
+            self._static_cache = self._render_static()
+        dirty = event.rect(); dpr = self._static_cache.devicePixelRatio()
+        painter = QtGui.QPainter(self)
+        src = QtCore.QRectF(dirty.x()*dpr, dirty.y()*dpr, dirty.width()*dpr, dirty.height()*dpr)
+        painter.drawPixmap(QtCore.QRectF(dirty), self._static_cache, src)
+        painter.setRenderHint(QtGui.QPainter.Antialiasing, True)
+
+        # entidades dinámicas
+        for eid in self._dynamic_ids():
+            e = self.controller.get_entity(eid)
+            if e: self._draw_entity(painter, e)
 
-        # entidades
+        # LOS FM→Avión (solo las líneas que cruzan el rectángulo sucio)
         av = self.controller.get_aircraft()
-        for e in self.controller.scene.entities:
-            sx, sy = world_to_screen_px(e.x_km, e.y_km)
-            if isinstance(e, FMTransmitter): self._draw_fm(painter, sx, sy, e)
-            elif isinstance(e, Aircraft):   self._draw_aircraft(painter, sx, sy, e)
-            elif isinstance(e, ControlTower): self._draw_tower(painter, sx, sy, e)
-            else: self._draw_generic(painter, sx, sy, e)
-
-        # LOS FM→Avión
-        if self._show_propagation and av:
+        hit = self.controller.links_for(av) if self._show_propagation and av else None
+        if hit:
             pen = QtGui.QPen(QtGui.QColor("#ff6347")); pen.setWidth(2)
-            painter.setPen(pen)
-            for fm in self.controller.get_all_fms():
-                sx1, sy1 = world_to_screen_px(fm.x_km, fm.y_km)
-                sx2, sy2 = world_to_screen_px(av.x_km, av.y_km)
-                painter.drawLine(sx1, sy1, sx2, sy2)
-                if self._show_propagation_labels:
-                    midx = (sx1+sx2)//2; midy = (sy1+sy2)//2
-                    d_km = math.hypot(fm.x_km - av.x_km, fm.y_km - av.y_km)
-                    f_mhz = fm.f_Hz/1e6
-                    fspl  = SceneController.compute_fspl_db(d_km, f_mhz)
-                    self._draw_label(painter, midx, midy-16, f"{fm.nombre}: {d_km:.2f} km / {fspl:.1f} dB")
+            pen_nlos = QtGui.QPen(pen); pen_nlos.setStyle(QtCore.Qt.DashLine)  # tras el horizonte radioeléctrico
+            res, r = hit
+            sx2, sy2 = self._world_to_screen_px(av.x_km, av.y_km)
+            tx = res.tx; k = self.units.km_to_px
+            sx1 = np.rint(tx.x_km*k).astype(int); sy1 = np.rint(self._scene_h_px() - tx.y_km*k).astype(int)
+            midx = (sx1+sx2)//2; midy = (sy1+sy2)//2
+            # recorte: líneas cuya caja toca el rectángulo sucio ∩ zona visible
+            clip = dirty.intersected(self._visible_rect())
+            cx0, cy0, cx1, cy1 = clip.left(), clip.top(), clip.right(), clip.bottom()
+            draw_line = ((np.minimum(sx1, sx2)-2 <= cx1) & (np.maximum(sx1, sx2)+2 >= cx0) &
+                         (np.minimum(sy1, sy2)-2 <= cy1) & (np.maximum(sy1, sy2)+2 >= cy0))
+            los = res.los[r]
+            for i in np.flatnonzero(draw_line):
+                painter.setPen(pen if los[i] else pen_nlos)
+                painter.drawLine(int(sx1[i]), int(sy1[i]), sx2, sy2)
+            if self._show_propagation_labels:
+                lh = self.fontMetrics().height(); hw = self._label_half_widths(tx.nombres)
+                near = ((midx-hw <= cx1) & (midx+hw >= cx0) & (midy-16-lh <= cy1) & (midy-16+lh >= cy0))
+                for i in np.flatnonzero(near):
+                    d_km = res.d_km[r, i]; fspl = res.fspl_dB[r, i]
+                    self._draw_label(painter, int(midx[i]), int(midy[i])-16, f"{tx.nombres[i]}: {d_km:.2f} km / {fspl:.1f} dB", clip=clip)
 
         painter.end()
+        if self._dynamic_region is None: self._dynamic_region = self._dynamic_bounds()
 
     # helpers dibujo
-    def _draw_label(self, painter: QtGui.QPainter, x:int, y:int, text:str, bg="#102a43"):
+    def _draw_label(self, painter: QtGui.QPainter, x:int, y:int, text:str, bg="#102a43", clip: Optional[QtCore.QRect]=None):
         metrics = painter.fontMetrics()
         w = metrics.horizontalAdvance(text)+10; h = metrics.height()+6
         rect = QtCore.QRect(x-w//2, y-h//2, w, h)
+        if clip is not None and not rect.intersects(clip): return
         painter.fillRect(rect, QtGui.QColor(bg))
         painter.setPen(QtGui.QPen(QtGui.QColor("#ffffff")))
         painter.drawRect(rect)
@@ -132,7 +343,10 @@ class CanvasWidget(QtWidgets.QWidget):
         if event.button() == QtCore.Qt.LeftButton:
             self.setFocus(); self._last_mouse_pos = event.position().toPoint()
             clicked_id = self._hit_test(self._last_mouse_pos)
-            if clicked_id: self._drag_entity_id = clicked_id
+            if clicked_id:
+                self._drag_entity_id = clicked_id
+                if not self._is_aircraft(clicked_id):
+                    self.invalidate_static()  # la entidad pasa a la capa dinámica mientras se arrastra
 
     def mouseMoveEvent(self, event: QtGui.QMouseEvent) -> None:
         if not self._drag_entity_id: return
@@ -146,18 +360,12 @@ class CanvasWidget(QtWidgets.QWidget):
             self.controller.set_position(e.id, e.x_km+dx_km, e.y_km+dy_km)
 
     def mouseReleaseEvent(self, event: QtGui.QMouseEvent) -> None:
-        if event.button() == QtCore.Qt.LeftButton: self._drag_entity_id = None
+        if event.button() == QtCore.Qt.LeftButton and self._drag_entity_id:
+            lifted = not self._is_aircraft(self._drag_entity_id); self._drag_entity_id = None
+            if lifted: self.invalidate_static()  # vuelve a la capa estática; el avión nunca salió de la dinámica
 
     def _hit_test(self, p: QtCore.QPoint) -> Optional[str]:
         sel_radius_px = 14
-        scene_h_px = int(self.controller.scene.alto_km * self.units.km_to_px)
-        def world_to_screen_px(x_km: float, y_km: float) -> Tuple[int,int]:
-            sx = int(round(x_km * self.units.km_to_px))
-            sy = int(round(scene_h_px - y_km * self.units.km_to_px))
-            return sx, sy
-        for e in reversed(self.controller.scene.entities or []):
-            if isinstance(e, ControlTower): continue
-            sx, sy = world_to_screen_px(e.x_km, e.y_km)
-            if abs(p.x()-sx) <= sel_radius_px and abs(p.y()-sy) <= sel_radius_px:
-                return e.id
-        return None
+        x_km, y_km = self._screen_to_world_km(p.x(), p.y())
+        e = self.controller.pick_entity(x_km, y_km, sel_radius_px / self.units.km_to_px)
+        return e.id if e else None
@@ -1,58 +1,155 @@
 from __future__ import annotations
+import numpy as np
 from PySide6 import QtCore, QtWidgets
 from ..controller import SceneController
+from ..changes import ChangeSet
+from ..models import FMTransmitter
+
+def _shown_changed(old: np.ndarray, new: np.ndarray, decimals: int) -> np.ndarray:
+    """Máscara de filas cuyo valor mostrado cambió; NaN ("--") frente a NaN no cuenta como cambio."""
+    a = np.round(old, decimals); b = np.round(new, decimals)
+    na = np.isnan(a); nb = np.isnan(b)
+    return (na != nb) | (~na & ~nb & (a != b))
+
+class FMTableModel(QtCore.QAbstractTableModel):
+    """Modelo de emisoras leído directamente de las columnas del SceneStore.
+
+    Solo d (oblicua 3D) y FSPL hacia el avión se guardan aparte; ante cada ChangeSet se
+    comparan con los valores nuevos y se emite dataChanged únicamente para las
+    filas/columnas cuyo valor mostrado cambió.
+    """
+    COL_NOMBRE=0; COL_F=1; COL_P=2; COL_D=3; COL_FSPL=4
+    HEADERS = ["Nombre","f (MHz)","P (kW)","d (km)","FSPL (dB)"]
+    SORT_ROLE = QtCore.Qt.UserRole          # valor numérico crudo (para ordenar)
+    ID_ROLE = QtCore.Qt.UserRole + 1        # id de la emisora
+    invalidValue = QtCore.Signal(str)
+
+    def __init__(self, controller: SceneController, parent=None):
+        super().__init__(parent)
+        self.controller = controller
+        self._n = 0; self._d = np.empty(0); self._L = np.empty(0)
+        self._recompute()
+        self.controller.changed.connect(self.on_changed)
+
+    def _table(self):
+        return self.controller.scene.entities.table(FMTransmitter)
+
+    def _recompute(self):
+        self._n = len(self._table())
+        hit = self.controller.links_for(self.controller.get_aircraft()) if self._n else None
+        if hit:
+            res, r = hit  # copias: el caché se actualiza en sitio y aquí se compara con lo anterior
+            self._d = res.d_km[r].copy(); self._L = res.fspl_dB[r].copy()
+        else:
+            self._d = np.full(self._n, np.nan); self._L = np.full(self._n, np.nan)
+
+    # --- actualización incremental ---
+    def on_changed(self, changes: ChangeSet):
+        if changes.structural or len(self._table()) != self._n:
+            self.beginResetModel(); self._recompute(); self.endResetModel(); return
+        old_d, old_L = self._d, self._L
+        self._recompute()
+        self._emit_rows(np.flatnonzero(_shown_changed(old_d, self._d, 3)), self.COL_D)
+        self._emit_rows(np.flatnonzero(_shown_changed(old_L, self._L, 2)), self.COL_FSPL)
+        store = self.controller.scene.entities
+        for field, col in (("f_Hz", self.COL_F), ("potencia_W", self.COL_P)):
+            rows = [store.row_of(eid) for eid in changes.ids_with(field)]
+            self._emit_rows(np.array(sorted(r for r in rows if r is not None), dtype=np.intp), col)
+
+    def _emit_rows(self, rows: np.ndarray, col: int):
+        """dataChanged por tramos contiguos de filas (una señal por tramo)."""
+        if not len(rows): return
+        cuts = np.flatnonzero(np.diff(rows) != 1) + 1
+        for run in np.split(rows, cuts):
+            self.dataChanged.emit(self.index(int(run[0]), col), self.index(int(run[-1]), col),
+                                  [QtCore.Qt.DisplayRole, self.SORT_ROLE])
+
+    # --- API de QAbstractTableModel ---
+    def rowCount(self, parent=QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._n
+
+    def columnCount(self, parent=QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal: return self.HEADERS[section]
+        return None
+
+    def flags(self, index):
+        f = super().flags(index)
+        if index.column() in (self.COL_NOMBRE, self.COL_F, self.COL_P): f |= QtCore.Qt.ItemIsEditable
+        return f
+
+    def _raw(self, row: int, col: int):
+        tbl = self._table()
+        if col == self.COL_NOMBRE: return tbl.nombres[row]
+        if col == self.COL_F: return float(tbl["f_Hz"][row])/1e6
+        if col == self.COL_P: return float(tbl["potencia_W"][row])/1e3
+        if col == self.COL_D: return float(self._d[row])
+        return float(self._L[row])
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid() or index.row() >= min(self._n, len(self._table())): return None
+        row, col = index.row(), index.column()
+        if role == self.ID_ROLE: return self._table().ids[row]
+        if role not in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole, self.SORT_ROLE): return None
+        v = self._raw(row, col)
+        if role == self.SORT_ROLE or col == self.COL_NOMBRE: return v
+        if v != v: return "--"  # NaN: no hay avión
+        return f"{v:.2f}" if col == self.COL_FSPL else f"{v:.3f}"
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole) -> bool:
+        if role != QtCore.Qt.EditRole or not index.isValid(): return False
+        fm_id = self._table().ids[index.row()]; col = index.column()
+        try:
+            if col == self.COL_NOMBRE:
+                self.controller.update_fm_params(fm_id=fm_id, nombre=str(value).strip())
+            elif col == self.COL_F:
+                self.controller.update_fm_params(fm_id=fm_id, f_MHz=float(value))
+            elif col == self.COL_P:
+                self.controller.update_fm_params(fm_id=fm_id, p_kW=float(value))
+            else:
+                return False
+        except ValueError as e:
+            self.invalidValue.emit(str(e)); return False
+        return True
 
 class FMListWidget(QtWidgets.QWidget):
     COL_NOMBRE=0; COL_F=1; COL_P=2; COL_D=3; COL_FSPL=4
 
     def __init__(self, controller: SceneController, parent=None):
         super().__init__(parent)
-        self.controller = controller; self._updating = False
+        self.controller = controller
         lay = QtWidgets.QVBoxLayout(self); self.setLayout(lay)
 
         title = QtWidgets.QLabel("Emisoras (doble clic para editar)")
         title.setStyleSheet("color:#d1e8ff; font-weight:bold;")
         lay.addWidget(title)
 
-        self.table = QtWidgets.QTableWidget(0,5,self)
-        self.table.setHorizontalHeaderLabels(["Nombre","f (MHz)","P (kW)","d (km)","FSPL (dB)"])
+        self.filter = QtWidgets.QLineEdit(); self.filter.setPlaceholderText("Filtrar por nombre…")
+        self.filter.setClearButtonEnabled(True)
+        lay.addWidget(self.filter)
+
+        self.model = FMTableModel(controller, self)
+        # Ordenar/filtrar sin copiar datos: el proxy solo reindexa filas del modelo
+        self.proxy = QtCore.QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.setSortRole(FMTableModel.SORT_ROLE)
+        self.proxy.setFilterKeyColumn(self.COL_NOMBRE)
+        self.proxy.setFilterCaseSensitivity(QtCore.Qt.CaseInsensitive)
+        self.proxy.setDynamicSortFilter(True)
+        self.filter.textChanged.connect(self.proxy.setFilterFixedString)
+
+        self.table = QtWidgets.QTableView(self)
+        self.table.setModel(self.proxy)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(-1, QtCore.Qt.AscendingOrder)  # orden de la escena hasta que se elija columna
         self.table.horizontalHeader().setStretchLastSection(True)
         self.table.setEditTriggers(QtWidgets.QAbstractItemView.DoubleClicked | QtWidgets.QAbstractItemView.SelectedClicked)
         lay.addWidget(self.table)
 
-        self.table.cellChanged.connect(self._on_cell_changed)
-        self.controller.sceneChanged.connect(self.refresh_table)
-        self.controller.hudChanged.connect(self.refresh_table)
-        self.refresh_table()
-
-    def refresh_table(self):
-        self._updating = True
-        rows = self.controller.fspl_all_to_aircraft()
-        self.table.setRowCount(len(rows))
-        for i,r in enumerate(rows):
-            it0 = QtWidgets.QTableWidgetItem(r["nombre"]); it0.setData(QtCore.Qt.UserRole, r["id"])
-            self.table.setItem(i, self.COL_NOMBRE, it0)
-            it1 = QtWidgets.QTableWidgetItem(f"{r['f_MHz']:.3f}"); self.table.setItem(i, self.COL_F, it1)
-            it2 = QtWidgets.QTableWidgetItem(f"{r['p_kW']:.3f}"); self.table.setItem(i, self.COL_P, it2)
-            it3 = QtWidgets.QTableWidgetItem(f"{r['d_km']:.3f}"); it3.setFlags(it3.flags() ^ QtCore.Qt.ItemIsEditable)
-            self.table.setItem(i, self.COL_D, it3)
-            it4 = QtWidgets.QTableWidgetItem(f"{r['fspl_dB']:.2f}"); it4.setFlags(it4.flags() ^ QtCore.Qt.ItemIsEditable)
-            self.table.setItem(i, self.COL_FSPL, it4)
-        self._updating = False
-
-    def _on_cell_changed(self, row:int, col:int):
-        if self._updating: return
-        id_item = self.table.item(row, self.COL_NOMBRE)
-        if not id_item: return
-        fm_id = id_item.data(QtCore.Qt.UserRole)
-        try:
-            if col == self.COL_NOMBRE:
-                self.controller.update_fm_params(fm_id=fm_id, nombre=self.table.item(row,col).text().strip())
-            elif col == self.COL_F:
-                self.controller.update_fm_params(fm_id=fm_id, f_MHz=float(self.table.item(row,col).text()))
-            elif col == self.COL_P:
-                self.controller.update_fm_params(fm_id=fm_id, p_kW=float(self.table.item(row,col).text()))
-        except Exception as e:
-            QtWidgets.QMessageBox.warning(self, "Valor inválido", str(e))
-        finally:
-            self.refresh_table()
+        self.model.invalidValue.connect(lambda msg: QtWidgets.QMessageBox.warning(self, "Valor inválido", msg))
+
+    def refresh_table(self, changes=None):
+        """Aplica un ChangeSet al modelo (sin argumento: recarga completa)."""
+        self.model.on_changed(changes if changes is not None else ChangeSet(structural=True))
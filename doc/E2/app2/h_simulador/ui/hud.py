@@ -1,6 +1,7 @@
 from __future__ import annotations
 from PySide6 import QtCore, QtWidgets
 from ..controller import SceneController
+from ..intermod import IMLimitError
 
 class HUDWidget(QtWidgets.QWidget):
     def __init__(self, controller: SceneController, parent=None):
@@ -16,11 +17,10 @@ class HUDWidget(QtWidgets.QWidget):
         self.text.setTextInteractionFlags(QtCore.Qt.TextSelectableByMouse)
         layout.addWidget(self.text)
 
-        self.controller.sceneChanged.connect(self.update_hud)
-        self.controller.hudChanged.connect(self.update_hud)
+        self.controller.changed.connect(self.update_hud)
         self.update_hud()
 
-    def update_hud(self):
+    def update_hud(self, changes=None):
         self.text.setTextFormat(QtCore.Qt.RichText)  # permitir HTML
 
         av = self.controller.get_aircraft()
@@ -28,19 +28,25 @@ class HUDWidget(QtWidgets.QWidget):
             self.text.setText("<span style='color:#ff8080'>No hay avión en la escena.</span>")
             return
 
-        rows = self.controller.fspl_all_to_aircraft()
+        fm = self.controller.nearest_fm(av.x_km, av.y_km)  # índice espacial, sin recorrer todas
         col_label = "#0549be"   # color de etiquetas
         col_val   = "#d66910"   # color de valores (CORREGIDO: sin '}' extra)
 
-        if rows:
-            nearest = min(rows, key=lambda r: r["d_km"])
+        hit = self.controller.links_for(av) if fm else None
+        if hit:
+            res, r = hit; i = self.controller.links.tx_index(fm.id)  # enlace ya calculado (3D)
+            nearest = {"nombre": fm.nombre, "d_km": float(res.d_km[r, i]), "f_MHz": fm.f_Hz/1e6,
+                       "fspl_dB": float(res.fspl_dB[r, i]), "elev_deg": float(res.elev_deg[r, i])}
+            los = "" if res.los[r, i] else " <span style='color:#ff8080'>(tras el horizonte)</span>"
             txt = (
                 f"<div style='font-family:monospace'>"
                 f"<span style='color:{col_label}'>Avión:</span> "
                 f"<span style='color:{col_val}'>({av.x_km:.2f} km, {av.y_km:.2f} km, h={av.h_km:.2f} km)</span><br>"
                 f"<span style='color:{col_label}'>Más cercana:</span> "
                 f"<span style='color:{col_val}'>{nearest['nombre']} → d={nearest['d_km']:.2f} km, "
-                f"f={nearest['f_MHz']:.2f} MHz, FSPL={nearest['fspl_dB']:.2f} dB</span>"
+                f"f={nearest['f_MHz']:.2f} MHz, FSPL={nearest['fspl_dB']:.2f} dB, "
+                f"elev={nearest['elev_deg']:.1f}°</span>{los}<br>"
+                f"<span style='color:{col_label}'>IM peor:</span> {self._im_text(av, col_val)}"
                 f"</div>"
             )
         else:
@@ -54,3 +60,10 @@ class HUDWidget(QtWidgets.QWidget):
 
         self.text.setText(txt)
 
+    def _im_text(self, av, col_val: str) -> str:
+        try: w = self.controller.worst_im(av)  # tabla de combinaciones memorizada; solo se reevalúan niveles
+        except IMLimitError: return "<span style='color:#ffb000'>demasiadas emisoras para tabular la IM</span>"
+        if w is None: return f"<span style='color:{col_val}'>ningún producto en banda</span>"
+        src = ", ".join(n for n in (w["f1"], w["f2"], w["f3"]) if n)
+        return (f"<span style='color:{col_val}'>{w['level_dBm']:.1f} dBm en {w['canal_MHz']:.3f} MHz "
+                f"({w['tipo']}: {src}; {w['n_products']} productos)</span>")
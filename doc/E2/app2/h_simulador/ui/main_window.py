@@ -1,19 +1,28 @@
 from __future__ import annotations
-import json
+from typing import Optional
 from PySide6 import QtCore, QtGui, QtWidgets
 
 from ..models import Scene, Aircraft, FMTransmitter
-from ..controller import SceneController
+from .qt_controller import QtSceneController
+from ..intermod import IM_KINDS, IMLimitError
 from ..utils import UnitsConverter
 from .canvas import CanvasWidget
 from .stats import StatsWidget
 from .fm_list import FMListWidget
 from .hud import HUDWidget
 from .dialogs import AddFmDialog
+from .playback import TrajectoryPlayer
+from ..trajectory import Trajectory
+from ..registry import read_registry, add_registry
+from ..scenefile import save_scene, load_scene, snapshot_scene, is_container, StreamingSceneLoader, BINARY_EXT
+from .workers import TaskRunner, TaskStatusWidget
+from ..profiling import Profiler, instrument_controller
+from .profiler_widget import ProfilerWidget, instrument_paint
 
 class MainWindow(QtWidgets.QMainWindow):
-    def __init__(self):
+    def __init__(self, profiler: Optional[Profiler] = None):
         super().__init__()
+        self.profiler = profiler  # instrumentación opcional (run_desktop.py --perfil)
         self.setWindowTitle("H.SimuladorPythonANE — Modular")
 
         # Escena inicial
@@ -22,14 +31,19 @@ class MainWindow(QtWidgets.QMainWindow):
         fm1 = FMTransmitter(id="FM_1", nombre="FM_1", x_km=30.0, y_km=15.0, h_km=0.1, potencia_W=10e3, f_Hz=100e6)
         scene.entities.extend([avion, fm1])
 
-        self.controller = SceneController(scene)
+        self.controller = QtSceneController(scene, parent=self)
+        if profiler is not None: instrument_controller(self.controller, profiler)  # antes de conectar widgets
         # Torre inicial en una esquina interna
         self.controller.add_control_tower(5.0, 5.0, 0.05)
 
         self.units = UnitsConverter(km_to_px=10.0)
 
+        # Tareas en segundo plano (persistencia y recálculos pesados)
+        self.tasks = TaskRunner(self)
+        self.statusBar().addPermanentWidget(TaskStatusWidget(self.tasks))
+
         # Centro (canvas)
-        self.canvas = CanvasWidget(self.controller, self.units)
+        self.canvas = CanvasWidget(self.controller, self.units, tasks=self.tasks)
         self.setCentralWidget(self.canvas)
 
         # Docks
@@ -45,6 +59,20 @@ class MainWindow(QtWidgets.QMainWindow):
         dock_stats = QtWidgets.QDockWidget("Estadísticas", self); dock_stats.setWidget(self.stats)
         self.addDockWidget(QtCore.Qt.RightDockWidgetArea, dock_stats)
 
+        self.dock_profiler = None
+        if profiler is not None:
+            for w, name in ((self.canvas, "CanvasWidget"), (self.hud.text, "HUDWidget"),
+                            (self.stats.label, "StatsWidget"), (self.fm_list.table, "FMListWidget")):
+                instrument_paint(w, profiler, name)
+            self.dock_profiler = QtWidgets.QDockWidget("Perfilado", self); self.dock_profiler.setWidget(ProfilerWidget(profiler))
+            self.addDockWidget(QtCore.Qt.BottomDockWidgetArea, self.dock_profiler)
+
+        # Trayectoria del avión (modo reproducción)
+        self.player = TrajectoryPlayer(self.controller, self)
+        self.player.stepChanged.connect(self._on_traj_step)
+        self.player.finished.connect(lambda: self.act_traj_play.setChecked(False))
+        self.traj_metrics = None
+
         self._build_actions(); self._build_menu(); self._build_toolbar()
         self.resize(1200, 800)
 
@@ -61,8 +89,21 @@ class MainWindow(QtWidgets.QMainWindow):
         self.act_propag = QtGui.QAction("Líneas de propagación", self, checkable=True, checked=True); self.act_propag.triggered.connect(self.canvas.toggle_propagation)
         self.act_propag_labels = QtGui.QAction("Etiquetas en líneas", self, checkable=True, checked=True); self.act_propag_labels.triggered.connect(self.canvas.toggle_propagation_labels)
 
+        self.act_coverage = QtGui.QAction("Mapa de cobertura FM", self, checkable=True, checked=False); self.act_coverage.triggered.connect(self.canvas.toggle_coverage)
+        self.act_coverage_params = QtGui.QAction("Parámetros de cobertura…", self); self.act_coverage_params.triggered.connect(self._on_coverage_params)
+
+        self.act_intermod = QtGui.QAction("Intermodulación en banda aeronáutica…", self); self.act_intermod.triggered.connect(self._on_intermod)
+
+        self.act_traj_load = QtGui.QAction("Cargar trayectoria (CSV)…", self); self.act_traj_load.triggered.connect(self._on_traj_load)
+        self.act_traj_play = QtGui.QAction("Reproducir trayectoria", self, checkable=True, checked=False)
+        self.act_traj_play.setShortcut("Space"); self.act_traj_play.setEnabled(False); self.act_traj_play.toggled.connect(self._on_traj_play)
+        self.act_traj_speed = QtGui.QAction("Velocidad de reproducción…", self); self.act_traj_speed.triggered.connect(self._on_traj_speed)
+        self.act_traj_export = QtGui.QAction("Exportar serie temporal (CSV)…", self); self.act_traj_export.setEnabled(False)
+        self.act_traj_export.triggered.connect(self._on_traj_export)
+
         self.act_add_fm = QtGui.QAction("Agregar emisora…", self); self.act_add_fm.setShortcut("Ctrl+N")
         self.act_add_fm.triggered.connect(self._on_add_fm)
+        self.act_import_fm = QtGui.QAction("Importar registro FM (CSV)…", self); self.act_import_fm.triggered.connect(self._on_import_fm)
 
         self.act_add_tower = QtGui.QAction("Torre de control (fija)", self); self.act_add_tower.triggered.connect(self._on_add_tower)
 
@@ -72,9 +113,15 @@ class MainWindow(QtWidgets.QMainWindow):
 
         m_view = self.menuBar().addMenu("&Ver")
         m_view.addAction(self.act_grid); m_view.addAction(self.act_propag); m_view.addAction(self.act_propag_labels)
+        m_view.addSeparator(); m_view.addAction(self.act_coverage); m_view.addAction(self.act_coverage_params)
+        if self.dock_profiler is not None: m_view.addSeparator(); m_view.addAction(self.dock_profiler.toggleViewAction())
 
-        m_fm = self.menuBar().addMenu("&Emisoras"); m_fm.addAction(self.act_add_fm)
+        m_fm = self.menuBar().addMenu("&Emisoras"); m_fm.addAction(self.act_add_fm); m_fm.addAction(self.act_import_fm)
         m_insert = self.menuBar().addMenu("&Insertar"); m_insert.addAction(self.act_add_tower)
+        m_analysis = self.menuBar().addMenu("A&nálisis"); m_analysis.addAction(self.act_intermod)
+        m_traj = self.menuBar().addMenu("&Trayectoria")
+        m_traj.addAction(self.act_traj_load); m_traj.addAction(self.act_traj_play); m_traj.addAction(self.act_traj_speed)
+        m_traj.addAction(self.act_traj_export)
 
         m_help = self.menuBar().addMenu("A&yuda")
         about = QtGui.QAction("Acerca de", self); about.triggered.connect(self._show_about); m_help.addAction(about)
@@ -98,6 +145,106 @@ class MainWindow(QtWidgets.QMainWindow):
         self.controller.add_fm(nombre=vals["nombre"], x_km=vals["x_km"], y_km=vals["y_km"],
                                h_km=vals["h_km"], f_MHz=vals["f_MHz"], p_kW=vals["p_kW"])
 
+    def _on_import_fm(self):
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Importar registro FM", "", "CSV (*.csv *.txt)")
+        if not path: return
+        sc = self.controller.scene; area = (sc.ancho_km, sc.alto_km)
+        # lectura y conversión en el pool; el alta (una notificación) en el hilo GUI
+        self.tasks.submit("importar", lambda token, progress: read_registry(path, area, progress=progress),
+                          self._on_registry_read, lambda e: self._on_task_error(e, "Error al importar"),
+                          label="Importando registro FM")
+
+    def _on_registry_read(self, res):
+        rep = add_registry(self.controller, *res)
+        QtWidgets.QMessageBox.information(self, "Importar registro FM",
+            f"{rep['importadas']} emisoras importadas de {rep['leidas']} filas.\n"
+            f"Fuera del área: {rep['fuera_area']}   Inválidas: {rep['invalidas']}")
+
+    def _on_coverage_params(self):
+        cell_m, ok = QtWidgets.QInputDialog.getDouble(self, "Cobertura", "Resolución de celda (m):",
+                                                      self.canvas.coverage_cell_km*1e3, 10.0, 5000.0, 0)
+        if not ok: return
+        av = self.controller.get_aircraft()
+        h_def = self.canvas.coverage_h_km if self.canvas.coverage_h_km is not None else (av.h_km if av else 2.0)
+        h_km, ok = QtWidgets.QInputDialog.getDouble(self, "Cobertura", "Altitud del receptor (km):", h_def, 0.0, 15.0, 3)
+        if not ok: return
+        self.canvas.set_coverage_params(cell_m/1e3, h_km)
+
+    def _on_intermod(self):
+        tol_kHz, ok = QtWidgets.QInputDialog.getDouble(self, "Intermodulación", "Tolerancia respecto al canal (kHz):",
+                                                       self.controller.intermod.tol_Hz/1e3, 0.0, 12.5, 1)
+        if not ok: return
+        self.controller.intermod.configure(tol_Hz=tol_kHz*1e3); self.hud.update_hud()
+        try: im = self.controller.intermod_products()
+        except IMLimitError as e:
+            QtWidgets.QMessageBox.warning(self, "Intermodulación", f"{e}. Reduzca la tolerancia o el número de emisoras."); return
+        if not len(im):
+            QtWidgets.QMessageBox.information(self, "Intermodulación", "Ningún producto cae en canales aeronáuticos."); return
+        per_kind = [f"  {name}: {int((im.kind == k).sum())}" for k, name in enumerate(IM_KINDS)]
+        top = sorted(im.channels_hit().items(), key=lambda kv: -kv[1])[:10]
+        lines = [f"{len(im)} productos en {len(im.channels_hit())} canales (±{tol_kHz:.1f} kHz)", *per_kind, "",
+                 "Canales más afectados:", *(f"  {f:.3f} MHz: {n}" for f, n in top)]
+        QtWidgets.QMessageBox.information(self, "Intermodulación", "\n".join(lines))
+
+    # --- trayectoria ---
+    def _on_traj_load(self):
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Cargar trayectoria", "", "CSV (*.csv)")
+        if not path: return
+        try:
+            self.set_trajectory(Trajectory.from_csv(path))
+        except Exception as e:
+            QtWidgets.QMessageBox.critical(self, "Error al cargar trayectoria", str(e))
+
+    def set_trajectory(self, traj: Trajectory):
+        self.act_traj_play.setChecked(False)
+        self.player.set_trajectory(traj); self.canvas.set_trajectory(traj)
+        self.traj_metrics = None; self.act_traj_play.setEnabled(False); self.act_traj_export.setEnabled(False)
+        # todos los pasos de una vez; en segundo plano si la evaluación anterior fue lenta
+        self.tasks.run_budgeted("trayectoria", self.controller.trajectory_job(traj), self._on_traj_ready,
+                                self._on_task_error, label="Evaluando trayectoria")
+
+    def _on_traj_ready(self, m):
+        if m.traj is not self.player.traj: return  # llegó tarde: ya hay otra trayectoria
+        self.traj_metrics = m
+        self.act_traj_play.setEnabled(True); self.act_traj_export.setEnabled(True)
+        im_txt = f"  (sin IM: {m.im_error})" if m.im_error else ""
+        self.statusBar().showMessage(f"Trayectoria: {len(m.traj)} pasos, {m.traj.duration_s:.0f} s{im_txt}")
+
+    def _on_traj_play(self, on: bool):
+        if on: self.player.play()
+        else: self.player.pause()
+
+    def _on_traj_speed(self):
+        speed, ok = QtWidgets.QInputDialog.getDouble(self, "Trayectoria", "Velocidad (× tiempo real):",
+                                                     self.player.speed, 0.1, 1000.0, 1)
+        if ok: self.player.set_speed(speed)
+
+    def _on_traj_step(self, step: int):
+        m = self.traj_metrics
+        if m is None or step >= len(m): return
+        im = m.im_worst_dBm[step]
+        im_txt = f"IM peor {im:.1f} dBm" if im == im else "sin IM en banda"
+        self.statusBar().showMessage(f"t = {m.traj.t_s[step]:.1f} s  (paso {step+1}/{len(m)})  {im_txt}")
+
+    def _on_traj_export(self):
+        if self.player.traj is None: return
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Exportar serie temporal", "serie_temporal.csv",
+                                                        f"CSV (*.csv);;Corrida binaria (*{BINARY_EXT})")
+        if not path: return
+        # se recalcula (las emisoras pudieron cambiar desde que se cargó la trayectoria) y se escribe en segundo plano
+        evaluate = self.controller.trajectory_job(self.player.traj)
+        def job(token, progress):
+            m = evaluate(token, progress)
+            if path.lower().endswith(BINARY_EXT): m.save(path); return m, "Corrida guardada en binario."
+            return m, f"{m.to_csv(path)} filas escritas."
+        def done(res):
+            m, msg = res; self._on_traj_ready(m); self.statusBar().showMessage(f"Exportar: {msg}", 5000)
+        self.tasks.submit("exportar", job, done, lambda e: self._on_task_error(e, "Error al exportar"),
+                          label="Exportando serie temporal")
+
+    def _on_task_error(self, e: Exception, title: str = "Error"):
+        QtWidgets.QMessageBox.critical(self, title, str(e))
+
     def _on_add_tower(self):
         if self.controller.has_control_tower():
             QtWidgets.QMessageBox.information(self, "Torre", "Ya hay una torre de control en la escena."); return
@@ -106,24 +253,42 @@ class MainWindow(QtWidgets.QMainWindow):
 
     # --- persistencia ---
     def save_scene(self):
-        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Guardar escena", "escena.json", "JSON (*.json)")
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Guardar escena", "escena.json",
+                                                        f"JSON (*.json);;Escena binaria (*{BINARY_EXT})")
         if not path: return
-        try:
-            with open(path,"w",encoding="utf-8") as f: json.dump(self.controller.scene.to_dict(), f, ensure_ascii=False, indent=2)
-            QtWidgets.QMessageBox.information(self, "Guardar", "Escena guardada correctamente.")
-        except Exception as e:
-            QtWidgets.QMessageBox.critical(self, "Error al guardar", str(e))
+        self.controller.release_mapped()  # la escena pudo cargarse mapeada de `path`: soltar el archivo
+        snap = snapshot_scene(self.controller.scene)  # foto en el hilo GUI; se puede seguir editando
+        self.tasks.submit("guardar", lambda token, progress: save_scene(snap, path),  # binario o JSON según extensión
+                          lambda _: self.statusBar().showMessage(f"Escena guardada en {path}", 5000),
+                          lambda e: self._on_task_error(e, "Error al guardar"), label="Guardando escena")
 
     def load_scene(self):
-        path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Cargar escena", "escena.json", "JSON (*.json)")
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Cargar escena", "escena.json",
+                                                        f"Escenas (*.json *{BINARY_EXT});;Todos (*)")
         if not path: return
-        try:
-            with open(path,"r",encoding="utf-8") as f: data = json.load(f)
-            self.controller.scene = Scene.from_dict(data)
-            self.controller.sceneChanged.emit(); self.controller.hudChanged.emit()
-            self.canvas.update(); QtWidgets.QMessageBox.information(self, "Cargar", "Escena cargada correctamente.")
-        except Exception as e:
-            QtWidgets.QMessageBox.critical(self, "Error al cargar", str(e))
+        # cancelar descarta la lectura: la escena actual queda como estaba
+        self.tasks.submit("cargar", lambda token, progress: self._load_job(path, progress), self._on_scene_loaded,
+                          lambda e: self._on_task_error(e, "Error al cargar"), label="Cargando escena")
+
+    @staticmethod
+    def _load_job(path: str, progress):
+        """(escena, error). Se lee en una escena nueva (formato detectado por contenido); un JSON
+        dañado conserva las entidades leídas hasta el error."""
+        if is_container(path): return load_scene(path), None
+        loader = StreamingSceneLoader(path)
+        try: return loader.run(progress), None
+        except (ValueError, UnicodeDecodeError) as e: return loader.scene, str(e)
+
+    def _on_scene_loaded(self, res):
+        scene, err = res
+        self.controller.set_scene(scene)  # sustitución atómica en el hilo GUI
+        self.canvas.update()
+        if err: QtWidgets.QMessageBox.warning(self, "Cargar", f"Escena incompleta ({len(scene.entities)} entidades): {err}")
+        else: self.statusBar().showMessage(f"Escena cargada: {len(scene.entities)} entidades", 5000)
+
+    def closeEvent(self, event: QtGui.QCloseEvent) -> None:
+        self.tasks.cancel(); self.tasks.wait(5000)
+        super().closeEvent(event)
 
     def _show_about(self):
         QtWidgets.QMessageBox.information(self, "Acerca de",
@@ -133,4 +298,4 @@ class MainWindow(QtWidgets.QMainWindow):
             "• Líneas de propagación con etiquetas\n"
             "• Tabla editable (Nombre, f, P)\n"
             "• Estadística con pérdidas Avión y Torre\n"
-            "• Guardar/Cargar escena (JSON)")
+            "• Guardar/Cargar escena (JSON o binario .hsim)")
@@ -0,0 +1,64 @@
+from __future__ import annotations
+from typing import Optional
+import numpy as np
+from PySide6 import QtCore
+
+from ..controller import SceneController
+from ..trajectory import Trajectory
+
+class TrajectoryPlayer(QtCore.QObject):
+    """Reproduce una trayectoria moviendo el avión de la escena.
+
+    El paso mostrado sale del tiempo transcurrido × `speed` (no de contar ticks),
+    así una máquina lenta salta pasos en lugar de ralentizar la reproducción. Las
+    métricas por paso ya están precalculadas (SceneController.evaluate_trajectory).
+    """
+    stepChanged = QtCore.Signal(int)
+    finished = QtCore.Signal()
+
+    def __init__(self, controller: SceneController, parent=None, interval_ms: int = 33, speed: float = 10.0):
+        super().__init__(parent)
+        self.controller = controller
+        self.traj: Optional[Trajectory] = None
+        self.speed = float(speed)  # × tiempo real
+        self.step = -1
+        self._t0 = 0.0
+        self._clock = QtCore.QElapsedTimer()
+        self._timer = QtCore.QTimer(self); self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._tick)
+
+    def set_trajectory(self, traj: Optional[Trajectory]):
+        self.stop(); self.traj = traj; self.step = -1
+
+    def is_playing(self) -> bool: return self._timer.isActive()
+
+    def set_speed(self, speed: float):
+        """Cambia la velocidad (× tiempo real); en plena reproducción sigue desde el instante actual."""
+        if speed <= 0: raise ValueError("La velocidad de reproducción debe ser positiva")
+        if self.is_playing(): self._t0 = self._sim_t(); self._clock.restart()
+        self.speed = float(speed)
+
+    def play(self):
+        if self.traj is None or not len(self.traj): return
+        if self.step < 0 or self.step >= len(self.traj) - 1: self.step = 0
+        self._t0 = float(self.traj.t_s[self.step]); self._clock.start(); self._timer.start()
+        self.seek(self.step)
+
+    def pause(self): self._timer.stop()
+
+    def stop(self): self._timer.stop(); self.step = -1
+
+    def seek(self, step: int):
+        av = self.controller.get_aircraft()
+        if self.traj is None or av is None: return
+        self.step = int(np.clip(step, 0, len(self.traj) - 1)); t = self.step
+        self.controller.set_position(av.id, float(self.traj.x_km[t]), float(self.traj.y_km[t]), float(self.traj.h_km[t]))
+        self.stepChanged.emit(self.step)
+
+    def _sim_t(self) -> float: return self._t0 + self._clock.elapsed()/1000.0*self.speed
+
+    def _tick(self):
+        sim_t = self._sim_t()
+        step = int(np.searchsorted(self.traj.t_s, sim_t, side="right")) - 1
+        if step != self.step: self.seek(step)
+        if step >= len(self.traj) - 1: self._timer.stop(); self.finished.emit()
@@ -0,0 +1,69 @@
+from __future__ import annotations
+from typing import Optional
+from PySide6 import QtCore, QtWidgets
+
+from ..profiling import Profiler
+
+def instrument_paint(widget: QtWidgets.QWidget, profiler: Profiler, name: Optional[str] = None) -> None:
+    """Mide el paintEvent de `widget` (también el de widgets C++ como QLabel o QTableView).
+
+    Se sustituye en la instancia, no en la clase: solo afecta a los widgets instrumentados.
+    """
+    name = name or type(widget).__name__
+    base = type(widget).paintEvent
+    widget.paintEvent = profiler.timed(f"{name}.paintEvent", lambda ev, w=widget: base(w, ev), cat="paint")
+
+class ProfilerWidget(QtWidgets.QWidget):
+    """Panel de depuración: p50/p95/max por manejador, pausa, reinicio y exportación de traza."""
+    COLS = ["Manejador", "n", "p50 (ms)", "p95 (ms)", "max (ms)", "total (ms)"]
+    KEYS = ["nombre", "n", "p50_ms", "p95_ms", "max_ms", "total_ms"]
+
+    def __init__(self, profiler: Profiler, parent=None, refresh_ms: int = 500):
+        super().__init__(parent)
+        self.profiler = profiler
+        lay = QtWidgets.QVBoxLayout(self)
+        bar = QtWidgets.QHBoxLayout()
+        self.chk = QtWidgets.QCheckBox("Medir"); self.chk.setChecked(profiler.enabled)
+        self.chk.toggled.connect(lambda on: setattr(self.profiler, "enabled", on))
+        btn_reset = QtWidgets.QPushButton("Reiniciar"); btn_reset.clicked.connect(self._on_reset)
+        btn_export = QtWidgets.QPushButton("Exportar traza…"); btn_export.clicked.connect(self._on_export)
+        bar.addWidget(self.chk); bar.addStretch(1); bar.addWidget(btn_reset); bar.addWidget(btn_export)
+        lay.addLayout(bar)
+
+        self.table = QtWidgets.QTableWidget(0, len(self.COLS), self)
+        self.table.setHorizontalHeaderLabels(self.COLS); self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(0, QtWidgets.QHeaderView.Stretch)
+        lay.addWidget(self.table)
+
+        # refresco periódico solo mientras el panel está visible
+        self._timer = QtCore.QTimer(self); self._timer.setInterval(refresh_ms); self._timer.timeout.connect(self.refresh)
+
+    def showEvent(self, ev):
+        super().showEvent(ev); self.refresh(); self._timer.start()
+
+    def hideEvent(self, ev):
+        self._timer.stop(); super().hideEvent(ev)
+
+    def refresh(self):
+        rows = self.profiler.summary()
+        self.table.setRowCount(len(rows))
+        for i, r in enumerate(rows):
+            for j, k in enumerate(self.KEYS):
+                v = r[k]; txt = v if isinstance(v, str) else (str(v) if k == "n" else f"{v:.2f}")
+                item = self.table.item(i, j)
+                if item is None: item = QtWidgets.QTableWidgetItem(); self.table.setItem(i, j, item)
+                item.setText(txt)
+                if j: item.setTextAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+
+    def _on_reset(self):
+        self.profiler.reset(); self.refresh()
+
+    def _on_export(self):
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Exportar traza", "traza.json", "Chrome trace (*.json)")
+        if not path: return
+        try:
+            n = self.profiler.export_chrome_trace(path)
+        except OSError as e:
+            QtWidgets.QMessageBox.critical(self, "Error al exportar", str(e)); return
+        QtWidgets.QMessageBox.information(self, "Traza exportada", f"{n} eventos en {path}\n(abrir con chrome://tracing o ui.perfetto.dev)")
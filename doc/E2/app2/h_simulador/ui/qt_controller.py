@@ -0,0 +1,52 @@
+from __future__ import annotations
+import time
+from typing import Callable
+from PySide6 import QtCore
+
+from ..controller import SceneController
+from ..models import Scene
+
+class CoalescingDispatcher(QtCore.QObject):
+    """Entrega como máximo una notificación por vuelta del event loop y por frame.
+
+    `schedule()` puede llamarse muchas veces; `deliver` se ejecuta una sola vez
+    cuando el event loop retoma el control (y no antes de 1/max_fps desde la
+    entrega anterior). Sin QCoreApplication (scripts, pruebas) entrega al instante.
+    """
+    def __init__(self, deliver: Callable[[], None], max_fps: float = 60.0, parent=None):
+        super().__init__(parent)
+        self._deliver = deliver
+        self._min_interval = 1.0/max_fps if max_fps > 0 else 0.0
+        self._last = 0.0
+        self._timer = QtCore.QTimer(self); self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._fire)
+
+    def schedule(self):
+        if QtCore.QCoreApplication.instance() is None: self._fire(); return
+        if self._timer.isActive(): return
+        wait = max(0.0, self._last + self._min_interval - time.monotonic())
+        self._timer.start(int(wait*1000))
+
+    def cancel(self): self._timer.stop()
+
+    def _fire(self):
+        self._last = time.monotonic(); self._deliver()
+
+class ControllerSignals(QtCore.QObject):
+    sceneChanged = QtCore.Signal()
+    hudChanged = QtCore.Signal()
+    changed = QtCore.Signal(object)  # ChangeSet
+
+class QtSceneController(SceneController):
+    """SceneController para la interfaz: notificaciones como señales Qt, coalescidas por frame.
+
+    Los Event del núcleo se sustituyen por las señales de un QObject auxiliar
+    (misma API connect/emit), así los widgets se conectan como a cualquier señal Qt
+    y Qt desconecta solo los slots de widgets destruidos.
+    """
+    def __init__(self, scene: Scene, max_fps: float = 60.0, cell_km: float = 2.0, parent=None):
+        self.signals = ControllerSignals(parent)
+        super().__init__(scene, cell_km, CoalescingDispatcher(self._deliver, max_fps, self.signals))
+        self.sceneChanged = self.signals.sceneChanged
+        self.hudChanged = self.signals.hudChanged
+        self.changed = self.signals.changed
@@ -17,14 +17,13 @@ class StatsWidget(QtWidgets.QWidget):
         self.label.setTextInteractionFlags(QtCore.Qt.TextSelectableByMouse)
         layout.addWidget(self.label)
 
-        self.controller.sceneChanged.connect(self.update_stats)
-        self.controller.hudChanged.connect(self.update_stats)
+        self.controller.changed.connect(self.update_stats)
         self.update_stats()
 
     def set_text_color(self, color_css: str):
         self.label.setStyleSheet(f"color:{color_css}; font-family:monospace;")
 
-    def update_stats(self):
+    def update_stats(self, changes=None):
         overview = self.controller.stats_overview()
         if overview["count"] == 0:
             self.label.setText("No hay emisoras.")
@@ -38,10 +37,11 @@ class StatsWidget(QtWidgets.QWidget):
         lines.append(f"Mejor FM→Avión: {best['nombre']} (d={best['d_km']:.2f} km, FSPL={best['fspl_dB']:.2f} dB)")
         lines.append("")
 
-        rows_av = self.controller.fspl_all_to_aircraft()
+        av = self.controller.get_aircraft()
         tower = self.controller.get_control_tower()
-        rows_tw = self.controller.fspl_all_to_target(tower) if tower else []
-        map_tw = {r["id"]: r for r in rows_tw} if rows_tw else {}
+        res, r_av = self.controller.links_for(av)  # mismo resultado cacheado que HUD/tabla/lienzo
+        rows_av = res.rows(r_av)
+        map_tw = {r["id"]: r for r in res.rows(self.controller.links.rx_index(tower.id))} if tower else {}
 
         if tower:
             lines.append("Por emisora (FM):       d_avión  FSPL_avión    d_torre  FSPL_torre   f(MHz)  P(kW)")
@@ -0,0 +1,136 @@
+from __future__ import annotations
+import time
+from typing import Callable, Dict, Optional
+from PySide6 import QtCore, QtWidgets
+
+from ..tasks import Cancelled, CancelToken, TaskFn, run_inline, throttled_progress
+
+class _TaskSignals(QtCore.QObject):
+    progress = QtCore.Signal(float)
+    done = QtCore.Signal(object, float)   # resultado, duración (ms)
+    failed = QtCore.Signal(object)        # excepción
+    cancelled = QtCore.Signal()
+
+class Task(QtCore.QRunnable):
+    """Ejecuta `fn(token, progress)` en un hilo del pool; el resto llega por señales.
+
+    Las señales viven en un QObject del hilo GUI, así los slots conectados a
+    métodos de QObject se ejecutan en el hilo GUI (conexión en cola).
+    """
+    def __init__(self, key: str, fn: TaskFn, label: str = ""):
+        super().__init__()
+        self.key = key; self.fn = fn; self.label = label or key
+        self.token = CancelToken(); self.signals = _TaskSignals()
+        self.setAutoDelete(False)  # el runner guarda la referencia hasta la última señal
+
+    def run(self):
+        progress = throttled_progress(self.token, self.signals.progress.emit)
+        t0 = time.perf_counter()
+        try:
+            self.token.check(); res = self.fn(self.token, progress)
+        except Cancelled:
+            self.signals.cancelled.emit(); return
+        except Exception as e:
+            self.signals.failed.emit(e); return
+        if self.token.cancelled: self.signals.cancelled.emit()
+        else: self.signals.done.emit(res, (time.perf_counter() - t0)*1e3)
+
+class TaskRunner(QtCore.QObject):
+    """Tareas en segundo plano (QThreadPool) con cancelación, progreso y una por clave.
+
+    - `submit(key, fn, on_done)`: una tarea nueva cancela la anterior con la misma
+      clave (su resultado se descarta). `on_done(resultado)` corre en el hilo GUI,
+      que es donde se sustituye el resultado (p.ej. SceneController.set_scene).
+    - `run_budgeted(...)`: ejecuta en línea si la última ejecución de esa clave
+      cupo en el presupuesto de tiempo; si no (o la primera vez), en el pool.
+    """
+    started = QtCore.Signal(str)            # etiqueta
+    progressed = QtCore.Signal(str, float)  # etiqueta, fracción
+    finished = QtCore.Signal(str)           # etiqueta (terminada, fallida o cancelada)
+
+    def __init__(self, parent=None, pool: Optional[QtCore.QThreadPool] = None):
+        super().__init__(parent)
+        self.pool = pool or QtCore.QThreadPool.globalInstance()
+        self._tasks: Dict[str, Task] = {}
+        self._callbacks: Dict[Task, tuple] = {}
+        self._alive: set = set()  # tareas en el pool (incluidas las canceladas que aún no salieron)
+        self._last_ms: Dict[str, float] = {}
+
+    def is_busy(self, key: Optional[str] = None) -> bool:
+        return bool(self._tasks) if key is None else key in self._tasks
+
+    def submit(self, key: str, fn: TaskFn, on_done: Callable[[object], None],
+               on_error: Optional[Callable[[Exception], None]] = None, label: str = "") -> Task:
+        self.cancel(key)
+        task = Task(key, fn, label); s = task.signals
+        self._tasks[key] = task; self._callbacks[task] = (on_done, on_error); self._alive.add(task)
+        s.progress.connect(lambda f, t=task: self.progressed.emit(t.label, f))
+        s.done.connect(lambda res, ms, t=task: self._on_done(t, res, ms))
+        s.failed.connect(lambda e, t=task: self._on_failed(t, e))
+        s.cancelled.connect(lambda t=task: self._release(t))
+        self.started.emit(task.label); self.pool.start(task)
+        return task
+
+    def run_budgeted(self, key: str, fn: TaskFn, on_done: Callable[[object], None],
+                     on_error: Optional[Callable[[Exception], None]] = None,
+                     budget_ms: float = 30.0, label: str = ""):
+        last = self._last_ms.get(key)
+        if last is None or last > budget_ms or self.is_busy(key):
+            return self.submit(key, fn, on_done, on_error, label)
+        t0 = time.perf_counter()
+        try: res = run_inline(fn)
+        except Exception as e:
+            if on_error is None: raise
+            on_error(e); return None
+        self._last_ms[key] = (time.perf_counter() - t0)*1e3
+        on_done(res)
+        return None
+
+    def cancel(self, key: Optional[str] = None):
+        """Cancela la tarea `key` (o todas). Su resultado ya no se entregará."""
+        for k in ([key] if key is not None else list(self._tasks)):
+            task = self._tasks.pop(k, None)
+            if task is not None: task.token.cancel(); self._callbacks.pop(task, None); self.finished.emit(task.label)
+
+    def wait(self, msecs: int = -1) -> bool:
+        return self.pool.waitForDone(msecs)
+
+    def _release(self, task: Task) -> Optional[tuple]:
+        self._alive.discard(task); cb = self._callbacks.pop(task, None)
+        if self._tasks.get(task.key) is task: del self._tasks[task.key]; self.finished.emit(task.label)
+        return cb
+
+    def _on_done(self, task: Task, res, ms: float):
+        self._last_ms[task.key] = ms
+        cb = self._release(task)
+        if cb is not None and not task.token.cancelled: cb[0](res)
+
+    def _on_failed(self, task: Task, e: Exception):
+        cb = self._release(task)
+        if cb is None: return
+        if cb[1] is not None: cb[1](e)
+        else: QtCore.qWarning(f"Tarea '{task.label}' falló: {e}")
+
+class TaskStatusWidget(QtWidgets.QWidget):
+    """Indicador para la barra de estado: etiqueta + barra de progreso + cancelar."""
+    def __init__(self, runner: TaskRunner, parent=None):
+        super().__init__(parent)
+        self.runner = runner
+        self.label = QtWidgets.QLabel(); self.bar = QtWidgets.QProgressBar(); self.bar.setRange(0, 1000)
+        self.bar.setMaximumWidth(160); self.bar.setTextVisible(False)
+        self.btn = QtWidgets.QToolButton(); self.btn.setText("✕"); self.btn.setToolTip("Cancelar")
+        self.btn.clicked.connect(lambda: self.runner.cancel())
+        lay = QtWidgets.QHBoxLayout(self); lay.setContentsMargins(0, 0, 0, 0)
+        lay.addWidget(self.label); lay.addWidget(self.bar); lay.addWidget(self.btn)
+        runner.started.connect(self._on_started); runner.progressed.connect(self._on_progress)
+        runner.finished.connect(self._on_finished)
+        self.hide()
+
+    def _on_started(self, label: str):
+        self.label.setText(label + "…"); self.bar.setRange(0, 0); self.show()  # indeterminada hasta el 1er progreso
+
+    def _on_progress(self, label: str, frac: float):
+        self.label.setText(label + "…"); self.bar.setRange(0, 1000); self.bar.setValue(int(frac*1000))
+
+    def _on_finished(self, label: str):
+        if not self.runner.is_busy(): self.hide()
@@ -1,11 +1,18 @@
 from __future__ import annotations
+import argparse
+import os
 import sys
 from PySide6 import QtWidgets
 from h_simulador.ui.main_window import MainWindow
+from h_simulador.profiling import Profiler
 
 def main():
-    app = QtWidgets.QApplication(sys.argv)
-    win = MainWindow()
+    ap = argparse.ArgumentParser(description="H.SimuladorPythonANE")
+    ap.add_argument("--perfil", action="store_true", default=bool(os.environ.get("HSIM_PERFIL")),
+                    help="instrumenta slots y paintEvent y muestra el panel de perfilado (también HSIM_PERFIL=1)")
+    args, qt_args = ap.parse_known_args()
+    app = QtWidgets.QApplication(sys.argv[:1] + qt_args)
+    win = MainWindow(profiler=Profiler() if args.perfil else None)
     win.show()
     sys.exit(app.exec())
 
@@ -0,0 +1,56 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+from h_simulador.models import Scene, FMTransmitter, Aircraft, ControlTower
+from h_simulador.batch import run_batch, evaluate_scene, FIELDS
+
+def make_scene(shift: float) -> Scene:
+    return Scene(entities=[
+        Aircraft(id="AV1", nombre="Avión", x_km=50.0 + shift, y_km=30.0, h_km=2.0),
+        FMTransmitter(id="A", nombre="A", x_km=30.0, y_km=15.0, h_km=0.1, f_Hz=97.8e6),
+        FMTransmitter(id="B", nombre="B", x_km=70.0, y_km=45.0, h_km=0.1, f_Hz=107.9e6),
+        ControlTower(id="TWR1", nombre="Torre", x_km=5.0, y_km=5.0, h_km=0.05)])
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory(); self.dir = self.tmp.name
+        for i in range(4):
+            with open(os.path.join(self.dir, f"escena_{i}.json"), "w", encoding="utf-8") as f:
+                json.dump(make_scene(float(i)).to_dict(), f)
+        with open(os.path.join(self.dir, "rota.json"), "w") as f: f.write("{no es json")
+
+    def tearDown(self): self.tmp.cleanup()
+
+    def read(self, path):
+        with open(path, newline="", encoding="utf-8") as f: return list(csv.DictReader(f))
+
+    def test_evaluate_scene(self):
+        rows = evaluate_scene(make_scene(0.0), "x")
+        self.assertEqual([r["receptor"] for r in rows], ["AV1", "TWR1"])
+        self.assertEqual(rows[0]["n_fm"], 2); self.assertEqual(rows[0]["im_peor_canal_MHz"], 118.0)
+        self.assertEqual(rows[0]["im_peor_fuentes"], "B+A")
+
+    def test_im_limit_keeps_link_metrics(self):
+        full = evaluate_scene(make_scene(0.0), "x"); rows = evaluate_scene(make_scene(0.0), "x", max_products=0)
+        self.assertEqual([r["receptor"] for r in rows], ["AV1", "TWR1"])
+        for a, b in zip(full, rows):
+            for c in ("fspl_min_dB", "fspl_max_dB", "mejor_fm", "prx_max_dBm", "prx_total_dBm"): self.assertEqual(a[c], b[c])
+            self.assertNotIn("n_im", b); self.assertNotIn("im_peor_dBm", b)
+            self.assertTrue(b["error"].startswith("IMLimitError"))
+
+    def test_parallel_matches_serial(self):
+        out1 = os.path.join(self.dir, "serie.csv"); out2 = os.path.join(self.dir, "paralelo.csv")
+        self.assertEqual(run_batch(self.dir, out1, workers=1), 5)
+        run_batch(self.dir, out2, workers=2)
+        a, b = self.read(out1), self.read(out2)
+        self.assertEqual(list(a[0].keys()), FIELDS)
+        key = lambda r: (r["escena"], r["receptor"])
+        self.assertEqual(sorted(a, key=key), sorted(b, key=key))
+        self.assertEqual(len(a), 4*2 + 1)
+        self.assertTrue(next(r for r in a if r["escena"] == "rota.json")["error"])
+
+if __name__ == "__main__":
+    unittest.main()
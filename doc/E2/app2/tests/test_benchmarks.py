@@ -0,0 +1,24 @@
+import unittest
+from benchmarks.common import BENCHMARKS
+from benchmarks.run import compare, run_suite
+import benchmarks.bench_core  # noqa: F401
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_core_suite_runs_small(self):
+        core = [b for b in BENCHMARKS if b.group == "core"]
+        res = run_suite(core, sizes=[10], repeat=2, min_batch_s=0.0)
+        self.assertEqual(len(res), len(core))
+        for r in res:
+            self.assertEqual(r["n"], 10); self.assertGreater(r["median_s"], 0.0)
+            self.assertLessEqual(r["min_s"], r["median_s"])
+
+    def test_compare_flags_regressions(self):
+        base = [{"nombre": "a", "n": 10, "median_s": 1.0}, {"nombre": "b", "n": 10, "median_s": 1.0}]
+        now = [{"nombre": "a", "n": 10, "median_s": 1.2}, {"nombre": "b", "n": 10, "median_s": 1.5},
+               {"nombre": "c", "n": 10, "median_s": 9.0}]
+        reg = compare(now, base, 1.25)
+        self.assertEqual([r["nombre"] for r in reg], ["b"]); self.assertAlmostEqual(reg[0]["razon"], 1.5)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import unittest
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PySide6 import QtCore, QtGui, QtWidgets
+from h_simulador.models import Scene, Aircraft
+from h_simulador.controller import SceneController
+from h_simulador.utils import UnitsConverter
+from h_simulador.ui.canvas import CanvasWidget
+
+def setUpModule():
+    global _app
+    _app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+def _mouse(kind, pos, buttons=QtCore.Qt.LeftButton):
+    p = QtCore.QPointF(pos)
+    return QtGui.QMouseEvent(kind, p, p, QtCore.Qt.LeftButton, buttons, QtCore.Qt.NoModifier)
+
+class TestCanvasLayers(unittest.TestCase):
+
+    def setUp(self):
+        self.ctrl = SceneController(Scene(ancho_km=40.0, alto_km=30.0,
+                                          entities=[Aircraft(id="AV1", nombre="Avión", x_km=20.0, y_km=15.0, h_km=2.0)]))
+        self.ctrl.add_fm("A", 5.0, 5.0, 0.1, 98.0, 5.0); self.ctrl.add_fm("B", 35.0, 25.0, 0.1, 104.0, 5.0)
+        self.canvas = CanvasWidget(self.ctrl, UnitsConverter(km_to_px=10.0))
+        self.canvas.resize(401, 301); self.canvas.show(); _app.processEvents()
+        self.renders = 0; render = self.canvas._render_static
+        def counted():
+            self.renders += 1; return render()
+        self.canvas._render_static = counted
+        self.canvas.repaint()  # la caché ya se pintó al mostrarse: no se vuelve a generar
+
+    def tearDown(self): self.canvas.deleteLater()
+
+    def _drag(self, x_km, y_km, dx_px=30):
+        p = QtCore.QPoint(*self.canvas._world_to_screen_px(x_km, y_km))
+        self.canvas.mousePressEvent(_mouse(QtCore.QEvent.MouseButtonPress, p)); self.canvas.repaint()
+        self.canvas.mouseMoveEvent(_mouse(QtCore.QEvent.MouseMove, p + QtCore.QPoint(dx_px, 0))); self.canvas.repaint()
+        self.canvas.mouseReleaseEvent(_mouse(QtCore.QEvent.MouseButtonRelease, p + QtCore.QPoint(dx_px, 0),
+                                             QtCore.Qt.NoButton)); self.canvas.repaint()
+
+    def test_aircraft_changes_reuse_static_cache(self):
+        self.assertEqual(self.renders, 0); cache = self.canvas._static_cache
+        self.ctrl.set_position("AV1", 25.0, 10.0, 3.0); self.canvas.repaint()
+        self._drag(25.0, 10.0)
+        self.assertAlmostEqual(self.ctrl.get_aircraft().x_km, 28.0)
+        self.assertEqual(self.renders, 0); self.assertIs(self.canvas._static_cache, cache)
+
+    def test_fm_drag_rerenders_static(self):
+        self._drag(5.0, 5.0)
+        self.assertAlmostEqual(self.ctrl.get_entity("A").x_km, 8.0)
+        self.assertEqual(self.renders, 2)  # sin la emisora al empezar, con ella al soltar
+
+    def test_dynamic_region_follows_aircraft_lines(self):
+        self.ctrl.set_position("AV1", 21.0, 15.0, 2.0); region = self.canvas._dynamic_region
+        for x_km, y_km in ((21.0, 15.0), (13.0, 10.0), (28.0, 20.0)):  # avión y mitad de cada línea
+            self.assertTrue(region.contains(QtCore.QPoint(*self.canvas._world_to_screen_px(x_km, y_km))))
+        # esquinas libres de la envolvente FM∪avión: fuera de la región
+        for x_km, y_km in ((35.0, 5.0), (6.0, 24.0)):
+            self.assertFalse(region.contains(QtCore.QPoint(*self.canvas._world_to_screen_px(x_km, y_km))))
+
+    def test_coverage_follows_aircraft_altitude(self):
+        self.canvas.coverage_cell_km = 1.0; self.canvas.toggle_coverage()  # sin tasks: cálculo en línea
+        self.assertEqual(self.canvas._coverage.h_rx_km, 2.0)
+        self.ctrl.set_position("AV1", 25.0, 10.0, 3.5)
+        cov = self.canvas._coverage; self.assertEqual(cov.h_rx_km, 3.5)
+        self.ctrl.set_position("AV1", 28.0, 10.0, 3.5)  # misma altitud: se conserva el raster
+        self.assertIs(self.canvas._coverage, cov)
+        self.canvas.set_coverage_params(1.0, 1.0); self.ctrl.set_position("AV1", 28.0, 10.0, 5.0)
+        self.assertEqual(self.canvas._coverage.h_rx_km, 1.0)  # altura fija: ignora el avión
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+from h_simulador.models import Scene, FMTransmitter, Aircraft
+from h_simulador.controller import SceneController
+from h_simulador.changes import ChangeSet
+
+class TestChangeNotifications(unittest.TestCase):
+    """El núcleo sin Qt entrega de forma síncrona al terminar cada mutación o lote."""
+
+    def setUp(self):
+        scene = Scene(entities=[
+            Aircraft(id="AV1", nombre="Avión", x_km=50.0, y_km=30.0, h_km=2.0),
+            FMTransmitter(id="FM_1", nombre="FM_1", x_km=30.0, y_km=15.0, h_km=0.1),
+        ])
+        self.ctrl = SceneController(scene)
+        self.got = []; self.scene_count = 0
+        self.ctrl.changed.connect(self.got.append)
+        self.ctrl.sceneChanged.connect(self._on_scene)
+
+    def _on_scene(self): self.scene_count += 1
+
+    def test_single_mutation_carries_dirty_fields(self):
+        self.ctrl.set_position("AV1", 10.0, 10.0)
+        self.assertEqual(len(self.got), 1); self.assertEqual(self.scene_count, 1)
+        self.assertEqual(self.got[0].entities, {"AV1": {"x_km", "y_km"}})
+        self.assertFalse(self.got[0].structural)
+
+    def test_batch_coalesces(self):
+        with self.ctrl.batch():
+            for i in range(10): self.ctrl.set_position("AV1", float(i), 1.0)
+            with self.ctrl.batch():
+                self.ctrl.update_fm_params("FM_1", f_MHz=95.5, p_kW=2.0)
+            self.assertEqual(self.got, [])
+        self.assertEqual(len(self.got), 1); self.assertEqual(self.scene_count, 1)
+        cs = self.got[0]
+        self.assertEqual(cs.ids, {"AV1", "FM_1"})
+        self.assertTrue(cs.touches("f_Hz")); self.assertFalse(cs.touches("h_km"))
+        self.assertEqual(cs.ids_with("x_km"), {"AV1"})
+
+    def test_structural_changes(self):
+        with self.ctrl.batch():
+            self.ctrl.add_fm("FM_1", 1.0, 1.0, 0.1, 100.0, 1.0)
+            self.ctrl.update_fm_params("FM_1", nombre="Nueva")
+        cs = self.got[-1]
+        self.assertTrue(cs.structural)
+        self.assertIn("FM_1_2", cs.ids)
+
+    def test_merge(self):
+        a = ChangeSet(); a.touch("X", ["x_km"])
+        b = ChangeSet(structural=True); b.touch("X", ["h_km"])
+        a.merge(b)
+        self.assertTrue(a.structural); self.assertEqual(a.entities["X"], {"x_km", "h_km"})
+        self.assertFalse(ChangeSet())
+
+if __name__ == "__main__":
+    unittest.main()
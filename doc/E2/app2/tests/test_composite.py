@@ -0,0 +1,37 @@
+import unittest
+import numpy as np
+from h_simulador.models import Scene, FMTransmitter, Aircraft
+from h_simulador.intermod import IMLevelModel, AERO_BAND_HZ
+from h_simulador.composite import BandpassNonlinearity, CompositeSynth, Stations, stations_at
+
+class TestComposite(unittest.TestCase):
+
+    def test_cw_levels_match_model(self):
+        # 2·107.9 − 97.8 = 118.0 MHz (aero); 97.8 + 107.9 − 100.0 = 105.7 MHz
+        model = IMLevelModel(iip3_dBm=-10.0)
+        st = Stations(np.array([97.8e6, 107.9e6, 100.0e6]), np.array([-40.0, -30.0, -35.0]))
+        syn = CompositeSynth(st, BandpassNonlinearity.from_model(model, order=3), deviation_Hz=0.0, audio_Hz=())
+        spec = syn.spectrum(0.004)
+        self.assertAlmostEqual(spec.channel_power_dBm(107.9e6), -30.0, delta=0.5)
+        self.assertAlmostEqual(spec.channel_power_dBm(118.0e6), 2*-30 - 40 + 20, delta=0.5)
+        self.assertAlmostEqual(spec.channel_power_dBm(105.7e6), -40 - 30 - 35 + 20 + 6, delta=0.5)
+        self.assertLess(spec.channel_power_dBm(118.0e6, nonlinear=False), -120.0)
+        rep = spec.report(AERO_BAND_HZ)
+        self.assertAlmostEqual(rep["canales"][0]["f_MHz"], 118.0, places=3)
+
+    def test_fm_power_and_linear_band_clean(self):
+        st = Stations(np.array([99.1e6, 104.3e6]), np.array([-50.0, -50.0]))
+        spec = CompositeSynth(st, deviation_Hz=75e3).spectrum(0.004)  # receptor lineal
+        self.assertAlmostEqual(spec.band_power_dBm(98.9e6, 99.3e6), -50.0, delta=0.3)
+        self.assertLess(spec.band_power_dBm(*AERO_BAND_HZ), -100.0)
+
+    def test_stations_from_scene(self):
+        scene = Scene(entities=[Aircraft(id="AV1", nombre="Avión", x_km=50.0, y_km=30.0, h_km=2.0),
+                                FMTransmitter(id="FM1", nombre="FM1", x_km=40.0, y_km=30.0, h_km=0.1, f_Hz=98e6, potencia_W=1e3)])
+        st = stations_at(scene)
+        self.assertEqual(len(st), 1); self.assertEqual(st.f_Hz[0], 98e6)
+        self.assertLess(st.prx_dBm[0], 60.0 - 90.0)  # 60 dBm − FSPL(>10 km)
+        with self.assertRaises(ValueError): stations_at(scene, "NO")
+
+if __name__ == "__main__":
+    unittest.main()
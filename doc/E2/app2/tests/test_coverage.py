@@ -0,0 +1,74 @@
+import unittest
+import numpy as np
+from h_simulador.models import Scene
+from h_simulador.controller import SceneController
+from h_simulador.coverage import CoverageRaster, raster_rgba
+from h_simulador.propagation import TxColumns, fspl_db
+
+class TestCoverageRaster(unittest.TestCase):
+
+    def setUp(self):
+        self.ctrl = SceneController(Scene(ancho_km=20.0, alto_km=10.0))
+        for i in range(6):
+            self.ctrl.add_fm(f"FM{i}", 2.0+3*i, 1.0+1.5*i, 0.1*(i+1), 88.0+3*i, 1.0+i)
+
+    def test_matches_point_to_point(self):
+        cov = CoverageRaster(20.0, 10.0, cell_km=0.5, h_rx_km=2.0, max_block=500)
+        cov.compute_all(self.ctrl.tx_columns())
+        self.assertEqual(cov.shape, (20, 40))
+        j, i = 7, 13; x, y = cov.xs[i], cov.ys[j]
+        want = 0.0
+        for fm in self.ctrl.get_all_fms():
+            d = np.sqrt((fm.x_km-x)**2 + (fm.y_km-y)**2 + (2.0-fm.h_km)**2)
+            want += 10**((10*np.log10(fm.potencia_W*1e3) - fspl_db(d, fm.f_Hz/1e6))/10)
+        self.assertAlmostEqual(cov.power_dbm()[j, i], 10*np.log10(want), places=9)
+
+    def test_block_bound_with_many_transmitters(self):
+        for i in range(40): self.ctrl.add_fm(f"X{i}", 0.5*i, 0.25*i, 0.1, 88.0 + 0.5*i, 2.0)
+        tx = self.ctrl.tx_columns(); ref = CoverageRaster(20.0, 10.0, cell_km=0.5); ref.compute_all(tx)
+        cov = CoverageRaster(20.0, 10.0, cell_km=0.5, max_block=200)  # 40 celdas por fila × 46 emisoras
+        sizes = []; block = cov._block_mW
+        def spy(*args):
+            out = block(*args); sizes.append(out.size); return out
+        cov._block_mW = spy; cov.compute_all(tx)
+        self.assertLessEqual(max(sizes), 200); self.assertGreater(len(sizes), cov.ny)
+        np.testing.assert_allclose(cov.total_mW, ref.total_mW, rtol=1e-12)
+
+    def test_incremental_update_equals_full(self):
+        cov = CoverageRaster(20.0, 10.0, cell_km=0.25, h_rx_km=1.0)
+        cov.compute_all(self.ctrl.tx_columns())
+        self.assertFalse(cov.update(self.ctrl.tx_columns()))
+        self.ctrl.set_position("FM2", 15.0, 9.0)
+        self.ctrl.update_fm_params("FM4", f_MHz=107.9)
+        self.ctrl.add_fm("Nueva", 1.0, 1.0, 0.05, 99.0, 3.0)
+        self.assertTrue(cov.update(self.ctrl.tx_columns()))
+        ref = CoverageRaster(20.0, 10.0, cell_km=0.25, h_rx_km=1.0)
+        ref.compute_all(self.ctrl.tx_columns())
+        np.testing.assert_allclose(cov.total_mW, ref.total_mW, rtol=1e-9)
+
+    def test_update_detects_removal_and_skips_unchanged(self):
+        cov = CoverageRaster(20.0, 10.0, cell_km=0.5); cov.compute_all(self.ctrl.tx_columns())
+        calls = []; acc = cov._accumulate
+        cov._accumulate = lambda *a, **k: (calls.append(len(a[0])), acc(*a, **k))[1]
+        rev = cov.revision; self.assertFalse(cov.update(self.ctrl.tx_columns()))
+        self.assertEqual((calls, cov.revision), ([], rev))
+        tx = self.ctrl.tx_columns(); keep = [0, 1, 3, 4, 5]
+        sub = TxColumns(ids=[tx.ids[i] for i in keep], nombres=[tx.nombres[i] for i in keep],
+                        **{c: getattr(tx, c)[keep].copy() for c in ("x_km", "y_km", "h_km", "f_Hz", "potencia_W")})
+        sub.x_km[0] += 1.0  # FM0 se mueve y FM2 sale
+        self.assertTrue(cov.update(sub)); self.assertEqual(calls, [2, 1])
+        ref = CoverageRaster(20.0, 10.0, cell_km=0.5); ref.compute_all(sub)
+        np.testing.assert_allclose(cov.total_mW, ref.total_mW, rtol=1e-9)
+
+    def test_cancel_keeps_previous_raster(self):
+        cov = CoverageRaster(20.0, 10.0, cell_km=0.5, max_block=100)
+        self.assertFalse(cov.compute_all(self.ctrl.tx_columns(), cancelled=lambda: True))
+        self.assertEqual(cov.total_mW.sum(), 0.0)
+
+    def test_rgba_orientation(self):
+        img = raster_rgba(np.array([[-100.0, -100.0], [10.0, 10.0]]))
+        self.assertEqual(img.shape, (2, 2, 4))
+        self.assertTrue((img[0, 0, :3] != img[1, 0, :3]).any())  # fila superior = norte = fila 1 del raster
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import subprocess
+import sys
+import unittest
+from h_simulador.events import Event
+
+class TestEvent(unittest.TestCase):
+
+    def test_connect_emit_disconnect(self):
+        got = []; ev = Event()
+        ev.connect(got.append); ev.connect(got.append)  # sin duplicados
+        ev.emit(1); self.assertEqual(got, [1])
+        ev.disconnect(got.append); ev.emit(2); self.assertEqual(got, [1])
+        ev.disconnect(got.append)  # no conectado: se ignora
+
+    def test_slot_may_disconnect_itself(self):
+        ev = Event(); calls = []
+        def once(x): calls.append(x); ev.disconnect(once)
+        ev.connect(once); ev.connect(calls.append)
+        ev.emit("a"); ev.emit("b")
+        self.assertEqual(calls, ["a", "a", "b"])
+
+class TestLightImports(unittest.TestCase):
+
+    def test_core_does_not_import_qt(self):
+        code = ("import sys, h_simulador; assert 'numpy' not in sys.modules\n"
+                "from h_simulador import Scene, SceneController\n"
+                "import h_simulador.batch\n"
+                "SceneController(Scene()).add_fm('A', 1, 1, 0.1, 100.0, 1.0)\n"
+                "assert not any(m.startswith('PySide6') for m in sys.modules), 'PySide6 importado'")
+        r = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        self.assertEqual(r.returncode, 0, r.stderr)
+
+if __name__ == "__main__":
+    unittest.main()
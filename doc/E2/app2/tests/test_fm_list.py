@@ -0,0 +1,73 @@
+import os
+import unittest
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PySide6 import QtCore, QtWidgets
+from h_simulador.models import Scene, Aircraft
+from h_simulador.controller import SceneController
+from h_simulador.ui.fm_list import FMTableModel, FMListWidget
+
+def setUpModule():
+    global _app
+    _app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+class _Spy:
+    """Registra (fila_ini, fila_fin, col_ini, col_fin) de cada dataChanged."""
+    def __init__(self, model):
+        self.ranges = []; self.resets = 0
+        model.dataChanged.connect(lambda a, b, roles=(): self.ranges.append((a.row(), b.row(), a.column(), b.column())))
+        model.modelReset.connect(self._reset); model.layoutChanged.connect(self._reset)
+    def _reset(self, *args): self.resets += 1
+    def clear(self): self.ranges.clear(); self.resets = 0
+
+class TestFMTableModel(unittest.TestCase):
+
+    def _ctrl(self, aircraft=True):
+        ents = [Aircraft(id="AV1", nombre="Avión", x_km=50.0, y_km=30.0, h_km=2.0)] if aircraft else []
+        ctrl = SceneController(Scene(entities=ents))
+        for name, f, x in (("A", 97.8, 10.0), ("B", 101.2, 20.0), ("C", 104.5, 30.0), ("D", 107.9, 40.0)):
+            ctrl.add_fm(name, x, 30.0, 0.1, f, 5.0)
+        return ctrl
+
+    def test_single_edit_without_aircraft(self):
+        ctrl = self._ctrl(aircraft=False); m = FMTableModel(ctrl); spy = _Spy(m)
+        ctrl.update_fm_params("C", p_kW=20.0)
+        self.assertEqual(spy.ranges, [(2, 2, m.COL_P, m.COL_P)])  # d/FSPL siguen en NaN: sin señal
+        spy.clear(); ctrl.set_position("B", 25.0, 30.0)
+        self.assertEqual(spy.ranges, [])
+        self.assertEqual(m.index(1, m.COL_D).data(), "--")
+
+    def test_single_edit_with_aircraft(self):
+        ctrl = self._ctrl(); m = FMTableModel(ctrl); spy = _Spy(m)
+        ctrl.update_fm_params("B", f_MHz=99.0)
+        self.assertEqual(sorted(spy.ranges), [(1, 1, m.COL_F, m.COL_F), (1, 1, m.COL_FSPL, m.COL_FSPL)])
+        spy.clear(); ctrl.set_position("D", 45.0, 31.0)
+        self.assertEqual(sorted(spy.ranges), [(3, 3, m.COL_D, m.COL_D), (3, 3, m.COL_FSPL, m.COL_FSPL)])
+        spy.clear(); ctrl.set_position("AV1", 20.0, 30.0)  # el avión mueve todas las distancias
+        self.assertEqual(sorted(spy.ranges), [(0, 3, m.COL_D, m.COL_D), (0, 3, m.COL_FSPL, m.COL_FSPL)])
+        self.assertEqual(spy.resets, 0)
+
+    def test_aircraft_removed_then_added(self):
+        ctrl = self._ctrl(aircraft=False); m = FMTableModel(ctrl); spy = _Spy(m)
+        ctrl.scene.entities.append(Aircraft(id="AV1", nombre="Avión", x_km=50.0, y_km=30.0, h_km=2.0))
+        ctrl.set_scene(ctrl.scene)
+        self.assertEqual(spy.resets, 1); self.assertNotEqual(m.index(0, m.COL_D).data(), "--")
+
+    def test_proxy_sort_and_filter(self):
+        ctrl = self._ctrl(); w = FMListWidget(ctrl); m, proxy = w.model, w.proxy
+        proxy.sort(m.COL_F, QtCore.Qt.DescendingOrder)
+        self.assertEqual([proxy.index(r, 0).data() for r in range(4)], ["D", "C", "B", "A"])
+        spy = _Spy(proxy)
+        ctrl.update_fm_params("C", p_kW=7.0)  # no cambia el orden por f
+        self.assertEqual(spy.ranges, [(1, 1, m.COL_P, m.COL_P)])
+        self.assertEqual(proxy.index(1, m.COL_P).data(), "7.000")
+        w.filter.setText("a"); self.assertEqual(proxy.rowCount(), 1)
+        spy.clear(); ctrl.update_fm_params("C", p_kW=9.0)  # fila filtrada: el proxy no emite nada
+        self.assertEqual(spy.ranges, [])
+        ctrl.update_fm_params("A", p_kW=9.0)
+        self.assertEqual(spy.ranges, [(0, 0, m.COL_P, m.COL_P)])
+        w.filter.clear(); proxy.sort(m.COL_P, QtCore.Qt.AscendingOrder); spy.clear()
+        ctrl.update_fm_params("B", p_kW=50.0)  # reordena: el proxy recoloca la fila
+        self.assertEqual(proxy.index(3, m.COL_NOMBRE).data(), "B")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import itertools
+import unittest
+import numpy as np
+from h_simulador.models import Scene, Aircraft
+from h_simulador.controller import SceneController
+from h_simulador.intermod import find_im_products, aero_channels, IM_KINDS, IMLimitError
+
+def brute_force(f, ch, tol):
+    hit = lambda x: np.abs(ch - x).min() <= tol
+    out = set()
+    for i, j in itertools.permutations(range(len(f)), 2):
+        if hit(2*f[i] - f[j]): out.add(("2f1-f2", i, j, -1))
+        if hit(3*f[i] - 2*f[j]): out.add(("3f1-2f2", i, j, -1))
+    for i, j in itertools.combinations(range(len(f)), 2):
+        for k in range(len(f)):
+            if k not in (i, j) and hit(f[i] + f[j] - f[k]): out.add(("f1+f2-f3", i, j, k))
+    return out
+
+class TestIntermod(unittest.TestCase):
+
+    def test_channels(self):
+        ch = aero_channels()
+        self.assertEqual(len(ch), 721); self.assertEqual(ch[0], 118.0e6); self.assertAlmostEqual(ch[-1], 136.0e6)
+
+    def test_known_product(self):
+        # 2·107.9 − 97.8 = 118.0 MHz y 3·107.9 − 2·97.8 = 128.1 MHz
+        self.assertEqual(len(find_im_products([97.8e6, 107.9e6], tol_Hz=1.0)), 2)
+        im = find_im_products([97.8e6, 107.9e6], tol_Hz=1.0, kinds=("2f1-f2",))
+        self.assertEqual(len(im), 1)
+        self.assertEqual((IM_KINDS[im.kind[0]], im.i[0], im.j[0]), ("2f1-f2", 1, 0))
+        self.assertAlmostEqual(im.channels_Hz[im.channel[0]], 118.0e6)
+
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(7)
+        f = (88.0 + 20.0*rng.random(20))*1e6; ch = aero_channels(); tol = 3e3
+        im = find_im_products(f, ch, tol, max_block=64)  # bloques pequeños: fuerza la partición
+        got = {(IM_KINDS[t], min(i, j) if t == 2 else i, max(i, j) if t == 2 else j, k)
+               for t, i, j, k in zip(im.kind.tolist(), im.i.tolist(), im.j.tolist(), im.k.tolist())}
+        self.assertEqual(got, brute_force(f, ch, tol))
+        self.assertTrue((np.abs(im.offset_Hz) <= tol).all())
+
+    def test_controller(self):
+        ctrl = SceneController(Scene())
+        for name, f in (("A", 97.8), ("B", 107.9), ("C", 100.0)): ctrl.add_fm(name, 1.0, 1.0, 0.1, f, 1.0)
+        rows = ctrl.intermod_products(tol_Hz=1.0).rows(ctrl.tx_columns().nombres)
+        self.assertIn({"tipo": "2f1-f2", "orden": 3, "f1": "B", "f2": "A", "f3": None,
+                       "f_MHz": rows[0]["f_MHz"], "canal_MHz": 118.0, "offset_kHz": rows[0]["offset_kHz"]}, rows)
+
+class TestIMLevels(unittest.TestCase):
+
+    def setUp(self):
+        scene = Scene(entities=[Aircraft(id="AV1", nombre="Avión", x_km=50.0, y_km=30.0, h_km=2.0)])
+        self.ctrl = SceneController(scene)
+        for name, f, x in (("A", 97.8, 40.0), ("B", 107.9, 60.0), ("C", 100.0, 20.0), ("D", 96.0, 80.0)):
+            self.ctrl.add_fm(name, x, 30.0, 0.1, f, 5.0)
+
+    def test_levels_follow_intercept_model(self):
+        av = self.ctrl.get_aircraft(); im = self.ctrl.intermod_products()
+        lv = self.ctrl.im_levels(av)
+        res, r = self.ctrl.links_for(av); P = res.prx_dBm[r]; m = self.ctrl.intermod.model
+        for p in range(len(im)):
+            i, j, k = im.i[p], im.j[p], im.k[p]
+            want = {"2f1-f2": 2*P[i] + P[j] - 2*m.iip3_dBm, "3f1-2f2": 3*P[i] + 2*P[j] - 4*m.iip5_dBm,
+                    "f1+f2-f3": P[i] + P[j] + P[k] - 2*m.iip3_dBm + m.three_signal_dB}[IM_KINDS[im.kind[p]]]
+            self.assertAlmostEqual(lv[p], want)
+        self.assertAlmostEqual(self.ctrl.worst_im(av)["level_dBm"], lv.max())
+
+    def test_table_memoized_across_moves(self):
+        av = self.ctrl.get_aircraft(); self.ctrl.worst_im(av)
+        builds = self.ctrl.intermod.builds; before = self.ctrl.im_levels(av).copy()
+        self.ctrl.set_position("AV1", 45.0, 30.0); self.ctrl.set_position("B", 10.0, 5.0)
+        self.ctrl.update_fm_params("C", p_kW=20.0)
+        self.assertFalse(np.allclose(self.ctrl.im_levels(av), before))
+        self.assertEqual(self.ctrl.intermod.builds, builds)
+        self.ctrl.update_fm_params("D", f_MHz=99.9)
+        self.ctrl.im_levels(av); self.assertEqual(self.ctrl.intermod.builds, builds + 1)
+
+    def test_product_limit_is_remembered(self):
+        av = self.ctrl.get_aircraft(); n = len(self.ctrl.intermod_products())
+        self.ctrl.intermod.max_products = n - 1; self.ctrl.intermod.configure(tol_Hz=self.ctrl.intermod.tol_Hz)
+        builds = self.ctrl.intermod.builds
+        for _ in range(3):
+            with self.assertRaises(IMLimitError): self.ctrl.worst_im(av)
+        self.assertEqual(self.ctrl.intermod.builds, builds + 1)
+        self.ctrl.intermod.max_products = None; self.ctrl.update_fm_params("D", f_MHz=96.0)
+        self.assertIsNotNone(self.ctrl.worst_im(av))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import math
+import unittest
+import numpy as np
+from h_simulador.models import Scene, FMTransmitter, Aircraft, ControlTower
+from h_simulador.controller import SceneController
+from h_simulador.geometry import link_geometry, radio_horizon_km
+from h_simulador.propagation import compute_path_loss
+
+class TestGeometry(unittest.TestCase):
+
+    def test_radio_horizon(self):
+        # regla práctica 4.12·(√h1_m + √h2_m) km
+        self.assertAlmostEqual(float(radio_horizon_km(0.1, 2.0)), 4.12*(math.sqrt(100)+math.sqrt(2000)), delta=0.5)
+        self.assertEqual(float(radio_horizon_km(0.0, 0.0)), 0.0)
+
+    def test_slant_and_elevation(self):
+        g = link_geometry([0.0, 30.0], [0.0, 40.0], [0.1, 0.3], [0.0], [0.0], [2.1])
+        self.assertEqual(g.slant_km.shape, (1, 2))
+        self.assertAlmostEqual(g.slant_km[0, 0], 2.0); self.assertAlmostEqual(g.elev_deg[0, 0], 90.0)
+        self.assertAlmostEqual(g.slant_km[0, 1], math.sqrt(50.0**2 + 1.8**2))
+        self.assertLess(g.elev_deg[0, 1], math.degrees(math.atan2(1.8, 50.0)))  # curvatura
+        self.assertTrue(g.los.all())
+        far = link_geometry([500.0], [0.0], [0.1], [0.0], [0.0], [2.0])
+        self.assertFalse(far.los[0, 0]); self.assertLess(far.elev_deg[0, 0], 0.0)
+
+class TestLinkCache(unittest.TestCase):
+
+    def setUp(self):
+        scene = Scene(ancho_km=100.0, alto_km=60.0)
+        scene.entities.append(Aircraft(id="AV1", nombre="Avión", x_km=50.0, y_km=30.0, h_km=2.0))
+        for i in range(6):
+            scene.entities.append(FMTransmitter(id=f"FM_{i}", nombre=f"FM_{i}", x_km=10.0*i, y_km=5.0+i,
+                                                h_km=0.1*(i+1), f_Hz=(88.0+3*i)*1e6))
+        scene.entities.append(ControlTower(id="TWR1", nombre="Torre", x_km=5.0, y_km=5.0, h_km=0.05))
+        self.ctrl = SceneController(scene)
+
+    def assert_fresh(self):
+        res = self.ctrl.link_budget()
+        rx = [self.ctrl.get_entity(i) for i in self.ctrl.links.rx_ids]
+        ref = compute_path_loss(self.ctrl.tx_columns(), [e.x_km for e in rx], [e.y_km for e in rx], [e.h_km for e in rx])
+        np.testing.assert_allclose(res.d_km, ref.d_km); np.testing.assert_allclose(res.fspl_dB, ref.fspl_dB)
+        np.testing.assert_allclose(res.elev_deg, ref.elev_deg); np.testing.assert_array_equal(res.los, ref.los)
+
+    def test_uses_heights(self):
+        res, r = self.ctrl.links_for(self.ctrl.get_aircraft())
+        self.assertEqual(self.ctrl.links.rx_ids, ["AV1", "TWR1"])
+        fm = self.ctrl.get_entity("FM_5")
+        self.assertAlmostEqual(res.d_km[r, 5], math.dist((50.0, 30.0, 2.0), (fm.x_km, fm.y_km, fm.h_km)))
+        self.assertAlmostEqual(self.ctrl.fspl_all_to_aircraft()[5]["d_km"], res.d_km[r, 5])
+
+    def test_partial_refresh_matches_full(self):
+        self.assert_fresh(); rev = self.ctrl.links.revision
+        self.ctrl.link_budget(); self.assertEqual(self.ctrl.links.revision, rev)  # sin cambios, sin cálculo
+        self.ctrl.set_position("FM_2", 70.0, 50.0)
+        self.ctrl.update_fm_params("FM_4", f_MHz=107.0)
+        self.assert_fresh()
+        self.ctrl.set_position("AV1", 1.0, 2.0); self.ctrl.set_position("TWR1", 90.0, 10.0)
+        self.assert_fresh()
+        self.ctrl.update_fm_params("FM_1", p_kW=50.0)  # la potencia no toca la geometría
+        rev = self.ctrl.links.revision; self.ctrl.link_budget()
+        self.assertEqual(self.ctrl.links.revision, rev)
+        res, r = self.ctrl.links_for(self.ctrl.get_aircraft())
+        self.assertAlmostEqual(res.prx_dBm[r, 1], 10*math.log10(50e3*1e3) - res.fspl_dB[r, 1])
+
+    def test_structural_rebuild(self):
+        self.ctrl.link_budget()
+        self.ctrl.add_fm("Nueva", 20.0, 20.0, 0.2, 99.0, 1.0)
+        self.assertEqual(self.ctrl.link_budget().d_km.shape, (2, 7))
+        self.assert_fresh()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+import numpy as np
+from h_simulador.montecarlo import RunningStats, HistogramSketch, DeploymentSampler, run_montecarlo
+
+class TestStreamingStats(unittest.TestCase):
+
+    def test_welford_merge(self):
+        x = np.random.default_rng(1).normal(-80.0, 12.0, 1001)
+        a, b = RunningStats(), RunningStats()
+        for v in x[:400]: a.add(v)
+        for v in x[400:]: b.add(v)
+        a.merge(b)
+        self.assertEqual(a.n, len(x)); self.assertAlmostEqual(a.mean, x.mean()); self.assertAlmostEqual(a.var, x.var(ddof=1))
+        self.assertEqual((a.min, a.max), (x.min(), x.max()))
+
+    def test_sketch_quantiles(self):
+        x = np.random.default_rng(2).uniform(-100.0, 0.0, 20000)
+        h1, h2 = HistogramSketch(-150.0, 50.0, 2000), HistogramSketch(-150.0, 50.0, 2000)
+        for v in x[:7000]: h1.add(v)
+        for v in x[7000:]: h2.add(v)
+        h1.merge(h2)
+        for q in (0.05, 0.5, 0.95): self.assertAlmostEqual(h1.quantile(q), np.quantile(x, q), delta=h1.width)
+
+class TestMonteCarlo(unittest.TestCase):
+
+    def test_reproducible_independent_of_workers(self):
+        sampler = DeploymentSampler(n_fm=(5, 15))
+        a = run_montecarlo(sampler, 60, seed=42, workers=1, chunk_trials=16).to_dict()
+        b = run_montecarlo(sampler, 60, seed=42, workers=2, chunk_trials=16).to_dict()
+        c = run_montecarlo(sampler, 60, seed=43, workers=1, chunk_trials=16).to_dict()
+        self.assertEqual(a, b); self.assertNotEqual(a, c)
+        self.assertEqual(a["ensayos"], 60); self.assertEqual(a["prx_max_dBm"]["n"], 60)
+        self.assertLessEqual(a["im_peor_dBm"]["n"], 60)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import json
+import os
+import tempfile
+import unittest
+from h_simulador.models import Scene, Aircraft
+from h_simulador.controller import SceneController
+from h_simulador.profiling import Profiler, ProfiledSignal, RollingStats, instrument_controller
+
+class _Listener:
+    def __init__(self): self.calls = 0
+    def on_changed(self, cs): self.calls += 1
+
+class TestProfiling(unittest.TestCase):
+
+    def test_rolling_window(self):
+        st = RollingStats(window=4)
+        for v in [100.0, 1.0, 2.0, 3.0, 4.0]: st.add(v)
+        s = st.summary()
+        self.assertEqual(s["n"], 5); self.assertEqual(s["max_ms"], 4.0)  # el 100 salió de la ventana
+        self.assertAlmostEqual(s["p50_ms"], 2.5); self.assertAlmostEqual(s["total_ms"], 110.0)
+
+    def test_controller_slots_and_trace(self):
+        ctrl = SceneController(Scene(entities=[Aircraft(id="AV1", nombre="Avión", x_km=50.0, y_km=30.0, h_km=2.0)]))
+        prof = Profiler(); instrument_controller(ctrl, prof); instrument_controller(ctrl, prof)  # idempotente
+        self.assertIsInstance(ctrl.changed, ProfiledSignal)
+        lst = _Listener(); ctrl.changed.connect(lst.on_changed); ctrl.changed.connect(lst.on_changed)
+        ctrl.set_position("AV1", 40.0, 30.0); ctrl.set_position("AV1", 41.0, 30.0)
+        self.assertEqual(lst.calls, 2)
+        names = {r["nombre"]: r for r in prof.summary()}
+        self.assertEqual(names["changed → _Listener.on_changed"]["n"], 2)
+        self.assertEqual(names["entrega (frame)"]["categoria"], "frame")
+
+        prof.enabled = False; ctrl.set_position("AV1", 42.0, 30.0)
+        self.assertEqual(lst.calls, 3)
+        self.assertEqual({r["nombre"]: r["n"] for r in prof.summary()}["entrega (frame)"], 2)  # en pausa no se mide
+        ctrl.changed.disconnect(lst.on_changed); ctrl.set_position("AV1", 43.0, 30.0)
+        self.assertEqual(lst.calls, 3)
+
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "traza.json")
+            n = prof.export_chrome_trace(path)
+            with open(path, encoding="utf-8") as f: doc = json.load(f)
+        xs = [e for e in doc["traceEvents"] if e["ph"] == "X"]
+        self.assertEqual(len(xs), n); self.assertEqual(n, 4)
+        self.assertTrue(all(e["dur"] >= 0 and e["ts"] >= 0 for e in xs))
+        prof.reset(); self.assertEqual(prof.summary(), [])
+
+if __name__ == "__main__":
+    unittest.main()
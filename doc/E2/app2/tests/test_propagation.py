@@ -0,0 +1,56 @@
+import math
+import unittest
+from h_simulador.models import Scene, FMTransmitter, Aircraft, ControlTower
+from h_simulador.controller import SceneController
+from h_simulador.propagation import TxColumns, compute_path_loss, fspl_db
+
+def fspl_ref(d_km, f_MHz):
+    return 32.44 + 20.0*math.log10(max(d_km, 1e-9)) + 20.0*math.log10(max(f_MHz, 1e-9))
+
+class TestPropagation(unittest.TestCase):
+
+    def setUp(self):
+        self.scene = Scene(ancho_km=100.0, alto_km=60.0)
+        self.scene.entities.append(Aircraft(id="AV1", nombre="Avión", x_km=50.0, y_km=30.0, h_km=2.0))
+        for i in range(5):
+            self.scene.entities.append(FMTransmitter(id=f"FM_{i}", nombre=f"FM_{i}", x_km=10.0*i, y_km=5.0+i,
+                                                     h_km=0.1, potencia_W=1e3*(i+1), f_Hz=(88.0+4*i)*1e6))
+        self.scene.entities.append(ControlTower(id="TWR1", nombre="Torre", x_km=5.0, y_km=5.0, h_km=0.05))
+        self.ctrl = SceneController(self.scene)
+
+    def test_fspl_matches_scalar(self):
+        for d, f in [(0.0, 100.0), (1.0, 100.0), (25.0, 88.5), (120.0, 108.0)]:
+            self.assertAlmostEqual(float(fspl_db(d, f)), SceneController.compute_fspl_db(d, f), places=9)
+
+    def test_batched_many_receivers(self):
+        tx = TxColumns.from_entities(self.ctrl.get_all_fms())
+        res = compute_path_loss(tx, [50.0, 5.0, 0.0], [30.0, 5.0, 0.0])
+        self.assertEqual(res.d_km.shape, (3, 5))
+        for r, (rx, ry) in enumerate([(50.0, 30.0), (5.0, 5.0), (0.0, 0.0)]):
+            for i, fm in enumerate(self.ctrl.get_all_fms()):
+                d = math.hypot(fm.x_km - rx, fm.y_km - ry)
+                self.assertAlmostEqual(res.d_km[r, i], d, places=9)
+                self.assertAlmostEqual(res.fspl_dB[r, i], fspl_ref(d, fm.f_Hz/1e6), places=9)
+
+    def test_dict_api_preserved(self):
+        rows = self.ctrl.fspl_all_to_aircraft()
+        self.assertEqual([r["id"] for r in rows], [f"FM_{i}" for i in range(5)])
+        self.assertEqual(set(rows[0]), {"id", "nombre", "f_MHz", "p_kW", "d_km", "fspl_dB"})
+        self.assertAlmostEqual(rows[2]["p_kW"], 3.0)
+        self.assertAlmostEqual(rows[2]["f_MHz"], 96.0)
+
+    def test_stats_overview(self):
+        ov = self.ctrl.stats_overview()
+        rows = self.ctrl.fspl_all_to_aircraft()
+        self.assertEqual(ov["count"], 5)
+        self.assertAlmostEqual(ov["p_total_kW"], 15.0)
+        self.assertAlmostEqual(ov["fspl_min"], min(r["fspl_dB"] for r in rows))
+        self.assertEqual(ov["best_fm"]["id"], min(rows, key=lambda r: r["fspl_dB"])["id"])
+
+    def test_empty_scene(self):
+        ctrl = SceneController(Scene())
+        self.assertEqual(ctrl.fspl_all_to_aircraft(), [])
+        self.assertEqual(ctrl.stats_overview()["count"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from h_simulador.models import Scene, Aircraft, FMTransmitter
+from h_simulador.controller import SceneController
+from h_simulador.registry import LocalProjection, RegistryReader, import_registry, read_registry, add_registry
+
+class TestRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.ctrl = SceneController(Scene(entities=[Aircraft(id="AV1", nombre="Avión", x_km=50.0, y_km=30.0, h_km=2.0)]))
+        self.ctrl.add_fm("Radio", 10.0, 10.0, 0.1, 98.0, 5.0)
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self): self.tmp.cleanup()
+
+    def _write(self, name, text):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", encoding="utf-8") as f: f.write(text)
+        return path
+
+    def test_projection(self):
+        pr = LocalProjection(10.0, -75.0, 50.0, 30.0)
+        x, y = pr.to_km([10.0, 10.1], [-75.0, -74.9])
+        np.testing.assert_allclose(x, [50.0, 50.0 + 11.12*np.cos(np.radians(10.0))], atol=0.02)
+        np.testing.assert_allclose(y, [30.0, 41.12], atol=0.02)
+
+    def test_xy_import_single_notification_and_dedup(self):
+        path = self._write("reg.csv", "nombre,x_km,y_km,h_m,f_MHz,erp_kW\n"
+                           "Radio,20,20,150,100.1,10\nRadio,30,20,150,100.3,1\nRadio,40,20,,101.1,2\n"
+                           "Lejos,500,20,150,99.0,1\nMala,abc,1,1,99.0,1\n")
+        got = []; self.ctrl.changed.connect(got.append)
+        rep = import_registry(self.ctrl, path, chunk_rows=2)
+        self.assertEqual(rep, {"leidas": 5, "importadas": 3, "fuera_area": 1, "invalidas": 1})
+        self.assertEqual(len(got), 1); self.assertTrue(got[0].structural)
+        tbl = self.ctrl.scene.entities.table(FMTransmitter)
+        self.assertEqual(tbl.nombres, ["Radio", "Radio_2", "Radio_3", "Radio_4"])
+        np.testing.assert_allclose(tbl["h_km"], [0.1, 0.15, 0.15, 0.1])
+        np.testing.assert_allclose(tbl["potencia_W"][1:], [10e3, 1e3, 2e3])
+        self.assertIs(self.ctrl.get_entity("Radio_3"), self.ctrl.get_all_fms()[2])
+        self.assertEqual(len(self.ctrl.link_budget().tx), 4)
+
+    def test_latlon_semicolon_decimal_comma(self):
+        path = self._write("reg.csv", "indicativo;latitud;longitud;frecuencia_MHz;pre_kW\n"
+                           "HJA;10,40;-75,50;95,5;5\nHJB;10,44;-75,46;99,1;10\n")
+        rd = RegistryReader(path, (100.0, 60.0), chunk_rows=1)
+        chunks = list(rd)
+        self.assertEqual(len(chunks), 2)
+        # centroide del primer bloque (HJA) en el centro del área
+        np.testing.assert_allclose([chunks[0]["x_km"][0], chunks[0]["y_km"][0]], [50.0, 30.0])
+        self.assertGreater(chunks[1]["x_km"][0], 50.0); self.assertGreater(chunks[1]["y_km"][0], 30.0)
+        np.testing.assert_allclose(chunks[1]["f_Hz"], [99.1e6])
+
+    def test_read_in_worker_then_add(self):
+        path = self._write("reg.csv", "nombre,x_km,y_km,f_MHz\n" + "".join(f"R{i},{i%90+1},20,{88+i%20}\n" for i in range(50)))
+        fracs = []; got = []; self.ctrl.changed.connect(got.append)
+        chunks, rd = read_registry(path, (100.0, 60.0), chunk_rows=8, progress=fracs.append)
+        self.assertEqual(got, [])  # leer no toca la escena
+        self.assertEqual(len(fracs), 7); self.assertEqual(fracs, sorted(fracs)); self.assertEqual(fracs[-1], 1.0)
+        rep = add_registry(self.ctrl, chunks, rd)
+        self.assertEqual(rep, {"leidas": 50, "importadas": 50, "fuera_area": 0, "invalidas": 0})
+        self.assertEqual(len(got), 1); self.assertEqual(len(self.ctrl.get_all_fms()), 51)
+
+    def test_missing_columns(self):
+        path = self._write("reg.csv", "nombre,x_km,y_km\nA,1,1\n")
+        with self.assertRaises(ValueError): list(RegistryReader(path, (100.0, 60.0)))
+
+if __name__ == "__main__":
+    unittest.main()
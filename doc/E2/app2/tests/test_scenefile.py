@@ -0,0 +1,105 @@
+import gc
+import os
+import tempfile
+import unittest
+import weakref
+import numpy as np
+from h_simulador.models import Scene, Aircraft, FMTransmitter, ControlTower
+from h_simulador.controller import SceneController
+from h_simulador.store import is_mapped
+from h_simulador.scenefile import (save_scene, load_scene, is_container, read_container, write_container,
+                                   scene_to_container, StreamingSceneLoader)
+from h_simulador.trajectory import Trajectory, TrajectoryMetrics
+
+class TestSceneFile(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.scene = Scene(ancho_km=80.0, alto_km=40.0, entities=[
+            FMTransmitter(id="FM_1", nombre="Radio Ñ", x_km=30.0, y_km=15.0, h_km=0.1, potencia_W=10e3, f_Hz=100e6),
+            Aircraft(id="AV1", nombre="Avión", x_km=50.0, y_km=30.0, h_km=2.0),
+            ControlTower(id="TWR1", nombre="Torre", x_km=5.0, y_km=5.0, h_km=0.05),
+            FMTransmitter(id="FM_2", nombre="FM_2", x_km=60.0, y_km=25.0, h_km=0.2, potencia_W=5e3, f_Hz=98e6)])
+
+    def tearDown(self): self.tmp.cleanup()
+
+    def _path(self, name): return os.path.join(self.tmp.name, name)
+
+    def test_binary_roundtrip_is_mapped(self):
+        path = self._path("e.hsim"); save_scene(self.scene, path)
+        self.assertTrue(is_container(path))
+        sc = load_scene(path)
+        self.assertEqual(sc.to_dict(), self.scene.to_dict())
+        x = sc.entities.table(FMTransmitter)["x_km"]
+        self.assertIsInstance(x.base, np.memmap)
+        # copy-on-write: editar no toca el archivo; crecer copia las columnas
+        ctrl = SceneController(sc); ctrl.set_position("FM_1", 1.0, 2.0)
+        ctrl.add_fm("Nueva", 10.0, 10.0, 0.1, 99.0, 1.0)
+        self.assertEqual(load_scene(path).entities.get("FM_1").x_km, 30.0)
+        self.assertEqual(ctrl.get_entity("FM_1").x_km, 1.0)
+        save_scene(sc, path)  # sobrescribir el archivo mapeado es seguro (reemplazo atómico)
+        self.assertEqual(load_scene(path, mmap=False).to_dict(), sc.to_dict())
+
+    def test_release_mapped_frees_the_file(self):
+        path = self._path("e.hsim"); save_scene(self.scene, path)
+        ctrl = SceneController(load_scene(path)); ctrl.link_budget()  # las vistas del caché también apuntan al mapa
+        ref = weakref.ref(ctrl.scene.entities.table(FMTransmitter)["x_km"].base)
+        ctrl.release_mapped(); gc.collect()
+        self.assertIsNone(ref())  # sin referencias: el archivo se puede reemplazar
+        self.assertFalse(any(is_mapped(ctrl.scene.entities.table(k)[c]) for k in ctrl.scene.entities.kinds
+                             for c in ctrl.scene.entities.table(k).num_names))
+        self.assertEqual(len(ctrl.link_budget().tx), 2)
+        sc = load_scene(path); save_scene(sc, path)  # guardar sobre su propio archivo suelta el mapa antes
+        self.assertFalse(is_mapped(sc.entities.table(FMTransmitter)["x_km"]))
+
+    def test_json_autodetect(self):
+        path = self._path("e.hsim.json"); save_scene(self.scene, path)
+        self.assertFalse(is_container(path))
+        self.assertEqual(load_scene(path).to_dict(), self.scene.to_dict())
+        bin_path = self._path("escena_sin_extension"); write_container(bin_path, *scene_to_container(self.scene))
+        self.assertEqual(load_scene(bin_path).to_dict(), self.scene.to_dict())
+
+    def test_container_alignment_and_dtypes(self):
+        path = self._path("c.hsim")
+        write_container(path, {"a": 1}, {"f": np.arange(5.0), "b": np.array([True, False]), "m": np.ones((3, 2), np.int32)})
+        meta, arr = read_container(path)
+        self.assertEqual(meta, {"a": 1})
+        np.testing.assert_array_equal(arr["m"], np.ones((3, 2)))
+        self.assertEqual(arr["b"].dtype, np.bool_)
+        self.assertTrue(all(a.ctypes.data % 64 == 0 for a in arr.values()))
+
+    def test_streaming_json_small_chunks(self):
+        path = self._path("e.json"); save_scene(self.scene, path)
+        ld = StreamingSceneLoader(path, chunk_bytes=7)  # cortes dentro de números y cadenas
+        self.assertTrue(ld.step(2))
+        self.assertEqual(len(ld.scene.entities), 2); self.assertEqual(ld.scene.ancho_km, 80.0)
+        self.assertEqual(ld.scene.entities.get("AV1").h_km, 2.0)  # escena parcial válida
+        self.assertLess(ld.progress, 1.0)
+        self.assertFalse(ld.step(10)); self.assertTrue(ld.done); self.assertEqual(ld.progress, 1.0)
+        self.assertEqual(ld.scene.to_dict(), self.scene.to_dict())
+
+    def test_streaming_json_truncated_keeps_partial(self):
+        path = self._path("e.json")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('{"entities": [{"type": "Aircraft", "id": "A", "x_km": 1}, {"type": "FMTransmitter", "id": "F", "f_')
+        ld = StreamingSceneLoader(path, chunk_bytes=16)
+        with self.assertRaises(ValueError): ld.run()
+        self.assertEqual([e.id for e in ld.scene.entities], ["A"])
+        with open(path, "w", encoding="utf-8") as f: f.write('{"entities": [], "scene": {"ancho_km": 5}}')
+        sc = load_scene(path)
+        self.assertEqual((len(sc.entities), sc.ancho_km), (0, 5.0))
+
+    def test_trajectory_run_roundtrip(self):
+        ctrl = SceneController(self.scene)
+        m = ctrl.evaluate_trajectory(Trajectory.from_waypoints([(0, 0, 1), (80, 40, 3)], dt_s=30.0))
+        path = self._path("run.hsim"); m.save(path)
+        r = TrajectoryMetrics.load(path)
+        self.assertEqual(r.links.tx.nombres, m.links.tx.nombres)
+        np.testing.assert_array_equal(r.links.fspl_dB, m.links.fspl_dB)
+        np.testing.assert_array_equal(r.links.los, m.links.los)
+        np.testing.assert_array_equal(r.im_worst, m.im_worst)
+        self.assertEqual(len(r.im), len(m.im))
+        np.testing.assert_array_equal(r.im_levels(slice(1, 3)), m.im_levels(slice(1, 3)))
+
+if __name__ == "__main__":
+    unittest.main()
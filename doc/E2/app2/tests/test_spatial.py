@@ -0,0 +1,53 @@
+import math
+import random
+import unittest
+from h_simulador.spatial import GridIndex
+from h_simulador.models import Scene, FMTransmitter, Aircraft, ControlTower
+from h_simulador.controller import SceneController
+
+class TestGridIndex(unittest.TestCase):
+
+    def setUp(self):
+        rnd = random.Random(7)
+        self.pts = {f"P{i}": (rnd.uniform(0, 100), rnd.uniform(0, 60)) for i in range(500)}
+        self.idx = GridIndex(cell_km=3.0)
+        for eid, (x, y) in self.pts.items(): self.idx.insert(eid, x, y, "FMTransmitter")
+
+    def test_query_rect_matches_brute_force(self):
+        got = set(self.idx.query_rect(20.0, 10.0, 45.0, 33.0))
+        want = {e for e, (x, y) in self.pts.items() if 20.0 <= x <= 45.0 and 10.0 <= y <= 33.0}
+        self.assertEqual(got, want)
+
+    def test_nearest_matches_brute_force(self):
+        for qx, qy in [(0.0, 0.0), (50.0, 30.0), (99.0, 1.0), (150.0, -20.0)]:
+            eid, d = self.idx.nearest(qx, qy)
+            want = min(self.pts.items(), key=lambda kv: math.hypot(kv[1][0]-qx, kv[1][1]-qy))
+            self.assertEqual(eid, want[0])
+            self.assertAlmostEqual(d, math.hypot(want[1][0]-qx, want[1][1]-qy))
+
+    def test_move_and_rename(self):
+        self.idx.move("P0", 80.0, 55.0)
+        self.assertEqual(self.idx.nearest(80.0, 55.0)[0], "P0")
+        self.idx.rename("P0", "Q0")
+        self.assertIn("Q0", self.idx.query_rect(79.0, 54.0, 81.0, 56.0))
+        self.assertNotIn("P0", self.idx)
+
+class TestControllerSpatial(unittest.TestCase):
+
+    def test_pick_nearest_and_kind_filter(self):
+        ctrl = SceneController(Scene(entities=[
+            Aircraft(id="AV1", nombre="Avión", x_km=50.0, y_km=30.0, h_km=2.0),
+            ControlTower(id="TWR1", nombre="Torre", x_km=10.0, y_km=10.0, h_km=0.05),
+        ]))
+        ctrl.add_fm("A", 10.2, 10.2, 0.1, 100.0, 1.0)
+        ctrl.add_fm("B", 49.0, 30.0, 0.1, 100.0, 1.0)
+        self.assertEqual(ctrl.pick_entity(10.0, 10.0, 1.0).id, "A")  # la torre no se puede elegir
+        self.assertEqual(ctrl.pick_entity(49.5, 30.0, 1.0).id, "B")  # la más reciente queda encima
+        self.assertEqual(ctrl.nearest_fm(50.0, 30.0).id, "B")
+        ctrl.set_position("B", 90.0, 50.0)
+        self.assertEqual(ctrl.nearest_fm(50.0, 30.0).id, "A")
+        ctrl.update_fm_params("A", nombre="Z")
+        self.assertEqual(ctrl.nearest_fm(11.0, 11.0).id, "Z")
+
+if __name__ == "__main__":
+    unittest.main()
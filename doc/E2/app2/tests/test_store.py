@@ -0,0 +1,87 @@
+import unittest
+import numpy as np
+from h_simulador.models import Scene, Entity, FMTransmitter, Aircraft, ControlTower
+from h_simulador.controller import SceneController
+
+def build_scene():
+    scene = Scene(ancho_km=100.0, alto_km=60.0)
+    scene.entities.extend([
+        Aircraft(id="AV1", nombre="Avión", x_km=50.0, y_km=30.0, h_km=2.0),
+        FMTransmitter(id="FM_1", nombre="FM_1", x_km=30.0, y_km=15.0, h_km=0.1, potencia_W=10e3, f_Hz=100e6),
+        ControlTower(id="TWR1", nombre="Torre", x_km=5.0, y_km=5.0, h_km=0.05),
+        FMTransmitter(id="FM_2", nombre="FM_2", x_km=60.0, y_km=25.0, h_km=0.2, potencia_W=5e3, f_Hz=98e6),
+    ])
+    return scene
+
+class TestSceneStore(unittest.TestCase):
+
+    def test_list_api_and_order(self):
+        scene = build_scene()
+        self.assertEqual(len(scene.entities), 4)
+        self.assertEqual([e.id for e in scene.entities], ["AV1", "FM_1", "TWR1", "FM_2"])
+        self.assertEqual([e.id for e in reversed(scene.entities)], ["FM_2", "TWR1", "FM_1", "AV1"])
+        self.assertIsInstance(scene.entities[2], ControlTower)
+
+    def test_entities_are_views(self):
+        av = Aircraft(id="AV1", nombre="Avión", x_km=1.0, y_km=2.0, h_km=2.0)
+        scene = Scene(entities=[av])
+        ctrl = SceneController(scene)
+        self.assertIs(ctrl.get_entity("AV1"), av)
+        av.move_to(10.0, 20.0)
+        tbl = scene.entities.table(Aircraft)
+        self.assertEqual((tbl["x_km"][0], tbl["y_km"][0]), (10.0, 20.0))
+        tbl["h_km"][0] = 3.5
+        self.assertEqual(av.h_km, 3.5)
+
+    def test_zero_copy_columns(self):
+        scene = build_scene()
+        tbl = scene.entities.table(FMTransmitter)
+        x = tbl["x_km"]
+        self.assertTrue(np.shares_memory(x, tbl["x_km"]))
+        np.testing.assert_array_equal(tbl["f_Hz"], [100e6, 98e6])
+
+    def test_type_indexes_and_id_lookup(self):
+        ctrl = SceneController(build_scene())
+        self.assertEqual(ctrl.get_aircraft().id, "AV1")
+        self.assertEqual(ctrl.get_control_tower().id, "TWR1")
+        self.assertEqual([e.id for e in ctrl.get_all_fms()], ["FM_1", "FM_2"])
+        self.assertIsNone(ctrl.get_entity("nope"))
+
+    def test_rename_reindexes(self):
+        ctrl = SceneController(build_scene())
+        ctrl.update_fm_params("FM_1", nombre="Olímpica")
+        self.assertIsNone(ctrl.get_entity("FM_1"))
+        self.assertEqual(ctrl.get_entity("Olímpica").nombre, "Olímpica")
+
+    def test_growth_keeps_views(self):
+        scene = Scene()
+        first = FMTransmitter(id="FM_0", nombre="FM_0", x_km=0.0, y_km=0.0, h_km=0.1)
+        scene.entities.append(first)
+        for i in range(1, 100):
+            scene.entities.append(FMTransmitter(id=f"FM_{i}", nombre=f"FM_{i}", x_km=float(i), y_km=0.0, h_km=0.1))
+        first.move_to(7.0, 8.0)
+        self.assertEqual(scene.entities.get("FM_0").x_km, 7.0)
+        self.assertEqual(scene.entities.get("FM_99").x_km, 99.0)
+
+    def test_remove_detaches(self):
+        scene = build_scene()
+        fm1 = scene.entities.get("FM_1"); fm2 = scene.entities.get("FM_2")
+        scene.entities.remove(fm1)
+        self.assertEqual([e.id for e in scene.entities], ["AV1", "TWR1", "FM_2"])
+        self.assertIs(scene.entities.get("FM_2"), fm2)
+        self.assertEqual(fm2.f_Hz, 98e6)
+        self.assertEqual(fm1.x_km, 30.0)  # sigue siendo legible, ya suelta
+        self.assertNotIn(fm1, scene.entities)
+
+    def test_dict_round_trip(self):
+        scene = build_scene()
+        scene.entities.append(Entity(id="E1", nombre="Genérica", x_km=1.0, y_km=1.0, h_km=0.0))
+        data = scene.to_dict()
+        self.assertEqual(list(data["entities"][1]),
+                         ["id", "nombre", "x_km", "y_km", "h_km", "potencia_W", "f_Hz", "type"])
+        again = Scene.from_dict(data)
+        self.assertEqual(again, scene)
+        self.assertEqual(again.to_dict(), data)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import threading
+import unittest
+import numpy as np
+from h_simulador.models import Scene, Aircraft
+from h_simulador.controller import SceneController
+from h_simulador.scenefile import snapshot_scene
+from h_simulador.tasks import CancelToken, Cancelled, throttled_progress, run_inline
+from h_simulador.trajectory import Trajectory
+
+class TestTasks(unittest.TestCase):
+
+    def test_cancel_token_stops_progress(self):
+        tok = CancelToken(); seen = []
+        progress = throttled_progress(tok, seen.append, min_interval_s=3600.0)
+        progress(0.1); progress(0.2); progress(1.0)
+        self.assertEqual(seen, [0.1, 1.0])  # limitado en frecuencia, el 100 % siempre pasa
+        tok.cancel()
+        with self.assertRaises(Cancelled): progress(0.5)
+
+    def test_trajectory_job_uses_snapshot(self):
+        ctrl = SceneController(Scene(entities=[Aircraft(id="AV1", nombre="Avión", x_km=50.0, y_km=30.0, h_km=2.0)]))
+        for name, f, x in (("A", 97.8, 40.0), ("B", 107.9, 60.0), ("C", 100.0, 20.0)):
+            ctrl.add_fm(name, x, 30.0, 0.1, f, 5.0)
+        traj = Trajectory.from_waypoints([(0, 0, 1), (100, 60, 3)], dt_s=60.0)
+        want = ctrl.evaluate_trajectory(traj)
+        job = ctrl.trajectory_job(traj)
+        ctrl.set_position("A", 1.0, 1.0); ctrl.update_fm_params("B", f_MHz=88.0)  # después de la foto
+        out = {}
+        th = threading.Thread(target=lambda: out.setdefault("m", run_inline(job))); th.start(); th.join()
+        np.testing.assert_array_equal(out["m"].links.fspl_dB, want.links.fspl_dB)
+        np.testing.assert_array_equal(out["m"].im_worst_dBm, want.im_worst_dBm)
+
+    def test_snapshot_is_independent(self):
+        ctrl = SceneController(Scene()); ctrl.add_fm("A", 10.0, 10.0, 0.1, 98.0, 5.0)
+        snap = snapshot_scene(ctrl.scene)
+        ctrl.set_position("A", 20.0, 20.0); ctrl.update_fm_params("A", nombre="B")
+        self.assertEqual(snap.entities.get("A").x_km, 10.0)
+        self.assertEqual(snap.to_dict()["entities"][0]["nombre"], "A")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import csv
+import os
+import tempfile
+import unittest
+import numpy as np
+from h_simulador.models import Scene, Aircraft
+from h_simulador.controller import SceneController
+from h_simulador.trajectory import Trajectory
+
+class TestTrajectory(unittest.TestCase):
+
+    def setUp(self):
+        self.ctrl = SceneController(Scene(entities=[Aircraft(id="AV1", nombre="Avión", x_km=50.0, y_km=30.0, h_km=2.0)]))
+        for name, f, x, y in (("A", 97.8, 40.0, 20.0), ("B", 107.9, 60.0, 35.0), ("C", 100.0, 20.0, 50.0), ("D", 96.0, 80.0, 10.0)):
+            self.ctrl.add_fm(name, x, y, 0.1, f, 5.0)
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self): self.tmp.cleanup()
+
+    def test_waypoints_constant_speed(self):
+        tr = Trajectory.from_waypoints([(0, 0, 0), (3, 4, 0), (3, 4, 1)], speed_kmh=360.0, dt_s=10.0)
+        self.assertEqual(len(tr), 7)  # 6 km a 0.1 km/s → 60 s
+        np.testing.assert_allclose(tr.position_at(25.0), (1.5, 2.0, 0.0))
+
+    def test_resample_keeps_endpoint(self):
+        tr = Trajectory.from_waypoints([(0, 0, 1), (10, 0, 1)], speed_kmh=360.0, dt_s=3.0)  # 100 s / 3 s
+        np.testing.assert_allclose(tr.t_s[-2:], [99.0, 100.0]); self.assertEqual(len(tr), 35)
+        np.testing.assert_allclose((tr.x_km[-1], tr.y_km[-1], tr.h_km[-1]), (10.0, 0.0, 1.0))
+        self.assertEqual(len(tr.resample(1.0)), 101)  # duración múltiplo: sin punto repetido
+
+    def test_csv_roundtrip(self):
+        path = os.path.join(self.tmp.name, "ruta.csv")
+        with open(path, "w", newline="") as f:
+            w = csv.writer(f); w.writerow(["t", "x_km", "y_km", "h_km"])
+            w.writerows([(0, 0, 0, 0), (60, 10, 5, 1.5), (120, 20, 5, 3.0)])
+        tr = Trajectory.from_csv(path)
+        np.testing.assert_allclose(tr.h_km, [0, 1.5, 3.0]); self.assertEqual(tr.duration_s, 120.0)
+
+    def test_matches_stepping_the_aircraft(self):
+        tr = Trajectory.from_waypoints([(0, 0, 0.2), (90, 55, 3.0)], speed_kmh=600.0, dt_s=30.0)
+        m = self.ctrl.evaluate_trajectory(tr)
+        self.assertEqual(m.links.d_km.shape, (len(tr), 4))
+        for t, step in enumerate(m.steps()):
+            self.ctrl.set_position("AV1", step["x_km"], step["y_km"], step["h_km"])
+            res, r = self.ctrl.links_for(self.ctrl.get_aircraft())
+            np.testing.assert_allclose(step["d_km"], res.d_km[r]); np.testing.assert_allclose(step["prx_dBm"], res.prx_dBm[r])
+            lv = self.ctrl.im_levels(self.ctrl.get_aircraft())
+            self.assertAlmostEqual(step["im_worst_dBm"], lv.max())
+            np.testing.assert_allclose(m.im_levels(t), lv)
+        every = np.array([s["im_dBm"] for s in m.steps(im_levels=True)])
+        np.testing.assert_allclose(every, m.im_levels()); self.assertEqual(every.shape, (len(tr), len(m.im)))
+        np.testing.assert_allclose(every.max(axis=1), m.im_worst_dBm)
+        n = m.to_csv(os.path.join(self.tmp.name, "serie.csv"))
+        self.assertEqual(n, len(tr)*4)
+
+    def test_im_limit_keeps_links(self):
+        tr = Trajectory.from_waypoints([(0, 0, 0.2), (90, 55, 3.0)], speed_kmh=600.0, dt_s=30.0)
+        self.ctrl.intermod.max_products = 0; self.ctrl.intermod.configure(tol_Hz=self.ctrl.intermod.tol_Hz)
+        m = self.ctrl.evaluate_trajectory(tr)
+        self.assertIsNotNone(m.im_error); self.assertEqual(len(m.im), 0)
+        self.assertTrue(np.isnan(m.im_worst_dBm).all()); self.assertEqual(m.links.d_km.shape, (len(tr), 4))
+        self.assertEqual(m.to_csv(os.path.join(self.tmp.name, "serie.csv")), len(tr)*4)
+
+    def test_player_speed(self):
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PySide6 import QtWidgets
+        from h_simulador.ui.playback import TrajectoryPlayer
+        QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+        tr = Trajectory.from_waypoints([(0, 0, 1), (90, 55, 3)], speed_kmh=600.0, dt_s=1.0)
+        player = TrajectoryPlayer(self.ctrl, speed=60.0); player.set_trajectory(tr)
+        self.assertEqual(player.speed, 60.0)
+        with self.assertRaises(ValueError): player.set_speed(0.0)
+        player.play(); t0 = player._sim_t(); player.set_speed(600.0)
+        self.assertEqual(player.speed, 600.0)
+        self.assertGreaterEqual(player._sim_t(), t0); self.assertLess(player._sim_t() - t0, 5.0)  # sin saltos
+        player.stop(); self.assertFalse(player.is_playing())
+
+if __name__ == "__main__":
+    unittest.main()